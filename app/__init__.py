@@ -1,6 +1,7 @@
 from flask import Flask, url_for, get_flashed_messages, render_template
 from app.extensions import init_extensions, db
 from app.config import get_config
+from app.cli import register_commands
 import os
 from app.routes.auth import auth_bp
 from app.routes.admin import admin_bp
@@ -35,6 +36,9 @@ def create_app(config_class=None):
     # Register error handlers
     register_error_handlers(app)
     
+    # Register CLI commands
+    register_commands(app)
+    
     @app.context_processor
     def utility_processor():
         return {
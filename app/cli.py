@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, UTC
+import click
+from app.extensions import upgrade_database
+from app.utils import http_cache
+from app.services.review import ReviewService
+from app.services.rate_limit import RateLimitService
+
+def register_commands(app):
+    """Register Flask CLI commands."""
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db():
+        """Add missing tables, columns and indexes to an existing database."""
+        columns, rebuilt, indexes, backfilled = upgrade_database()
+        click.echo(f"Added columns: {', '.join(columns) or 'none'}")
+        click.echo(f"Rebuilt tables: {', '.join(rebuilt) or 'none'}")
+        click.echo(f"Created indexes: {', '.join(indexes) or 'none'}")
+        click.echo(f"Backfilled content hashes for {backfilled} rows")
+
+    @app.cli.command('compress-static')
+    def compress_static_files():
+        """Write precompressed .gz and .br copies of static files."""
+        if http_cache.brotli is None:
+            click.echo("brotli is not installed, writing .gz files only")
+        written = http_cache.compress_static(app.static_folder)
+        click.echo(f"Compressed {len(written)} static files")
+
+    @app.cli.command('compact-vote-shards')
+    def compact_vote_shards():
+        """Fold sharded vote counters into the reviews table."""
+        updated = ReviewService.compact_vote_shards()
+        click.echo(f"Compacted vote shards for {updated} reviews")
+
+    @app.cli.command('cleanup-rate-limits')
+    @click.option('--max-age', default=3600, show_default=True,
+                  help='Delete entries idle for longer than this many seconds.')
+    @click.option('--batch-size', default=None, type=int,
+                  help='Rows deleted per transaction (defaults to RATE_LIMIT_CLEANUP_BATCH_SIZE).')
+    def cleanup_rate_limits(max_age, batch_size):
+        """Delete expired rate limit entries."""
+        cutoff = datetime.now(UTC) - timedelta(seconds=max_age)
+        deleted = RateLimitService.cleanup_old_entries(
+            cutoff,
+            batch_size=batch_size or app.config['RATE_LIMIT_CLEANUP_BATCH_SIZE']
+        )
+        click.echo(f"Deleted {deleted} rate limit entries")
@@ -15,7 +15,55 @@ class Config:
     
     # Application settings
     CAPTCHA_LENGTH = int(os.getenv('CAPTCHA_LENGTH', 4))
+    CAPTCHA_POOL_SIZE = int(os.getenv('CAPTCHA_POOL_SIZE', 20))  # pre-rendered captchas, 0 disables
     MAX_REVIEW_LENGTH = int(os.getenv('MAX_REVIEW_LENGTH', 500))
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))  # reviews per INSERT
+    REVIEWS_PER_PAGE = int(os.getenv('REVIEWS_PER_PAGE', 50))  # admin review list
+    
+    # Serve random reviews from an in-process pool instead of ORDER BY random()
+    REVIEW_POOL_ENABLED = os.getenv('REVIEW_POOL_ENABLED', 'true').lower() == 'true'
+    REVIEW_POOL_TTL = int(os.getenv('REVIEW_POOL_TTL', 60))  # seconds
+    
+    # Shingle similarity (0-1) at which pending reviews are flagged as near-duplicates
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0.7))
+    # Seconds between background refreshes of the near-duplicate index (0 builds it in requests)
+    NEAR_DUPLICATE_REFRESH_INTERVAL = int(os.getenv('NEAR_DUPLICATE_REFRESH_INTERVAL', 10))
+    
+    # Reviews per /api/next-reviews batch prefetched by the game page
+    NEXT_REVIEWS_BATCH_SIZE = int(os.getenv('NEXT_REVIEWS_BATCH_SIZE', 5))
+    
+    # Server-Timing header and timing log line per request (debugging aid)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+    
+    # Seconds browsers keep static files requested with their content hash
+    STATIC_CACHE_MAX_AGE = int(os.getenv('STATIC_CACHE_MAX_AGE', 31536000))
+    
+    # Buffer votes in memory and write them in batches
+    VOTE_BUFFER_ENABLED = os.getenv('VOTE_BUFFER_ENABLED', 'false').lower() == 'true'
+    VOTE_BUFFER_FLUSH_MS = int(os.getenv('VOTE_BUFFER_FLUSH_MS', 500))
+    VOTE_BUFFER_MAX_PENDING = int(os.getenv('VOTE_BUFFER_MAX_PENDING', 100))
+    
+    # Spread votes over this many counter rows per review (0 disables sharding)
+    VOTE_SHARDS = int(os.getenv('VOTE_SHARDS', 0))
+    VOTE_SHARD_COMPACT_INTERVAL = int(os.getenv('VOTE_SHARD_COMPACT_INTERVAL', 60))  # seconds
+    
+    # Rate limiter backend for review submissions: 'database' or 'memory'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'database')
+    RATE_LIMIT_MAX_ENTRIES = int(os.getenv('RATE_LIMIT_MAX_ENTRIES', 10000))
+    RATE_LIMIT_CLEANUP_INTERVAL = int(os.getenv('RATE_LIMIT_CLEANUP_INTERVAL', 300))  # seconds, 0 disables
+    RATE_LIMIT_CLEANUP_BATCH_SIZE = int(os.getenv('RATE_LIMIT_CLEANUP_BATCH_SIZE', 1000))
+    
+    # SQLite PRAGMAs run on every new connection, empty values are skipped
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # milliseconds
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -20000))  # pages, or KiB if negative
+    
+    # Connection pool for PostgreSQL and other server databases
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
     
     GA_MEASUREMENT_ID = os.environ.get('GA_MEASUREMENT_ID', '')
     
@@ -50,11 +98,19 @@ class TestingConfig(Config):
     SERVER_NAME = 'localhost'
     # Skip admin user creation in tests
     SKIP_ADMIN_CREATION = True
+    # No background threads per test app
+    RATE_LIMIT_CLEANUP_INTERVAL = 0
+    CAPTCHA_POOL_SIZE = 0
+    NEAR_DUPLICATE_REFRESH_INTERVAL = 0
+    # Test databases are thrown away, skip fsyncs
+    SQLITE_SYNCHRONOUS = 'OFF'
 
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = Config.get_database_url()
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
     
     @classmethod
     def validate_config(cls):
@@ -1,12 +1,31 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask import current_app
+from app.utils.background import PeriodicTask
 import sys
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 
+def upgrade_database():
+    """Create missing tables and add the columns and indexes older databases lack.
+    
+    Safe to run repeatedly. Returns the added columns, the tables rebuilt to
+    stop reusing ids, the created indexes and the number of rows whose
+    content hash was backfilled.
+    """
+    from app.utils.db import add_missing_autoincrement, add_missing_columns, create_missing_indexes
+    from app.services.search import create_missing_search_indexes
+    from app.services.review import ReviewService
+    db.create_all()
+    columns = add_missing_columns()
+    rebuilt = add_missing_autoincrement()
+    indexes = create_missing_indexes()
+    create_missing_search_indexes()
+    backfilled = ReviewService.backfill_content_hashes()
+    return columns, rebuilt, indexes, backfilled
+
 def init_admin_user(app):
     """Initialize admin user and import initial data if needed"""
     # Skip admin creation if configured (for testing)
@@ -14,8 +33,28 @@ def init_admin_user(app):
         return
         
     with app.app_context():
-        # Create all tables
+        # Create all tables and add new nullable columns, which is quick and
+        # without which every query on the table fails. Index builds, backfills
+        # and table rebuilds can take long on large tables, so they are left to
+        # `flask upgrade-db` rather than every worker.
         db.create_all()
+        from app.utils.db import add_missing_columns, missing_autoincrement, missing_columns, missing_indexes
+        added = add_missing_columns()
+        missing = missing_columns()
+        if missing:
+            app.logger.error(
+                "Database is missing columns that can't be added automatically: "
+                f"{', '.join(f'{column.table.name}.{column.name}' for column in missing)}"
+            )
+            sys.exit(1)
+        with db.engine.connect() as connection:
+            rebuilds = missing_autoincrement(connection)
+        if added or rebuilds or missing_indexes():
+            app.logger.warning(
+                f"Added columns: {', '.join(added) or 'none'}. Run `flask upgrade-db` to "
+                "finish upgrading the database, until then some queries are slow and "
+                "older reviews are not checked for duplicates"
+            )
         
         # Check for admin user
         from app.models.user import User
@@ -53,7 +92,6 @@ def init_admin_user(app):
                         with open(reviews_file, 'r') as f:
                             data = json.load(f)
                             UserService.import_initial_data(data)
-                            app.logger.info("Imported initial reviews from reviews_export.json")
                     except Exception as e:
                         app.logger.error(f"Failed to import initial reviews: {str(e)}")
                 
@@ -64,8 +102,85 @@ def init_admin_user(app):
 
 def init_extensions(app):
     """Initialize Flask extensions."""
-    # Initialize SQLAlchemy
+    # Initialize SQLAlchemy, with pool sizing for server databases under any
+    # explicit SQLALCHEMY_ENGINE_OPTIONS and SQLite PRAGMAs on each connection
+    from app.utils.db import engine_options, configure_sqlite_engine
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_sqlite_engine(engine, app.config)
+    
+    # Server-Timing header and a timing log line per request, when enabled
+    from app.utils.timing import init_request_timing
+    with app.app_context():
+        init_request_timing(app, db.engines.values())
+    
+    # Process-local pool used to pick random reviews
+    from app.services.review_pool import ReviewPool
+    app.extensions['review_pool'] = ReviewPool(ttl=app.config['REVIEW_POOL_TTL'])
+    
+    # Process-local MinHash index flagging pending reviews that copy approved ones
+    from app.services.near_duplicates import NearDuplicateIndex
+    near_duplicate_index = app.extensions['near_duplicate_index'] = NearDuplicateIndex(
+        threshold=app.config['NEAR_DUPLICATE_THRESHOLD']
+    )
+    if app.config['NEAR_DUPLICATE_REFRESH_INTERVAL']:
+        # Built off the request path, starting with each worker's first request
+        near_duplicate_task = near_duplicate_index.refresh_in_background(
+            app, app.config['NEAR_DUPLICATE_REFRESH_INTERVAL']
+        )
+        app.before_request(near_duplicate_task.start)
+    
+    # Write-behind buffer used when VOTE_BUFFER_ENABLED is set
+    from app.services.vote_buffer import VoteBuffer
+    app.extensions['vote_buffer'] = VoteBuffer(
+        app,
+        flush_interval=app.config['VOTE_BUFFER_FLUSH_MS'] / 1000,
+        max_pending=app.config['VOTE_BUFFER_MAX_PENDING']
+    )
+    
+    # Content-hashed static URLs and precompressed static files
+    from app.utils.http_cache import StaticAssets
+    app.extensions['static_assets'] = StaticAssets(max_age=app.config['STATIC_CACHE_MAX_AGE'])
+    app.extensions['static_assets'].init_app(app)
+    
+    # Rate limiter backend for review submissions
+    from app.services.rate_limit import create_rate_limiter, RateLimitService
+    app.extensions['rate_limiter'] = create_rate_limiter(app.config)
+    
+    # Expire old rate limit rows off the request path
+    if app.config['RATE_LIMIT_CLEANUP_INTERVAL']:
+        cleanup_task = app.extensions['rate_limit_cleanup'] = PeriodicTask(
+            app,
+            'rate-limit-cleanup',
+            app.config['RATE_LIMIT_CLEANUP_INTERVAL'],
+            lambda: RateLimitService.cleanup_old_entries(
+                batch_size=app.config['RATE_LIMIT_CLEANUP_BATCH_SIZE']
+            )
+        )
+        app.before_request(cleanup_task.start)
+    
+    # Folds sharded vote counters back into reviews when VOTE_SHARDS is set
+    from app.services.review import ReviewService
+    app.extensions['vote_shard_compactor'] = PeriodicTask(
+        app,
+        'vote-shard-compaction',
+        app.config['VOTE_SHARD_COMPACT_INTERVAL'],
+        ReviewService.compact_vote_shards
+    )
+    
+    # Pre-rendered captchas, refilled in the background
+    if app.config['CAPTCHA_POOL_SIZE']:
+        from app.services.captcha import CaptchaPool
+        app.extensions['captcha_pool'] = CaptchaPool(
+            app,
+            size=app.config['CAPTCHA_POOL_SIZE'],
+            length=app.config['CAPTCHA_LENGTH']
+        )
     
     # Configure login manager
     login_manager.init_app(app)
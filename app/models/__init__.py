@@ -1,5 +1,5 @@
 from app.models.user import User
-from app.models.review import Review, PendingReview
+from app.models.review import Review, PendingReview, ReviewVoteShard
 from app.models.rate_limit import RateLimit
 
-__all__ = ['User', 'Review', 'PendingReview', 'RateLimit'] 
\ No newline at end of file
+__all__ = ['User', 'Review', 'PendingReview', 'ReviewVoteShard', 'RateLimit'] 
\ No newline at end of file
@@ -9,8 +9,16 @@ class RateLimit(db.Model):
     ip_address = db.Column(db.String(45), unique=True, nullable=False)
     count = db.Column(db.Integer, default=0)
     is_blocked = db.Column(db.Boolean, default=False)
-    last_request = db.Column(db.DateTime, default=datetime.utcnow)
+    last_request = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f'<RateLimit {self.ip_address}>' 
\ No newline at end of file
+        return f'<RateLimit {self.ip_address}>'
+
+# Partial index on the few blocked IPs, read by the memory rate limiter
+db.Index(
+    'ix_rate_limits_blocked',
+    RateLimit.ip_address,
+    sqlite_where=RateLimit.is_blocked == True,
+    postgresql_where=RateLimit.is_blocked == True
+)
@@ -1,10 +1,26 @@
 from datetime import datetime, timezone, UTC
 from app.extensions import db
+from sqlalchemy import event
 from sqlalchemy.sql import func
+import hashlib
+import unicodedata
+
+def normalize_review_text(text):
+    """Normalise case, Unicode forms and whitespace so trivial edits compare equal."""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+def hash_review_text(text):
+    """Hash review text after normalising case, Unicode forms and whitespace."""
+    return hashlib.sha256(normalize_review_text(text).encode('utf-8')).hexdigest()
+
+def _default_content_hash(context):
+    return hash_review_text(context.get_current_parameters()['text'])
 
 class Review(db.Model):
     """Model for storing reviews and their votes."""
     __tablename__ = 'reviews'
+    # Never reuse the id of a deleted review, the near-duplicate index relies on it
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
@@ -16,6 +32,8 @@ class Review(db.Model):
         nullable=False
     )
     is_active = db.Column(db.Boolean, default=True)
+    # Filled in by Core inserts through the default, by the ORM when text is set
+    content_hash = db.Column(db.String(64), default=_default_content_hash, index=True)
 
     @property
     def total_votes(self):
@@ -51,6 +69,10 @@ class Review(db.Model):
         self.votes_headphones = 0
         self.votes_wine = 0
 
+# Keyset pagination of the admin review list, newest first or by vote total
+db.Index('ix_reviews_created_at_id', Review.created_at, Review.id)
+db.Index('ix_reviews_total_votes_id', Review.votes_headphones + Review.votes_wine, Review.id)
+
 class PendingReview(db.Model):
     """Model for storing reviews pending admin approval."""
     __tablename__ = 'pending_reviews'
@@ -64,6 +86,7 @@ class PendingReview(db.Model):
         nullable=False
     )
     status = db.Column(db.String(20), default='pending')
+    content_hash = db.Column(db.String(64), default=_default_content_hash, index=True)
 
     def __repr__(self):
         return f'<PendingReview {self.text[:30]}...>'
@@ -72,4 +95,29 @@ class PendingReview(db.Model):
         """Convert pending review to active review"""
         review = Review(text=self.text, is_active=True)
         db.session.add(review)
-        return review 
\ No newline at end of file
+        return review
+
+# The pending queue: status = 'pending' ordered by created_at
+db.Index('ix_pending_reviews_status_created_at', PendingReview.status, PendingReview.created_at)
+
+@event.listens_for(Review.text, 'set')
+@event.listens_for(PendingReview.text, 'set')
+def _update_content_hash(target, value, oldvalue, initiator):
+    target.content_hash = hash_review_text(value) if value is not None else None
+
+class ReviewVoteShard(db.Model):
+    """Partial vote counts for a review, spread over several rows.
+
+    Used when VOTE_SHARDS is set so concurrent votes on one review don't
+    all wait on the same row lock. Shards are periodically folded back
+    into the review's own vote columns.
+    """
+    __tablename__ = 'review_vote_shards'
+
+    review_id = db.Column(db.Integer, db.ForeignKey('reviews.id', ondelete='CASCADE'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True)
+    votes_headphones = db.Column(db.Integer, nullable=False, default=0)
+    votes_wine = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ReviewVoteShard {self.review_id}:{self.shard}>'
@@ -1,15 +1,25 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, abort, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, abort, current_app, Response, stream_with_context
 from app.models.review import Review, PendingReview
 from app.models.user import User
 from app.utils.decorators import login_required
 from app.extensions import db
-import random
 from app.services.review import ReviewService
 from app.services.rate_limit import RateLimitService
+from app.services.search import SearchService, SEARCHABLE_MODELS
+from app.utils.streaming import gzip_chunks, iter_json_records
+import gzip
 import json
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+EXPORT_MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+IMPORT_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+MAX_REVIEWS_PER_PAGE = 500
+MAX_MODERATION_BATCH = 1000  # ids per batch approve/reject request
+
 @admin_bp.route('/dashboard')
 @login_required
 def dashboard():
@@ -18,8 +28,78 @@ def dashboard():
 @admin_bp.route('/manage-reviews')
 @login_required
 def manage_reviews():
-    reviews = ReviewService.get_all_reviews()
-    return render_template('manage_reviews.html', reviews=reviews)
+    try:
+        reviews, next_cursor = get_reviews_page_from_args()
+    except ValueError:
+        abort(400)
+    return render_template(
+        'manage_reviews.html',
+        reviews=reviews,
+        next_cursor=next_cursor,
+        sort=request.args.get('sort', 'newest'),
+        search=request.args.get('q', ''),
+        sorts=ReviewService.REVIEW_SORTS
+    )
+
+@admin_bp.route('/api/reviews')
+@login_required
+def reviews_page():
+    """Return one page of reviews as JSON for incremental loading"""
+    try:
+        reviews, next_cursor = get_reviews_page_from_args()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({
+        'reviews': [serialize_review(review) for review in reviews],
+        'next_cursor': next_cursor
+    })
+
+@admin_bp.route('/search')
+@login_required
+def search_reviews():
+    """Full-text search over reviews or pending reviews, best matches first"""
+    query = request.args.get('q', '').strip()
+    scope = request.args.get('scope', 'reviews')
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), MAX_REVIEWS_PER_PAGE))
+    if not query:
+        return jsonify({'success': False, 'message': 'Missing search query'}), 400
+    if scope not in SEARCHABLE_MODELS:
+        return jsonify({'success': False, 'message': 'Invalid search scope'}), 400
+    
+    results, has_more = SearchService.search(query, SEARCHABLE_MODELS[scope], page=page, per_page=per_page)
+    return jsonify({
+        'results': [
+            {**serialize_review(review), 'rank': rank} if scope == 'reviews' else {
+                'id': review.id,
+                'text': review.text,
+                'created_at': review.created_at.isoformat() if review.created_at else None,
+                'rank': rank
+            }
+            for review, rank in results
+        ],
+        'page': page,
+        'has_more': has_more
+    })
+
+def get_reviews_page_from_args():
+    """Get the page of reviews described by the cursor, sort, q and per_page args"""
+    per_page = request.args.get('per_page', type=int) or current_app.config['REVIEWS_PER_PAGE']
+    return ReviewService.get_reviews_page(
+        cursor=request.args.get('cursor'),
+        per_page=max(1, min(per_page, MAX_REVIEWS_PER_PAGE)),
+        sort=request.args.get('sort', 'newest'),
+        search=request.args.get('q')
+    )
+
+def serialize_review(review):
+    return {
+        'id': review.id,
+        'text': review.text,
+        'votes_headphones': review.votes_headphones,
+        'votes_wine': review.votes_wine,
+        'created_at': review.created_at.isoformat() if review.created_at else None
+    }
 
 @admin_bp.route('/delete-review/<int:review_id>', methods=['POST'])
 @login_required
@@ -68,7 +148,13 @@ def edit_review(review_id):
 @login_required
 def pending_reviews():
     pending = ReviewService.get_pending_reviews()
-    return render_template('pending_reviews.html', pending_reviews=pending)
+    near_duplicates = ReviewService.find_near_duplicates(pending)
+    return render_template(
+        'pending_reviews.html',
+        pending_reviews=pending,
+        near_duplicates=near_duplicates or {},
+        near_duplicates_loading=near_duplicates is None
+    )
 
 @admin_bp.route('/approve-pending/<int:review_id>', methods=['POST'])
 @login_required
@@ -86,6 +172,67 @@ def reject_pending(review_id):
     flash('Review rejected successfully!', 'success')
     return redirect(url_for('admin.pending_reviews'))
 
+@admin_bp.route('/approve-pending', methods=['POST'])
+@login_required
+def approve_pending_batch():
+    """Approve the selected pending reviews, or all matching a search"""
+    return moderate_pending_batch(ReviewService.approve_pending_reviews, 'approved')
+
+@admin_bp.route('/reject-pending', methods=['POST'])
+@login_required
+def reject_pending_batch():
+    """Reject the selected pending reviews, or all matching a search"""
+    return moderate_pending_batch(ReviewService.reject_pending_reviews, 'rejected')
+
+def moderate_pending_batch(moderate, verb):
+    """Run a batch moderation from form checkboxes or a JSON body.
+    
+    JSON bodies take {"ids": [...]}, {"q": "..."} or {"all": true}, forms
+    the same as review_ids, q and all=true fields.
+    """
+    wants_json = request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        review_ids = data.get('ids')
+        select_all = data.get('all') is True
+    else:
+        data = request.form
+        review_ids = data.getlist('review_ids') or None
+        select_all = data.get('all') == 'true'
+    search = (data.get('q') or '').strip()
+    
+    error = None
+    if review_ids is not None:
+        try:
+            if isinstance(review_ids, (str, bytes)):
+                raise TypeError
+            review_ids = [int(review_id) for review_id in review_ids]
+        except (TypeError, ValueError):
+            error = 'ids must be a list of integers'
+        else:
+            if not review_ids:
+                error = 'No reviews selected'
+            elif len(review_ids) > MAX_MODERATION_BATCH:
+                error = f'At most {MAX_MODERATION_BATCH} reviews can be processed at once'
+    elif not search and not select_all:
+        error = 'No reviews selected'
+    
+    if error:
+        if wants_json:
+            return jsonify({'success': False, 'message': error}), 400
+        flash(error, 'danger')
+        return redirect(url_for('admin.pending_reviews'))
+    
+    result = moderate(review_ids, search)
+    if wants_json:
+        return jsonify({
+            'success': True,
+            'processed': result.processed,
+            'results': {str(review_id): status for review_id, status in result.results.items()}
+        })
+    flash(f'{result.processed} review(s) {verb} successfully!', 'success')
+    return redirect(url_for('admin.pending_reviews'))
+
 @admin_bp.route('/rate-limits', methods=['GET', 'POST'])
 @login_required
 def manage_rate_limits():
@@ -108,6 +255,15 @@ def manage_rate_limits():
     rate_limits = RateLimitService.get_all_rate_limits()
     return render_template('rate_limits.html', rate_limits=rate_limits)
 
+@admin_bp.route('/captcha-pool')
+@login_required
+def captcha_pool_stats():
+    """Report the captcha pool's fill level and hit rate"""
+    pool = current_app.extensions.get('captcha_pool')
+    if pool is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **pool.stats()})
+
 @admin_bp.route('/users')
 @login_required
 def manage_users():
@@ -118,20 +274,14 @@ def manage_users():
 @login_required
 def test_text_display():
     """Display actual reviews to test text container sizing"""
-    reviews = ReviewService.get_all_reviews()
-    
-    # Serialize reviews for JavaScript
-    serialized_reviews = [
-        {
-            'id': review.id,
-            'text': review.text,
-            'votes_headphones': review.votes_headphones,
-            'votes_wine': review.votes_wine
-        }
-        for review in reviews
-    ]
+    reviews, next_cursor = ReviewService.get_reviews_page()
     
-    return render_template('test_text_display.html', reviews=serialized_reviews)
+    # Further pages are fetched from admin.reviews_page as the user pages through
+    return render_template(
+        'test_text_display.html',
+        reviews=[serialize_review(review) for review in reviews],
+        next_cursor=next_cursor
+    )
 
 @admin_bp.route('/reset-votes/<int:review_id>', methods=['POST'])
 @login_required
@@ -148,33 +298,17 @@ def reset_votes(review_id):
 def reset_all_votes():
     """Reset votes for all reviews"""
     try:
-        reviews = db.session.execute(db.select(Review)).scalars().all()
-        for review in reviews:
-            review.votes_headphones = 0
-            review.votes_wine = 0
-        db.session.commit()
+        ReviewService.reset_all_votes()
         return jsonify({'success': True})
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'message': str(e)})
 
 @admin_bp.route('/seed-reviews', methods=['POST'])
 @login_required
 def seed_reviews():
     """Seed reviews with balanced random vote counts"""
-    reviews = Review.query.all()
-    for review in reviews:
-        # Use the same balanced vote generation as ReviewService
-        votes_headphones = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        votes_wine = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        
-        # Ensure minimum vote count doesn't go below 1
-        votes_headphones = max(1, votes_headphones)
-        votes_wine = max(1, votes_wine)
-        
-        review.votes_headphones = votes_headphones
-        review.votes_wine = votes_wine
-    
-    db.session.commit()
+    ReviewService.seed_votes()
 
     # Check if it's an AJAX request
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -186,25 +320,27 @@ def seed_reviews():
 @admin_bp.route('/export-reviews', methods=['GET'])
 @login_required
 def export_reviews():
-    """Export all reviews to a JSON file"""
-    reviews = Review.query.all()
-    export_data = [{
-        'text': review.text,
-        'votes_headphones': review.votes_headphones,
-        'votes_wine': review.votes_wine,
-        'created_at': review.created_at.isoformat() if review.created_at else None
-    } for review in reviews]
+    """Stream all reviews as a JSON (or NDJSON) file, optionally gzipped"""
+    export_format = request.args.get('format', 'json')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'success': False, 'message': 'Invalid export format'}), 400
+    
+    chunks = ReviewService.export_reviews(export_format)
+    filename = f'reviews_export.{export_format}'
+    mimetype = EXPORT_MIMETYPES[export_format]
+    if request.args.get('gzip', 'false').lower() == 'true':
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
     
-    # Create the JSON response with appropriate headers
-    response = jsonify(export_data)
-    response.headers['Content-Disposition'] = 'attachment; filename=reviews_export.json'
-    response.headers['Content-Type'] = 'application/json'
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
     return response
 
 @admin_bp.route('/import-reviews', methods=['POST'])
 @login_required
 def import_reviews():
-    """Import reviews from a JSON file"""
+    """Import reviews from a JSON array or NDJSON file, optionally gzipped"""
     if 'file' not in request.files:
         return jsonify({'success': False, 'message': 'No file uploaded'}), 400
     
@@ -213,45 +349,45 @@ def import_reviews():
     if file.filename == '':
         return jsonify({'success': False, 'message': 'No selected file'}), 400
     
-    if not file.filename.lower().endswith('.json'):
-        return jsonify({'success': False, 'message': 'Invalid file type. Must be JSON'}), 400
+    filename = file.filename.lower()
+    compressed = filename.endswith('.gz')
+    if compressed:
+        filename = filename[:-3]
+    if not filename.endswith(IMPORT_EXTENSIONS):
+        return jsonify({'success': False, 'message': 'Invalid file type. Must be JSON or NDJSON'}), 400
     
-    try:
-        # Read and parse JSON
-        reviews_data = json.load(file)
-        
-        # Validate JSON structure
-        if not isinstance(reviews_data, list):
-            return jsonify({'success': False, 'message': 'Invalid JSON format'}), 400
-        
-        # Optional: Clear existing reviews if checkbox is checked
-        clear_existing = request.form.get('clear_existing', 'false').lower() == 'true'
-        if clear_existing:
-            Review.query.delete()
-        
-        # Import reviews
-        imported_count = 0
-        for review_data in reviews_data:
-            review = Review(
-                text=review_data.get('text', ''),
-                votes_headphones=review_data.get('votes_headphones', 0),
-                votes_wine=review_data.get('votes_wine', 0)
-            )
-            db.session.add(review)
-            imported_count += 1
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True, 
-            'message': f'{imported_count} reviews imported successfully'
-        })
+    stream = gzip.GzipFile(fileobj=file.stream) if compressed else file.stream
+    clear_existing = request.form.get('clear_existing', 'false').lower() in ('true', 'on')
     
-    except json.JSONDecodeError:
-        return jsonify({'success': False, 'message': 'Invalid JSON file'}), 400
+    try:
+        result = ReviewService.import_reviews(iter_json_records(stream), clear_existing=clear_existing)
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
+    
+    if not result.imported and (result.aborted or result.failed):
+        message = 'Import failed, no reviews were imported'
+    elif result.aborted:
+        message = f'Import stopped early, {result.imported} reviews imported'
+    else:
+        message = f'{result.imported} reviews imported successfully'
+    if clear_existing and not result.imported and (result.aborted or result.failed):
+        message += ', existing reviews were kept'
+    if result.duplicates:
+        message += f', {result.duplicates} duplicates skipped'
+    if result.failed:
+        message += f', {result.failed} failed'
+    if result.errors:
+        message += f': {result.errors[0]}'
+    
+    return jsonify({
+        'success': not result.failed and not result.aborted,
+        'message': message,
+        'imported': result.imported,
+        'failed': result.failed,
+        'duplicates': result.duplicates,
+        'errors': result.errors
+    }), 400 if result.aborted else 200
 
 @admin_bp.route('/database-management')
 @login_required
@@ -1,19 +1,23 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, flash, abort, Response
 from app.services.review import ReviewService
 from app.services.captcha import CaptchaService
-from app.utils.decorators import login_required
+from app.utils.decorators import login_required, etag_cached
+from app.utils.http_cache import conditional_response
 from app.services.rate_limit import RateLimitService
 from app.services.user import UserService
 from flask import current_app
 
 bp = Blueprint('main', __name__)
 
+MAX_NEXT_REVIEWS = 20  # reviews per /api/next-reviews request or vote
+MAX_EXCLUDED_REVIEWS = 100  # ids accepted in its exclude parameter
+
 @bp.route('/')
 def index():
     """Landing page."""
     # If user hasn't seen landing page and is not logged in, show it first
     if not session.get('seen_landing') and not session.get('logged_in'):
-        return render_template('landing.html')
+        return conditional_response(render_template('landing.html'))
         
     # Otherwise show the game
     review = ReviewService.get_random_review()
@@ -50,30 +54,89 @@ def start_game():
 
 @bp.route('/vote', methods=['POST'])
 def vote():
+    """Record a vote and return the review's new percentages.
+    
+    With include_next=true the response also carries ``next_reviews``:
+    up to ``next_count`` (default 1) unvoted reviews, picked in the same
+    transaction as the vote so a player needs one request per round.
+    ``exclude`` works as it does for /api/next-reviews.
+    """
     review_id = request.form.get('review_id')
     vote_type = request.form.get('vote_type')
+    include_next = request.form.get('include_next', '').lower() in ('true', '1')
     
     # Validate vote_type
     if vote_type not in ['headphones', 'wine']:
         return jsonify({'error': 'Invalid vote type'}), 400
     
     # Add vote and get updated review
-    review = ReviewService.add_vote(review_id, vote_type)
+    if include_next:
+        count, exclude, error = parse_next_reviews_args(request.form, default_count=1, count_arg='next_count')
+        if error:
+            return error
+        review, next_reviews = ReviewService.add_vote_and_get_next(review_id, vote_type, count, exclude)
+    else:
+        review = ReviewService.add_vote(review_id, vote_type)
     if not review:
         return jsonify({'error': 'Review not found'}), 404
     
     # Track voted reviews in session
     voted_reviews = session.get('voted_reviews', [])
-    if review_id not in voted_reviews:
-        voted_reviews.append(int(review_id))
+    if review.id not in voted_reviews:
+        voted_reviews.append(review.id)
         session['voted_reviews'] = voted_reviews
     
     headphones_percentage, wine_percentage = ReviewService.calculate_vote_percentages(review)
     
-    return jsonify({
+    response = {
         'headphones_percentage': headphones_percentage,
         'wine_percentage': wine_percentage
-    })
+    }
+    if include_next:
+        response['next_reviews'] = [serialize_game_review(next_review) for next_review in next_reviews]
+    return jsonify(response)
+
+@bp.route('/api/next-reviews')
+def next_reviews():
+    """Return a batch of unvoted reviews for the client to prefetch.
+    
+    ``count`` defaults to NEXT_REVIEWS_BATCH_SIZE. ``exclude`` is a comma
+    separated list of review ids the client already has queued.
+    """
+    count, exclude, error = parse_next_reviews_args(
+        request.args, default_count=current_app.config['NEXT_REVIEWS_BATCH_SIZE']
+    )
+    if error:
+        return error
+    
+    reviews = ReviewService.get_next_reviews(count, exclude=exclude)
+    return jsonify({'reviews': [serialize_game_review(review) for review in reviews]})
+
+def parse_next_reviews_args(args, default_count, count_arg='count'):
+    """Read and validate the count and exclude parameters.
+    
+    Returns (count, exclude, error) where error is a 400 response or None.
+    """
+    try:
+        count = int(args.get(count_arg, default_count))
+        exclude = [int(review_id) for review_id in args.get('exclude', '').split(',') if review_id]
+    except ValueError:
+        return None, None, (jsonify({'error': f'{count_arg} and exclude must be integers'}), 400)
+    if not 1 <= count <= MAX_NEXT_REVIEWS:
+        return None, None, (jsonify({'error': f'{count_arg} must be between 1 and {MAX_NEXT_REVIEWS}'}), 400)
+    if len(exclude) > MAX_EXCLUDED_REVIEWS:
+        return None, None, (jsonify({'error': f'At most {MAX_EXCLUDED_REVIEWS} reviews can be excluded'}), 400)
+    return count, exclude, None
+
+def serialize_game_review(review):
+    """Review fields the game page needs, with current vote percentages"""
+    headphones_percentage, wine_percentage = ReviewService.calculate_vote_percentages(review)
+    return {
+        'id': review.id,
+        'text': review.text,
+        'headphones_percentage': headphones_percentage,
+        'wine_percentage': wine_percentage
+    }
 
 def get_client_ip():
     """Get client IP accounting for proxy headers"""
@@ -81,6 +144,12 @@ def get_client_ip():
         return request.headers.get('X-Forwarded-For').split(',')[0].strip()
     return request.remote_addr
 
+def new_captcha_url(is_admin):
+    """Start a new captcha and return its image URL, admins don't get one"""
+    if is_admin:
+        return None
+    return url_for('main.captcha_image', token=CaptchaService.issue_token())
+
 @bp.route('/submit-review', methods=['GET', 'POST'])
 def submit_review():
     """Submit a new review."""
@@ -97,13 +166,15 @@ def submit_review():
             if is_ajax:
                 return jsonify({'success': False, 'error': 'Review text is required'}), 400
             flash('Review text is required', 'error')
-            return render_template('submit_review.html', is_admin=is_admin), 400
+            return render_template('submit_review.html', is_admin=is_admin,
+                                   captcha_url=new_captcha_url(is_admin)), 400
         
         if len(text) > current_app.config['MAX_REVIEW_LENGTH']:
             if is_ajax:
                 return jsonify({'success': False, 'error': 'Review text too long'}), 400
             flash('Review text too long', 'error')
-            return render_template('submit_review.html', is_admin=is_admin), 400
+            return render_template('submit_review.html', is_admin=is_admin,
+                                   captcha_url=new_captcha_url(is_admin)), 400
 
         # Check rate limit using client IP from X-Forwarded-For
         client_ip = get_client_ip()
@@ -111,20 +182,11 @@ def submit_review():
             if is_ajax:
                 return jsonify({'success': False, 'error': 'Too many submissions. Please try again later.'}), 429
             flash('Too many submissions. Please try again later.', 'error')
-            return render_template('submit_review.html', is_admin=is_admin), 429
+            return render_template('submit_review.html', is_admin=is_admin,
+                                   captcha_url=new_captcha_url(is_admin)), 429
         
-        if is_admin:
-            # Admin submissions bypass captcha
-            ReviewService.create_review(text)
-            if is_ajax:
-                return jsonify({
-                    'success': True,
-                    'redirect_url': url_for('admin.manage_reviews')
-                })
-            flash('Review added successfully!', 'success')
-            return redirect(url_for('admin.manage_reviews'))
-        else:
-            # Regular user submissions need captcha
+        if not is_admin:
+            # Regular user submissions need captcha, admin submissions bypass it
             captcha_answer = request.form.get('captcha_answer')
             stored_answer = session.get('captcha_answer')
             
@@ -133,29 +195,42 @@ def submit_review():
                     return jsonify({'success': False, 'error': 'Invalid captcha. Please try again.'})
                 flash('Invalid captcha. Please try again.', 'error')
                 return redirect(url_for('main.submit_review'))
-            
-            # Use client IP from X-Forwarded-For for pending review
-            ReviewService.create_pending_review(text, client_ip)
+        
+        # Reject exact duplicates of existing reviews or submissions. Checked
+        # after the captcha so it can't be used to probe which texts are stored.
+        if ReviewService.is_duplicate(text):
+            if is_ajax:
+                return jsonify({'success': False, 'error': 'This review has already been submitted'}), 409
+            flash('This review has already been submitted', 'error')
+            return render_template('submit_review.html', is_admin=is_admin,
+                                   captcha_url=new_captcha_url(is_admin)), 409
+        
+        if is_admin:
+            ReviewService.create_review(text)
             if is_ajax:
                 return jsonify({
                     'success': True,
-                    'redirect_url': url_for('main.thank_you')
+                    'redirect_url': url_for('admin.manage_reviews')
                 })
-            return redirect(url_for('main.thank_you'))
+            flash('Review added successfully!', 'success')
+            return redirect(url_for('admin.manage_reviews'))
+        
+        # Use client IP from X-Forwarded-For for pending review
+        ReviewService.create_pending_review(text, client_ip)
+        if is_ajax:
+            return jsonify({
+                'success': True,
+                'redirect_url': url_for('main.thank_you')
+            })
+        return redirect(url_for('main.thank_you'))
 
-    # GET request - show the form
-    if not is_admin:
-        captcha_service = CaptchaService()
-        captcha_image, answer = captcha_service.generate_captcha()
-        session['captcha_answer'] = answer
-    else:
-        captcha_image = None
-    
+    # GET request - show the form, the captcha image is fetched separately
     return render_template('submit_review.html', 
                          is_admin=is_admin,
-                         captcha_image=captcha_image)
+                         captcha_url=new_captcha_url(is_admin))
 
 @bp.route('/thank-you')
+@etag_cached
 def thank_you():
     """Thank you page after submitting a review."""
     return render_template('submit_thanks.html', is_admin=False)
@@ -164,12 +239,22 @@ def thank_you():
 def refresh_captcha():
     """Generate a new captcha image"""
     if not session.get('logged_in'):
-        captcha_service = CaptchaService()
-        captcha_image, captcha_text = captcha_service.generate_captcha()
-        session['captcha_answer'] = captcha_text
-        return jsonify({'captcha_image': captcha_image})
+        return jsonify({'captcha_url': new_captcha_url(is_admin=False)})
     return jsonify({'error': 'Unauthorized'}), 401
 
+@bp.route('/captcha.png')
+def captcha_image():
+    """Serve the session's current captcha as a PNG"""
+    if not CaptchaService.verify_token(request.args.get('token')):
+        abort(404)
+    
+    png, answer = CaptchaService().generate_captcha_png()
+    session['captcha_answer'] = answer
+    
+    response = Response(png, mimetype='image/png')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @bp.route('/captcha')
 def get_captcha():
     captcha_service = CaptchaService()
@@ -1,45 +1,152 @@
 from flask import session, current_app
 from captcha.image import ImageCaptcha
+from collections import deque
 import base64, random
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
+from app.utils.background import PeriodicTask
+from app.utils.timing import timed
 import string
 import io
 import os
+import secrets
+import threading
 
 class CaptchaService:
     ALLOWED_CHARS = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'  # Removed confusing chars
     
+    # Get the absolute path to the fonts directory
+    FONT_PATH = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'static', 'fonts', 'OpenSans-Regular.ttf'
+    )
+    
+    # Shared by every CaptchaService in the process, built on first use
+    _image_captcha = None
+    _image_captcha_lock = threading.Lock()
+    
     def __init__(self):
-        # Get the absolute path to the fonts directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        fonts_dir = os.path.join(current_dir, '..', 'static', 'fonts')
-        self.font_path = os.path.join(fonts_dir, 'OpenSans-Regular.ttf')
+        self.font_path = self.FONT_PATH
 
-    def generate_captcha(self):
-        """Generate a CAPTCHA image and text."""
-        # Create image with custom settings
-        image = ImageCaptcha(
-            width=320,          # Increased width
-            height=100,         # Increased height
-            fonts=[self.font_path],  # Use our downloaded font
-            font_sizes=(64, 72, 80)  # Larger font sizes for better readability
-        )
+    @classmethod
+    def get_image_captcha(cls):
+        """Return the process-wide ImageCaptcha, building it and its fonts once."""
+        if cls._image_captcha is None:
+            with cls._image_captcha_lock:
+                if cls._image_captcha is None:
+                    # Create image with custom settings
+                    image = ImageCaptcha(
+                        width=320,          # Increased width
+                        height=100,         # Increased height
+                        fonts=[cls.FONT_PATH],  # Use our downloaded font
+                        font_sizes=(64, 72, 80)  # Larger font sizes for better readability
+                    )
+                    # Load the truetype fonts now instead of lazily on first write
+                    image.truefonts
+                    CaptchaService._image_captcha = image
+        return cls._image_captcha
+
+    def create_captcha(self, length):
+        """Render a random CAPTCHA and return the PNG bytes and its text."""
+        image = self.get_image_captcha()
 
         # Generate random text using allowed chars
-        length = current_app.config['CAPTCHA_LENGTH']
         captcha_text = ''.join(random.choices(self.ALLOWED_CHARS, k=length))
         
-        # Generate image
+        # Generate image. FreeType font objects aren't safe to share between
+        # concurrent renders, so writes are serialised.
         buffered = BytesIO()
-        image.write(captcha_text, buffered)
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        
+        with self._image_captcha_lock:
+            image.write(captcha_text, buffered)
+        return buffered.getvalue(), captcha_text
+
+    def generate_captcha_png(self):
+        """Get a CAPTCHA as raw PNG bytes and its text, from the pool if enabled."""
+        with timed('captcha'):
+            pool = current_app.extensions.get('captcha_pool')
+            if pool is not None:
+                return pool.get()
+            return self.create_captcha(current_app.config['CAPTCHA_LENGTH'])
+
+    def generate_captcha(self):
+        """Generate a CAPTCHA image and text."""
+        png, captcha_text = self.generate_captcha_png()
+        img_str = base64.b64encode(png).decode()
         return img_str, captcha_text
 
+    @staticmethod
+    def issue_token():
+        """Start a new CAPTCHA for this session and return the token for its image URL.
+        
+        The answer is stored when the image itself is fetched.
+        """
+        token = secrets.token_urlsafe(16)
+        session['captcha_token'] = token
+        session.pop('captcha_answer', None)
+        return token
+
+    @staticmethod
+    def verify_token(token):
+        """Check that an image request belongs to the session's current CAPTCHA."""
+        stored = session.get('captcha_token')
+        return bool(token and stored) and secrets.compare_digest(token, stored)
+
     @staticmethod
     def verify_captcha(user_answer, stored_answer):
         """Verify a CAPTCHA answer."""
         if not user_answer or not stored_answer:
             return False
-        return user_answer.upper() == stored_answer.upper()
\ No newline at end of file
+        return user_answer.upper() == stored_answer.upper()
+
+class CaptchaPool:
+    """Bounded pool of pre-rendered CAPTCHAs.
+
+    A background thread keeps up to ``size`` (png, text) pairs ready so
+    requests don't rasterise images themselves. When the pool runs dry a
+    CAPTCHA is rendered synchronously instead.
+    """
+
+    def __init__(self, app, size, length, refill_interval=0.25):
+        self.size = size
+        self.length = length
+        self.hits = 0
+        self.misses = 0
+        self._items = deque()
+        self._service = CaptchaService()
+        self._task = PeriodicTask(app, 'captcha-pool-refill', refill_interval, self.fill)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self):
+        """Pop a pre-rendered CAPTCHA, rendering one if the pool is empty."""
+        self._task.start()
+        try:
+            item = self._items.popleft()
+            self.hits += 1
+        except IndexError:
+            item = self._service.create_captcha(self.length)
+            self.misses += 1
+        return item
+
+    def fill(self):
+        """Render CAPTCHAs until the pool is full. Returns how many were added."""
+        added = 0
+        while len(self._items) < self.size:
+            self._items.append(self._service.create_captcha(self.length))
+            added += 1
+        return added
+
+    def stats(self):
+        """Return the pool's fill level and hit rate."""
+        requests = self.hits + self.misses
+        return {
+            'size': self.size,
+            'available': len(self._items),
+            'fill_level': len(self._items) / self.size if self.size else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0,
+        }
+
+    def stop(self):
+        self._task.stop()
@@ -0,0 +1,257 @@
+from collections import Counter
+from flask import current_app
+from app.models.review import Review, normalize_review_text
+from app.extensions import db
+from app.utils.background import PeriodicTask
+from sqlalchemy import event
+import numpy as np
+import threading
+
+class NearDuplicateIndex:
+    """Process-local MinHash/LSH index over the text of approved reviews.
+
+    Each review is reduced to a MinHash signature of its character
+    shingles, and the signature is cut into bands. Reviews sharing a band
+    with a new text are its candidates, so a lookup reads BANDS hash
+    buckets however many reviews there are. Candidates are then scored by
+    the exact Jaccard similarity of their shingles.
+
+    The index grows incrementally: every lookup first indexes reviews with
+    ids above the highest one seen. Review ids are never reused (the table
+    is AUTOINCREMENT on SQLite), so this covers approvals made by any
+    process, and reviews deleted elsewhere are just not found. invalidate()
+    forces a full reload, for bulk changes and deletes in this process.
+
+    A full build takes seconds on a large table. With
+    refresh_in_background() it runs on a background thread, and lookups
+    return None until it is done instead of building the index themselves.
+    """
+    SHINGLE_SIZE = 5     # bytes of normalised text per shingle
+    BANDS = 10
+    ROWS = 5             # signature values per band, BANDS * ROWS hash functions
+    MAX_CANDIDATES = 20  # per lookup, most shared bands first
+    LOAD_BATCH_SIZE = 250
+    LOOKUP_BATCH_SIZE = 500
+
+    # Bumped by invalidate(); indexes reload when their copy is behind
+    _generation = 0
+
+    def __init__(self, threshold=0.7, seed=1):
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        size = self.BANDS * self.ROWS
+        # Multiply-shift hash functions, odd multipliers so none collapse shingles
+        self._multipliers = rng.integers(0, 2**63, size, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._increments = rng.integers(0, 2**63, size, dtype=np.uint64)
+        self._band_weights = rng.integers(0, 2**63, self.ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._lock = threading.Lock()  # guards the buckets
+        self._build_lock = threading.Lock()
+        self._buckets = [{} for _ in range(self.BANDS)]
+        self._max_id = 0
+        self._loaded_generation = None
+        self._edits = None  # (review_id, text) of edits made during a full build
+        self._task = None
+
+    @classmethod
+    def invalidate(cls):
+        """Mark every index in this process as stale."""
+        cls._generation += 1
+
+    @property
+    def ready(self):
+        """Whether the index has been built since it was last invalidated."""
+        return self._loaded_generation == NearDuplicateIndex._generation
+
+    def refresh_in_background(self, app, interval):
+        """Build the index, then refresh it every ``interval`` seconds, on a thread.
+
+        Returns the task, which starts on the first lookup or when its
+        start() is called.
+        """
+        self._task = PeriodicTask(app, 'near-duplicate-index', interval, self.refresh, delay=0)
+        return self._task
+
+    @classmethod
+    def _encode(cls, text):
+        # Texts shorter than one shingle are padded to form a single shingle
+        return normalize_review_text(text).encode('utf-8').ljust(cls.SHINGLE_SIZE, b'\0')
+
+    @classmethod
+    def _pack(cls, data):
+        """Pack every SHINGLE_SIZE-byte window of ``data`` into one uint64."""
+        count = len(data) - cls.SHINGLE_SIZE + 1
+        packed = data[:count].astype(np.uint64)
+        for offset in range(1, cls.SHINGLE_SIZE):
+            packed <<= np.uint64(8)
+            packed |= data[offset:offset + count]
+        return packed
+
+    @classmethod
+    def shingles(cls, text):
+        """Return the sorted, unique shingles of ``text`` as uint64 values."""
+        return np.unique(cls._pack(np.frombuffer(cls._encode(text), dtype=np.uint8)))
+
+    @staticmethod
+    def similarity(shingles, other):
+        """Jaccard similarity of two arrays from shingles()."""
+        shared = len(np.intersect1d(shingles, other, assume_unique=True))
+        return shared / (len(shingles) + len(other) - shared)
+
+    def _band_keys(self, texts):
+        """Hash each text's MinHash signature into one key per band.
+
+        The texts are shingled and hashed together, with windows that span
+        two texts dropped, since per-text numpy calls dominate otherwise.
+        """
+        encoded = [self._encode(text) for text in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        packed = self._pack(np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        counts = lengths - self.SHINGLE_SIZE + 1
+        offsets = np.cumsum(counts) - counts
+        starts = np.cumsum(lengths) - lengths
+        positions = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+
+        hashed = packed[positions][:, None] * self._multipliers
+        hashed += self._increments
+        hashed >>= np.uint64(32)
+        signatures = np.minimum.reduceat(hashed, offsets, axis=0)
+        bands = signatures.reshape(len(texts), self.BANDS, self.ROWS)
+        return (bands * self._band_weights).sum(axis=2).tolist()
+
+    def _insert(self, buckets, review_ids, texts):
+        for review_id, keys in zip(review_ids, self._band_keys(texts)):
+            for bucket, key in zip(buckets, keys):
+                found = bucket.get(key)
+                if found is None:
+                    bucket[key] = review_id
+                elif isinstance(found, list):
+                    found.append(review_id)
+                else:
+                    bucket[key] = [found, review_id]
+
+    def _load(self, buckets, after_id):
+        """Add reviews with ids above ``after_id`` to ``buckets``, returning the highest id."""
+        rows = db.session.execute(
+            db.select(Review.id, Review.text)
+            .where(Review.id > after_id)
+            .order_by(Review.id)
+            .execution_options(yield_per=self.LOAD_BATCH_SIZE)
+        )
+        for batch in rows.partitions():
+            review_ids, texts = zip(*batch)
+            self._insert(buckets, review_ids, texts)
+            after_id = review_ids[-1]
+        return after_id
+
+    def rebuild(self):
+        """Index every review again, swapping the new index in when it is complete."""
+        with self._build_lock:
+            generation = NearDuplicateIndex._generation
+            with self._lock:
+                self._edits = []
+            buckets = [{} for _ in range(self.BANDS)]
+            try:
+                max_id = self._load(buckets, 0)
+            finally:
+                with self._lock:
+                    edits, self._edits = self._edits, None
+            with self._lock:
+                # The new index may have read an edited text before the edit
+                for review_id, text in edits:
+                    if review_id <= max_id:
+                        self._insert(buckets, [review_id], [text])
+                self._buckets = buckets
+                self._max_id = max_id
+                self._loaded_generation = generation
+
+    def refresh(self, rebuild=True):
+        """Index reviews added since the last refresh, rebuilding a stale index first.
+
+        With rebuild=False a stale index is left alone. Returns whether the
+        index is ready.
+        """
+        if not self.ready:
+            if not rebuild:
+                return False
+            self.rebuild()
+        with self._lock:
+            self._max_id = self._load(self._buckets, self._max_id)
+        return True
+
+    def add(self, review_id, text):
+        """Index new text for a review, e.g. after an edit.
+
+        Reviews above the indexed range are skipped, refresh() picks them up.
+        """
+        with self._lock:
+            if self._edits is not None:
+                self._edits.append((review_id, text))
+            if review_id <= self._max_id:
+                self._insert(self._buckets, [review_id], [text])
+
+    def find_similar(self, texts):
+        """Find indexed reviews similar to each of ``texts``.
+
+        ``texts`` maps any key to a text. Returns a dict mapping the keys
+        that have matches to a list of (review, similarity), most similar
+        first, for similarities of at least ``threshold``. Returns None
+        if the index is being built in the background and isn't ready yet.
+        """
+        if self._task is None:
+            self.refresh()
+        else:
+            self._task.start()
+            if not self.refresh(rebuild=False):
+                return None
+        keys = list(texts)
+        if not keys:
+            return {}
+        all_band_keys = self._band_keys([texts[key] for key in keys])
+
+        candidates = {}
+        with self._lock:
+            for key, band_keys in zip(keys, all_band_keys):
+                shared_bands = Counter()
+                for bucket, band_key in zip(self._buckets, band_keys):
+                    found = bucket.get(band_key)
+                    if found is not None:
+                        shared_bands.update(found if isinstance(found, list) else (found,))
+                candidates[key] = [
+                    review_id for review_id, _ in shared_bands.most_common(self.MAX_CANDIDATES)
+                ]
+
+        # Reviews deleted since they were indexed are simply not found here
+        review_ids = list(set().union(*candidates.values()))
+        reviews = {}
+        for start in range(0, len(review_ids), self.LOOKUP_BATCH_SIZE):
+            batch = review_ids[start:start + self.LOOKUP_BATCH_SIZE]
+            reviews.update(
+                (review.id, review)
+                for review in db.session.scalars(db.select(Review).where(Review.id.in_(batch)))
+            )
+
+        review_shingles = {}
+        results = {}
+        for key in keys:
+            shingles = self.shingles(texts[key])
+            matches = []
+            for review_id in candidates[key]:
+                review = reviews.get(review_id)
+                if review is None:
+                    continue
+                if review_id not in review_shingles:
+                    review_shingles[review_id] = self.shingles(review.text)
+                similarity = self.similarity(shingles, review_shingles[review_id])
+                if similarity >= self.threshold:
+                    matches.append((review, similarity))
+            if matches:
+                results[key] = sorted(matches, key=lambda match: match[1], reverse=True)
+        return results
+
+def get_near_duplicate_index():
+    """Get the near-duplicate index for the current application."""
+    return current_app.extensions['near_duplicate_index']
+
+@event.listens_for(Review, 'after_delete')
+def _invalidate_near_duplicate_indexes(mapper, connection, target):
+    NearDuplicateIndex.invalidate()
@@ -1,6 +1,129 @@
 from datetime import datetime, timezone, timedelta, UTC
+from collections import OrderedDict
+from flask import current_app
 from app.models.rate_limit import RateLimit
 from app.extensions import db
+from app.utils.db import dialect_insert
+from sqlalchemy import case, literal, or_
+import threading
+import time
+
+class DatabaseRateLimiter:
+    """Rate limiter that counts requests in the rate_limits table."""
+
+    def check(self, ip_address, limit, window):
+        """Count a request with a single upsert.
+        
+        Rows whose last request fell outside the window start counting from
+        one again, so stale entries don't need deleting first. Blocks stay
+        in place until the IP has been quiet for a whole window.
+        """
+        now = datetime.now(UTC)
+        stale = RateLimit.last_request < now - timedelta(seconds=window)
+        
+        stmt = dialect_insert(RateLimit).values(
+            ip_address=ip_address,
+            count=1,
+            is_blocked=1 >= limit,
+            last_request=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RateLimit.ip_address],
+            set_={
+                'count': case((stale, 1), else_=RateLimit.count + 1),
+                'is_blocked': case(
+                    (stale, literal(1 >= limit)),
+                    else_=or_(RateLimit.is_blocked, RateLimit.count + 1 >= limit)
+                ),
+                'last_request': now,
+            }
+        ).returning(RateLimit.count, RateLimit.is_blocked)
+        
+        count, is_blocked = db.session.execute(stmt).one()
+        db.session.commit()
+        return not is_blocked
+
+    def block_changed(self, ip_address, is_blocked):
+        """Nothing to do, block state is read from the table on every check."""
+
+class MemoryRateLimiter:
+    """In-process sliding-window rate limiter.
+
+    Each IP keeps the request counts of the current and previous fixed
+    windows. The previous count is weighted by how much of it still
+    overlaps the sliding window, so a check is O(1) and never touches the
+    database. At most ``max_entries`` IPs are tracked; the least recently
+    seen are evicted first.
+
+    Blocks set by admins are still stored in the rate_limits table. The set
+    of blocked IPs is cached for ``block_cache_ttl`` seconds.
+    """
+
+    def __init__(self, max_entries=10000, block_cache_ttl=30, clock=time.time):
+        self.max_entries = max_entries
+        self.block_cache_ttl = block_cache_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # ip -> [window index, previous count, current count]
+        self._blocked = frozenset()
+        self._blocked_loaded_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _blocked_ips(self):
+        now = time.monotonic()
+        if self._blocked_loaded_at is None or now - self._blocked_loaded_at > self.block_cache_ttl:
+            self._blocked = frozenset(db.session.execute(
+                db.select(RateLimit.ip_address).filter_by(is_blocked=True)
+            ).scalars())
+            self._blocked_loaded_at = now
+        return self._blocked
+
+    def check(self, ip_address, limit, window):
+        if ip_address in self._blocked_ips():
+            return False
+
+        now = self.clock()
+        window_index = int(now // window)
+        with self._lock:
+            entry = self._entries.get(ip_address)
+            if entry is None:
+                entry = self._entries[ip_address] = [window_index, 0, 0]
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(ip_address)
+                if entry[0] != window_index:
+                    entry[1] = entry[2] if entry[0] == window_index - 1 else 0
+                    entry[0], entry[2] = window_index, 0
+            entry[2] += 1
+
+            elapsed = (now - window_index * window) / window
+            estimate = entry[1] * (1 - elapsed) + entry[2]
+        return estimate < limit
+
+    def block_changed(self, ip_address, is_blocked):
+        """Apply an admin block or unblock without waiting for the cache."""
+        if is_blocked:
+            self._blocked = self._blocked | {ip_address}
+        else:
+            self._blocked = self._blocked - {ip_address}
+            with self._lock:
+                self._entries.pop(ip_address, None)
+
+def create_rate_limiter(config):
+    """Create the rate limiter selected by RATE_LIMIT_BACKEND."""
+    backend = config['RATE_LIMIT_BACKEND']
+    if backend == 'memory':
+        return MemoryRateLimiter(max_entries=config['RATE_LIMIT_MAX_ENTRIES'])
+    if backend == 'database':
+        return DatabaseRateLimiter()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+def get_rate_limiter():
+    """Get the rate limiter for the current application."""
+    return current_app.extensions['rate_limiter']
 
 class RateLimitService:
     @staticmethod
@@ -23,26 +146,7 @@ class RateLimitService:
     @staticmethod
     def check_rate_limit(ip_address, limit=5, window=3600):
         """Check if an IP has exceeded the rate limit"""
-        # Clean up old entries first
-        window_start = datetime.now(UTC) - timedelta(seconds=window)
-        RateLimitService.cleanup_old_entries(window_start)
-        
-        rate_limit = db.session.execute(
-            db.select(RateLimit).filter_by(ip_address=ip_address)
-        ).scalar()
-        
-        if rate_limit:
-            rate_limit.count += 1
-            rate_limit.last_request = datetime.now(UTC)
-            if rate_limit.count >= limit:
-                rate_limit.is_blocked = True
-                db.session.commit()
-                return False
-        else:
-            rate_limit = RateLimitService.create_rate_limit(ip_address)
-            
-        db.session.commit()
-        return True
+        return get_rate_limiter().check(ip_address, limit, window)
 
     @staticmethod
     def block_ip(ip_address):
@@ -54,6 +158,7 @@ class RateLimitService:
         else:
             rate_limit.is_blocked = True
         db.session.commit()
+        get_rate_limiter().block_changed(ip_address, True)
 
     @staticmethod
     def unblock_ip(ip_address):
@@ -63,17 +168,44 @@ class RateLimitService:
             rate_limit.is_blocked = False
             rate_limit.count = 0
             db.session.commit()
+        get_rate_limiter().block_changed(ip_address, False)
 
     @staticmethod
-    def cleanup_old_entries(cutoff=None):
-        """Remove rate limit entries older than cutoff"""
+    def cleanup_old_entries(cutoff=None, batch_size=None):
+        """Remove rate limit entries older than cutoff.
+        
+        Blocked IPs are kept however old their last request is, since the
+        memory backend never refreshes it. With a batch_size, rows are deleted and committed in batches so a
+        large backlog doesn't hold the write lock for long. Returns the
+        number of rows deleted.
+        """
         if cutoff is None:
             cutoff = datetime.now(UTC) - timedelta(seconds=3600)
+        # is_blocked is nullable, NULL means not blocked
+        expired = db.and_(RateLimit.last_request < cutoff, RateLimit.is_blocked.is_not(True))
         
-        db.session.execute(
-            db.delete(RateLimit).where(RateLimit.last_request < cutoff)
-        )
-        db.session.commit()
+        if not batch_size:
+            result = db.session.execute(
+                db.delete(RateLimit).where(expired)
+            )
+            db.session.commit()
+            return result.rowcount
+        
+        deleted = 0
+        while True:
+            batch = (
+                db.select(RateLimit.id)
+                .where(expired)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = db.session.execute(
+                db.delete(RateLimit).where(RateLimit.id.in_(batch))
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
 
     @staticmethod
     def delete_rate_limit(ip_address):
@@ -82,5 +214,6 @@ class RateLimitService:
         if rate_limit:
             db.session.delete(rate_limit)
             db.session.commit()
+            get_rate_limiter().block_changed(ip_address, False)
             return True
-        return False 
\ No newline at end of file
+        return False 
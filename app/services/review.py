@@ -1,13 +1,40 @@
 from flask import abort
-from app.models.review import Review, PendingReview
+from app.models.review import Review, PendingReview, ReviewVoteShard, hash_review_text
 from app.extensions import db
+from app.utils.db import dialect_insert, random_integer
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.review_pool import ReviewPool, get_review_pool
+from app.services.near_duplicates import NearDuplicateIndex, get_near_duplicate_index
+from app.services.search import SearchService
+from app.services.vote_buffer import get_vote_buffer
+from collections import namedtuple
+import json
 import random
-from flask import session
-from sqlalchemy import func
+import time
+from flask import session, current_app
+from datetime import datetime
+from sqlalchemy import func, bindparam, tuple_, type_coerce
+
+VoteCounts = namedtuple('VoteCounts', ['id', 'votes_headphones', 'votes_wine'])
+ImportResult = namedtuple('ImportResult', ['imported', 'failed', 'duplicates', 'errors', 'aborted'])
+ModerationResult = namedtuple('ModerationResult', ['processed', 'results'])
 
 class ReviewService:
     BASE_VOTES = 50  # Base number of votes to start with
     VARIANCE = 10    # Maximum deviation from base votes
+    VOTE_COLUMNS = {
+        'headphones': Review.votes_headphones,
+        'wine': Review.votes_wine,
+    }
+    MAX_IMPORT_ERRORS = 20  # Error messages kept in an import result
+    SEED_BATCH_SIZE = 10000  # Reviews updated per transaction when seeding votes
+    # Admin review list orderings: sort key and whether it's descending
+    REVIEW_SORTS = {
+        'newest': ('created_at', True),
+        'oldest': ('created_at', False),
+        'most_votes': ('total_votes', True),
+        'fewest_votes': ('total_votes', False),
+    }
 
     @staticmethod
     def get_random_review(voted_reviews=None):
@@ -16,6 +43,13 @@ class ReviewService:
         if voted_reviews is None:
             voted_reviews = session.get('voted_reviews', [])
         
+        if current_app.config.get('REVIEW_POOL_ENABLED'):
+            review_id = get_review_pool().pick(exclude=voted_reviews)
+            review = db.session.get(Review, review_id) if review_id is not None else None
+            if review:
+                return review
+            # The pool is empty or behind the database, fall back to a query
+        
         # First try to get a review that hasn't been voted on
         unvoted_review = Review.query.filter(
             ~Review.id.in_(voted_reviews)
@@ -27,6 +61,93 @@ class ReviewService:
         # If all reviews have been voted on, return any random review
         return Review.query.order_by(func.random()).first()
 
+    @staticmethod
+    def get_next_reviews(count, exclude=None):
+        """Get up to ``count`` random reviews for the game in a single query.
+        
+        Reviews in the session's voted_reviews or in ``exclude`` (e.g. ones
+        the client has already queued) are skipped unless nothing else is
+        left. The review pool picks the ids when enabled, otherwise the
+        database does. Returns rows with the id, text and vote counts, which
+        unlike ORM objects stay readable after the session commits.
+        """
+        if current_app.config.get('REVIEW_POOL_ENABLED'):
+            return ReviewService._load_next_reviews(ReviewService._next_review_ids(count, exclude))
+        
+        exclude = set(session.get('voted_reviews', [])) | set(exclude or ())
+        reviews = db.session.execute(
+            ReviewService._next_review_columns().where(~Review.id.in_(exclude)).order_by(func.random()).limit(count)
+        ).all()
+        if reviews:
+            return reviews
+        # Everything has been voted on, any reviews will do
+        return db.session.execute(
+            ReviewService._next_review_columns().order_by(func.random()).limit(count)
+        ).all()
+
+    @staticmethod
+    def _next_review_columns():
+        return db.select(Review.id, Review.text, Review.votes_headphones, Review.votes_wine)
+
+    @staticmethod
+    def _next_review_ids(count, exclude=None):
+        """Pick the ids get_next_reviews() would return, from the pool or the database."""
+        exclude = set(session.get('voted_reviews', [])) | set(exclude or ())
+        if current_app.config.get('REVIEW_POOL_ENABLED'):
+            return get_review_pool().sample(count, exclude=exclude)
+        review_ids = db.session.scalars(
+            db.select(Review.id).where(~Review.id.in_(exclude)).order_by(func.random()).limit(count)
+        ).all()
+        return review_ids or db.session.scalars(
+            db.select(Review.id).order_by(func.random()).limit(count)
+        ).all()
+
+    @staticmethod
+    def _load_next_reviews(review_ids):
+        """Load game rows for ``review_ids`` by primary key, keeping their order."""
+        if not review_ids:
+            return []
+        reviews = {
+            review.id: review
+            for review in db.session.execute(
+                ReviewService._next_review_columns().where(Review.id.in_(review_ids))
+            )
+        }
+        return [reviews[review_id] for review_id in review_ids if review_id in reviews]
+
+    @staticmethod
+    def add_vote_and_get_next(review_id, vote_type, count=1, exclude=None):
+        """Add a vote and load the next reviews in one transaction.
+        
+        Returns the vote counts as add_vote() does and a list of up to
+        ``count`` reviews chosen as get_next_reviews() does, never including
+        the review just voted on unless nothing else is left. Returns
+        (None, []) if the review doesn't exist.
+        
+        The next reviews are picked before the vote, since that can reload
+        the review pool or scan the table, and the read transaction is
+        ended. Only the UPDATE and a primary key lookup then run while the
+        write lock is held.
+        """
+        try:
+            review_id = int(review_id)
+        except (TypeError, ValueError):
+            return None, []
+        
+        try:
+            next_ids = ReviewService._next_review_ids(count, exclude={review_id, *(exclude or ())})
+            db.session.commit()
+            counts = ReviewService.add_vote(review_id, vote_type, commit=False)
+            if counts is None:
+                db.session.rollback()
+                return None, []
+            next_reviews = ReviewService._load_next_reviews(next_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return counts, next_reviews
+
     @staticmethod
     def calculate_vote_percentages(review):
         """Calculate vote percentages for a review, ensuring they total 100%."""
@@ -64,16 +185,210 @@ class ReviewService:
         return headphones_percentage, wine_percentage
 
     @staticmethod
-    def add_vote(review_id, vote_type):
-        """Add a vote to a review."""
-        review = db.session.get(Review, review_id)
-        if review:
-            if vote_type == 'headphones':
-                review.votes_headphones += 1
-            elif vote_type == 'wine':
-                review.votes_wine += 1
+    def add_vote(review_id, vote_type, commit=True):
+        """Add a vote to a review.
+        
+        The increment is a single UPDATE ... RETURNING so concurrent votes
+        can't overwrite each other. Returns a row with the review's id and
+        updated vote counts, or None if the review doesn't exist. With
+        commit=False the vote is left in the session's transaction for the
+        caller to commit.
+        """
+        try:
+            review_id = int(review_id)
+        except (TypeError, ValueError):
+            return None
+        
+        column = ReviewService.VOTE_COLUMNS.get(vote_type)
+        counts_query = db.select(Review.id, Review.votes_headphones, Review.votes_wine)
+        if column is None:
+            return db.session.execute(counts_query.where(Review.id == review_id)).first()
+        
+        if current_app.config.get('VOTE_BUFFER_ENABLED'):
+            return ReviewService._add_buffered_vote(review_id, vote_type)
+        if current_app.config.get('VOTE_SHARDS'):
+            return ReviewService._add_sharded_vote(review_id, vote_type, commit)
+        
+        stmt = (
+            db.update(Review)
+            .where(Review.id == review_id)
+            .values({column: column + 1})
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.get_bind().dialect.update_returning:
+            counts = db.session.execute(
+                stmt.returning(Review.id, Review.votes_headphones, Review.votes_wine)
+            ).first()
+        else:
+            db.session.execute(stmt)
+            counts = db.session.execute(counts_query.where(Review.id == review_id)).first()
+        if commit:
             db.session.commit()
-        return review
+        
+        if counts:
+            get_review_pool().update_counts(*counts)
+        return counts
+
+    @staticmethod
+    def _add_buffered_vote(review_id, vote_type):
+        """Queue a vote in the write-behind buffer.
+        
+        The returned counts are the last known totals plus votes still
+        waiting to be flushed.
+        """
+        counts = None
+        if current_app.config.get('REVIEW_POOL_ENABLED'):
+            pool = get_review_pool()
+            pool.refresh()
+            counts = pool.counts(review_id)
+        if counts is None:
+            row = db.session.execute(
+                db.select(Review.votes_headphones, Review.votes_wine)
+                .where(Review.id == review_id)
+            ).first()
+            if row is None:
+                return None
+            counts = tuple(row)
+        
+        pending_headphones, pending_wine = get_vote_buffer().add(review_id, vote_type)
+        return VoteCounts(review_id, counts[0] + pending_headphones, counts[1] + pending_wine)
+
+    @staticmethod
+    def _add_sharded_vote(review_id, vote_type, commit=True):
+        """Increment one of VOTE_SHARDS counter rows for the review.
+        
+        The returned counts are the review's compacted totals plus all of
+        its shards, including this vote.
+        """
+        shards = ReviewVoteShard.__table__
+        totals = db.session.execute(
+            db.select(
+                Review.votes_headphones + func.coalesce(func.sum(shards.c.votes_headphones), 0),
+                Review.votes_wine + func.coalesce(func.sum(shards.c.votes_wine), 0)
+            )
+            .outerjoin(shards, shards.c.review_id == Review.id)
+            .where(Review.id == review_id)
+            .group_by(Review.id)
+        ).first()
+        if totals is None:
+            return None
+        
+        column = ReviewService.VOTE_COLUMNS[vote_type].key
+        stmt = dialect_insert(shards).values(
+            review_id=review_id,
+            shard=random.randrange(current_app.config['VOTE_SHARDS']),
+            votes_headphones=0,
+            votes_wine=0,
+        )
+        stmt = stmt.values({column: 1}).on_conflict_do_update(
+            index_elements=[shards.c.review_id, shards.c.shard],
+            set_={column: shards.c[column] + 1}
+        )
+        db.session.execute(stmt)
+        if commit:
+            db.session.commit()
+        current_app.extensions['vote_shard_compactor'].start()
+        
+        votes_headphones, votes_wine = totals
+        if vote_type == 'headphones':
+            votes_headphones += 1
+        else:
+            votes_wine += 1
+        get_review_pool().update_counts(review_id, votes_headphones, votes_wine)
+        return VoteCounts(review_id, votes_headphones, votes_wine)
+
+    @staticmethod
+    def add_vote_counts(deltas):
+        """Add vote deltas to reviews without committing.
+        
+        ``deltas`` maps review ids to (headphones, wine) increments. All
+        reviews are updated with a single executemany.
+        """
+        if not deltas:
+            return
+        table = Review.__table__
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam('b_id'))
+            .values(
+                votes_headphones=table.c.votes_headphones + bindparam('b_headphones'),
+                votes_wine=table.c.votes_wine + bindparam('b_wine'),
+            )
+        )
+        db.session.execute(stmt, [
+            {'b_id': review_id, 'b_headphones': headphones, 'b_wine': wine}
+            for review_id, (headphones, wine) in deltas.items()
+        ])
+
+    @staticmethod
+    def compact_vote_shards():
+        """Fold sharded vote counts into the reviews table.
+        
+        Shard rows are deleted as they are read, so votes landing during
+        compaction simply start new shards. Returns the number of reviews
+        updated.
+        """
+        shards = ReviewVoteShard.__table__
+        columns = (shards.c.review_id, shards.c.votes_headphones, shards.c.votes_wine)
+        if db.session.get_bind().dialect.delete_returning:
+            rows = db.session.execute(shards.delete().returning(*columns)).all()
+        else:
+            rows = db.session.execute(db.select(*columns)).all()
+            db.session.execute(shards.delete())
+        
+        deltas = {}
+        for review_id, votes_headphones, votes_wine in rows:
+            headphones, wine = deltas.get(review_id, (0, 0))
+            deltas[review_id] = (headphones + votes_headphones, wine + votes_wine)
+        
+        ReviewService.add_vote_counts(deltas)
+        db.session.commit()
+        return len(deltas)
+
+    @staticmethod
+    def clear_vote_shards(review_id):
+        """Drop uncompacted votes for a review whose counts are being overwritten."""
+        db.session.execute(
+            db.delete(ReviewVoteShard).where(ReviewVoteShard.review_id == review_id)
+        )
+
+    @staticmethod
+    def is_duplicate(text):
+        """Check whether a review or submission with the same normalised text exists."""
+        content_hash = hash_review_text(text)
+        for model in (Review, PendingReview):
+            if db.session.execute(
+                db.select(model.id).where(model.content_hash == content_hash).limit(1)
+            ).first():
+                return True
+        return False
+
+    @staticmethod
+    def backfill_content_hashes(batch_size=1000):
+        """Hash the text of reviews and submissions stored before content hashes existed."""
+        filled = 0
+        for model in (Review, PendingReview):
+            table = model.__table__
+            stmt = (
+                table.update()
+                .where(table.c.id == bindparam('b_id'))
+                .values(content_hash=bindparam('b_hash'))
+            )
+            while True:
+                rows = db.session.execute(
+                    db.select(table.c.id, table.c.text)
+                    .where(table.c.content_hash.is_(None))
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                db.session.execute(stmt, [
+                    {'b_id': review_id, 'b_hash': hash_review_text(text)}
+                    for review_id, text in rows
+                ])
+                db.session.commit()
+                filled += len(rows)
+        return filled
 
     @staticmethod
     def create_pending_review(text, ip_address=None):
@@ -83,21 +398,18 @@ class ReviewService:
         db.session.commit()
         return review
 
+    @staticmethod
+    def balanced_vote_count():
+        """Return a seed vote count within VARIANCE of BASE_VOTES, never below 1."""
+        return max(1, ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE))
+
     @staticmethod
     def create_review(text):
         """Create a new approved review with balanced seed votes."""
-        # Generate votes that deviate from BASE_VOTES by at most ±VARIANCE
-        votes_headphones = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        votes_wine = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        
-        # Ensure minimum vote count doesn't go below 1
-        votes_headphones = max(1, votes_headphones)
-        votes_wine = max(1, votes_wine)
-        
         review = Review(
             text=text,
-            votes_headphones=votes_headphones,
-            votes_wine=votes_wine
+            votes_headphones=ReviewService.balanced_vote_count(),
+            votes_wine=ReviewService.balanced_vote_count()
         )
         db.session.add(review)
         db.session.commit()
@@ -111,17 +423,10 @@ class ReviewService:
             abort(404)
         
         # Use the same balanced vote generation as create_review
-        votes_headphones = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        votes_wine = ReviewService.BASE_VOTES + random.randint(-ReviewService.VARIANCE, ReviewService.VARIANCE)
-        
-        # Ensure minimum vote count doesn't go below 1
-        votes_headphones = max(1, votes_headphones)
-        votes_wine = max(1, votes_wine)
-        
         review = Review(
             text=pending.text,
-            votes_headphones=votes_headphones,
-            votes_wine=votes_wine
+            votes_headphones=ReviewService.balanced_vote_count(),
+            votes_wine=ReviewService.balanced_vote_count()
         )
         
         pending.status = 'approved'
@@ -129,6 +434,82 @@ class ReviewService:
         db.session.commit()
         return review
 
+    @staticmethod
+    def _moderate_pending_reviews(status, review_ids=None, search=None):
+        """Move pending reviews to ``status`` in one UPDATE ... RETURNING.
+        
+        Only rows still pending are changed, so a review approved or
+        rejected concurrently is not processed twice. Returns the claimed
+        (id, text) rows and a status for every requested id. Reviews
+        matching ``search`` are used when no ids are given, and every
+        pending review when neither is.
+        """
+        statement = db.update(PendingReview).where(PendingReview.status == 'pending')
+        if review_ids is not None:
+            statement = statement.where(PendingReview.id.in_(review_ids))
+        elif search:
+            statement = statement.where(SearchService.match(PendingReview, search))
+        claimed = db.session.execute(
+            statement.values(status=status)
+            .returning(PendingReview.id, PendingReview.text)
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        results = {pending_id: status for pending_id, _ in claimed}
+        if review_ids is not None:
+            unclaimed = set(review_ids) - results.keys()
+            current = dict(db.session.execute(
+                db.select(PendingReview.id, PendingReview.status)
+                .where(PendingReview.id.in_(unclaimed))
+            ).all()) if unclaimed else {}
+            results = {
+                pending_id: results.get(pending_id) or (
+                    f'already_{current[pending_id]}' if pending_id in current else 'not_found'
+                )
+                for pending_id in review_ids
+            }
+        return claimed, results
+
+    @classmethod
+    def approve_pending_reviews(cls, review_ids=None, search=None):
+        """Approve many pending reviews in a single transaction.
+        
+        Takes a list of ids, or a search filter when ids is None (every
+        pending review if that is empty too). The pending rows are claimed
+        with one UPDATE and the reviews created with one executemany
+        INSERT. The result maps each id to 'approved', 'already_approved',
+        'already_rejected' or 'not_found'.
+        """
+        try:
+            claimed, results = cls._moderate_pending_reviews('approved', review_ids, search)
+            if claimed:
+                db.session.execute(db.insert(Review), [
+                    {
+                        'text': text,
+                        'votes_headphones': cls.balanced_vote_count(),
+                        'votes_wine': cls.balanced_vote_count(),
+                    }
+                    for _, text in claimed
+                ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        # Core inserts don't fire the mapper events that keep the pool current
+        ReviewPool.invalidate()
+        return ModerationResult(len(claimed), results)
+
+    @classmethod
+    def reject_pending_reviews(cls, review_ids=None, search=None):
+        """Reject many pending reviews with one UPDATE, see approve_pending_reviews()."""
+        try:
+            claimed, results = cls._moderate_pending_reviews('rejected', review_ids, search)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return ModerationResult(len(claimed), results)
+
     @staticmethod
     def reject_pending_review(review_id):
         """Reject a pending review."""
@@ -148,6 +529,242 @@ class ReviewService:
             .order_by(Review.created_at.desc())
         ).scalars().all()
 
+    @staticmethod
+    def _sort_key(name):
+        """Return the SQL expression a review list is ordered by."""
+        if name == 'total_votes':
+            # Matches the ix_reviews_total_votes_id expression index
+            return Review.votes_headphones + Review.votes_wine
+        if db.session.get_bind().dialect.name == 'sqlite':
+            # SQLite stores timestamps as text in more than one format, so
+            # page boundaries have to compare the stored text, not a datetime
+            return type_coerce(Review.created_at, db.String)
+        return Review.created_at
+
+    @staticmethod
+    def _is_cursor_value(value, value_type):
+        """Whether a decoded cursor value is a ``value_type`` (bools are not ints)."""
+        return isinstance(value, value_type) and not isinstance(value, bool)
+
+    @classmethod
+    def get_reviews_page(cls, cursor=None, per_page=None, sort='newest', search=None):
+        """Get one page of reviews using keyset pagination.
+        
+        Pages are ordered by ``sort`` (a key of REVIEW_SORTS) with the review
+        id as a tie-breaker, and each page starts after the (key, id) encoded
+        in ``cursor``, so deep pages cost the same as the first one. Returns
+        the reviews and the cursor for the next page, or None on the last
+        page. Raises ValueError for an unknown sort or an invalid cursor.
+        """
+        if sort not in cls.REVIEW_SORTS:
+            raise ValueError(f'Unknown sort: {sort}')
+        per_page = per_page or current_app.config['REVIEWS_PER_PAGE']
+        key_name, descending = cls.REVIEW_SORTS[sort]
+        key = cls._sort_key(key_name)
+        
+        query = db.select(Review, key.label('sort_key'))
+        if search:
+            query = query.where(SearchService.match(Review, search))
+        if cursor:
+            values = decode_cursor(cursor)
+            key_type = str if key_name == 'created_at' else int
+            if (len(values) != 3 or values[0] != sort
+                    or not cls._is_cursor_value(values[1], key_type)
+                    or not cls._is_cursor_value(values[2], int)):
+                raise ValueError('Invalid cursor')
+            last_key = values[1]
+            if key_name == 'created_at' and not isinstance(key.type, db.String):
+                last_key = datetime.fromisoformat(last_key)
+            last_key = db.literal(last_key, key.type)
+            boundary = tuple_(last_key, values[2])
+            position = tuple_(key, Review.id)
+            # The plain range on the key lets SQLite seek the expression index
+            if descending:
+                query = query.where(key <= last_key, position < boundary)
+            else:
+                query = query.where(key >= last_key, position > boundary)
+        
+        if descending:
+            query = query.order_by(key.desc(), Review.id.desc())
+        else:
+            query = query.order_by(key, Review.id)
+        rows = db.session.execute(query.limit(per_page + 1)).all()
+        
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            review, last_key = rows[-1]
+            if isinstance(last_key, datetime):
+                last_key = last_key.isoformat()
+            next_cursor = encode_cursor(sort, last_key, review.id)
+        return [review for review, _ in rows], next_cursor
+
+    @staticmethod
+    def export_reviews(export_format='json', batch_size=1000):
+        """Yield an export of all reviews in chunks of up to batch_size reviews.
+        
+        Rows are read with yield_per, which uses a server-side cursor where
+        the database supports one, so memory use doesn't grow with the table.
+        ``export_format`` is 'json' for a JSON array or 'ndjson' for one
+        review per line.
+        """
+        rows = db.session.execute(
+            db.select(Review.text, Review.votes_headphones, Review.votes_wine, Review.created_at)
+            .order_by(Review.id)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        first = True
+        for partition in rows.partitions():
+            lines = [
+                json.dumps({
+                    'text': text,
+                    'votes_headphones': votes_headphones,
+                    'votes_wine': votes_wine,
+                    'created_at': created_at.isoformat() if created_at else None
+                })
+                for text, votes_headphones, votes_wine, created_at in partition
+            ]
+            if export_format == 'ndjson':
+                yield '\n'.join(lines) + '\n'
+            else:
+                yield ('[' if first else ',') + ','.join(lines)
+            first = False
+        
+        if export_format != 'ndjson':
+            yield '[]' if first else ']'
+
+    @staticmethod
+    def _import_row(record):
+        """Validate an imported review and return it as an insert row."""
+        if not isinstance(record, dict):
+            raise ValueError('expected an object')
+        text = record.get('text', '')
+        if not isinstance(text, str):
+            raise ValueError('text must be a string')
+        row = {'text': text, 'content_hash': hash_review_text(text)}
+        for column in ('votes_headphones', 'votes_wine'):
+            try:
+                row[column] = int(record.get(column) or 0)
+            except (TypeError, ValueError):
+                raise ValueError(f'{column} must be an integer') from None
+            if row[column] < 0:
+                raise ValueError(f'{column} must not be negative')
+        return row
+
+    @classmethod
+    def import_reviews(cls, records, batch_size=None, clear_existing=False):
+        """Insert reviews from an iterable of dicts in batches.
+        
+        Each batch is a single executemany INSERT in its own transaction, so
+        a failing batch is rolled back and reported without losing the
+        batches before it. Invalid records are skipped and reported, and so
+        are reviews whose normalised text is already stored or appeared
+        earlier in the file, using one content hash lookup per batch. If
+        reading ``records`` raises ValueError (malformed input), the import
+        stops and the result is marked as aborted.
+        
+        With clear_existing the delete and all batches share one
+        transaction, each batch in a savepoint. It is only committed if the
+        input was read to the end and something was imported (or the input
+        was empty), so a malformed file leaves the existing reviews alone.
+        """
+        batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+        imported = failed = duplicates = 0
+        errors = []
+        aborted = False
+        
+        def record_error(message):
+            if len(errors) < cls.MAX_IMPORT_ERRORS:
+                errors.append(message)
+        
+        def write_batch(rows):
+            nonlocal duplicates
+            seen = set(db.session.scalars(
+                db.select(Review.content_hash)
+                .where(Review.content_hash.in_({row['content_hash'] for row in rows}))
+            ))
+            new_rows = []
+            for row in rows:
+                if row['content_hash'] not in seen:
+                    seen.add(row['content_hash'])
+                    new_rows.append(row)
+            duplicates += len(rows) - len(new_rows)
+            if new_rows:
+                db.session.execute(db.insert(Review), new_rows)
+            return len(new_rows)
+        
+        def insert_batch(rows, first_record, last_record):
+            nonlocal imported, failed
+            try:
+                if clear_existing:
+                    with db.session.begin_nested():
+                        imported += write_batch(rows)
+                else:
+                    inserted = write_batch(rows)
+                    db.session.commit()
+                    imported += inserted
+            except Exception as e:
+                if not clear_existing:
+                    db.session.rollback()
+                failed += len(rows)
+                record_error(f'Records {first_record}-{last_record}: {e}')
+            elapsed = time.perf_counter() - start
+            current_app.logger.info(
+                f"Review import: {imported} imported, {duplicates} duplicates, {failed} failed "
+                f"({(imported + duplicates + failed) / elapsed:.0f} records/sec)"
+            )
+        
+        if clear_existing:
+            db.session.execute(db.delete(ReviewVoteShard))
+            db.session.execute(db.delete(Review))
+        
+        start = time.perf_counter()
+        rows = []
+        first_record = 1
+        records = iter(records)
+        number = 0
+        while True:
+            try:
+                record = next(records)
+            except StopIteration:
+                break
+            except (ValueError, OSError, EOFError) as e:
+                aborted = True
+                record_error(f'Stopped after record {number}: {e}')
+                break
+            
+            number += 1
+            try:
+                rows.append(cls._import_row(record))
+            except ValueError as e:
+                failed += 1
+                record_error(f'Record {number}: {e}')
+                continue
+            
+            if len(rows) >= batch_size:
+                insert_batch(rows, first_record, number)
+                rows = []
+                first_record = number + 1
+        
+        if rows and not (clear_existing and aborted):
+            insert_batch(rows, first_record, number)
+        
+        if clear_existing:
+            if aborted or (failed and not imported):
+                # Keep the existing reviews rather than replacing them with a partial import
+                db.session.rollback()
+                failed += imported
+                imported = 0
+            else:
+                db.session.commit()
+                # Imported ids may reuse ones the near-duplicate index has seen
+                NearDuplicateIndex.invalidate()
+        
+        # Core inserts don't fire the mapper events that keep the pool current
+        ReviewPool.invalidate()
+        return ImportResult(imported, failed, duplicates, errors, aborted)
+
     @staticmethod
     def get_review(review_id):
         """Get a review by ID using the new SQLAlchemy 2.0 style."""
@@ -160,15 +777,82 @@ class ReviewService:
         if review:
             review.votes_headphones = 0
             review.votes_wine = 0
+            ReviewService.clear_vote_shards(review_id)
             db.session.commit()
             return True
         return False
 
+    @staticmethod
+    def reset_all_votes():
+        """Reset votes for every review in a single UPDATE."""
+        db.session.execute(db.delete(ReviewVoteShard))
+        result = db.session.execute(db.update(Review).values(votes_headphones=0, votes_wine=0))
+        db.session.commit()
+        ReviewPool.invalidate()
+        return result.rowcount
+
+    @classmethod
+    def seed_votes(cls, batch_size=None):
+        """Give every review balanced random vote counts.
+        
+        Counts are drawn by the database from BASE_VOTES +/- VARIANCE (at
+        least 1), updating batch_size reviews at a time so each transaction
+        stays short on large tables. Batches are keyset ranges over the
+        existing ids, so gaps in the ids don't add empty batches. Returns the
+        number of reviews updated.
+        """
+        batch_size = batch_size or cls.SEED_BATCH_SIZE
+        low = max(1, cls.BASE_VOTES - cls.VARIANCE)
+        high = cls.BASE_VOTES + cls.VARIANCE
+        
+        total = db.session.scalar(db.select(func.count(Review.id)))
+        db.session.execute(db.delete(ReviewVoteShard))
+        
+        updated = 0
+        last_id = 0
+        while True:
+            # The id that ends the next batch of batch_size existing reviews
+            batch = (
+                db.select(Review.id).where(Review.id > last_id)
+                .order_by(Review.id).limit(batch_size).subquery()
+            )
+            batch_end = db.session.scalar(db.select(func.max(batch.c.id)))
+            if batch_end is None:
+                break
+            result = db.session.execute(
+                db.update(Review)
+                .where(Review.id > last_id, Review.id <= batch_end)
+                .values(
+                    votes_headphones=random_integer(low, high),
+                    votes_wine=random_integer(low, high)
+                )
+            )
+            db.session.commit()
+            updated += result.rowcount
+            last_id = batch_end
+            if total > batch_size:
+                current_app.logger.info(f"Seeded votes for {updated}/{total} reviews")
+        db.session.commit()  # The shard delete, when there are no reviews
+        
+        ReviewPool.invalidate()
+        return updated
+
     @classmethod
     def get_pending_reviews(cls):
         """Get all pending reviews from the database"""
         return PendingReview.query.filter_by(status='pending').order_by(PendingReview.created_at.desc()).all()
 
+    @staticmethod
+    def find_near_duplicates(pending_reviews):
+        """Map pending review ids to approved reviews with similar text.
+        
+        Each value is a list of (review, similarity) pairs, most similar first.
+        Returns None while the near-duplicate index is still being built.
+        """
+        return get_near_duplicate_index().find_similar(
+            {pending.id: pending.text for pending in pending_reviews}
+        )
+
     @staticmethod
     def update_review(review_id, text, votes_headphones=None, votes_wine=None):
         """Update a review's text and optionally its vote counts."""
@@ -176,6 +860,7 @@ class ReviewService:
         if not review:
             return None
         
+        text_changed = review.text != text
         review.text = text
         
         # Update vote counts if provided
@@ -183,8 +868,12 @@ class ReviewService:
             review.votes_headphones = votes_headphones
         if votes_wine is not None:
             review.votes_wine = votes_wine
+        if votes_headphones is not None or votes_wine is not None:
+            ReviewService.clear_vote_shards(review_id)
         
         db.session.commit()
+        if text_changed:
+            get_near_duplicate_index().add(review.id, text)
         return review
 
     @staticmethod
@@ -192,6 +881,7 @@ class ReviewService:
         """Delete a review by ID."""
         review = db.session.get(Review, review_id)
         if review:
+            ReviewService.clear_vote_shards(review_id)
             db.session.delete(review)
             db.session.commit()
             return True
@@ -0,0 +1,161 @@
+from array import array
+from flask import current_app
+from sqlalchemy import event
+from app.models.review import Review
+from app.extensions import db
+import bisect
+import random
+import threading
+import time
+
+class ReviewPool:
+    """Process-local snapshot of review ids and their vote counts.
+
+    Random picks are served from memory instead of an ORDER BY random()
+    scan. The snapshot is reloaded once it is older than ``ttl`` seconds or
+    after reviews are added or removed in this process.
+    """
+    # Random probes before falling back to a linear scan of unvoted ids
+    MAX_ATTEMPTS = 16
+
+    # Bumped by invalidate(); pools reload when their copy is behind
+    _generation = 0
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = (array('q'), array('q'), array('q'))
+        self._loaded_at = None
+        self._loaded_generation = None
+
+    @classmethod
+    def invalidate(cls):
+        """Mark every pool in this process as stale."""
+        cls._generation += 1
+
+    def is_stale(self):
+        return (
+            self._loaded_at is None
+            or self._loaded_generation != ReviewPool._generation
+            or time.monotonic() - self._loaded_at > self.ttl
+        )
+
+    def refresh(self, force=False):
+        """Reload ids and vote counts from the database if stale."""
+        if not force and not self.is_stale():
+            return
+        with self._lock:
+            if not force and not self.is_stale():
+                return
+            generation = ReviewPool._generation
+            ids, headphones, wine = array('q'), array('q'), array('q')
+            rows = db.session.execute(
+                db.select(Review.id, Review.votes_headphones, Review.votes_wine)
+                .order_by(Review.id)
+            )
+            for review_id, votes_headphones, votes_wine in rows:
+                ids.append(review_id)
+                headphones.append(votes_headphones or 0)
+                wine.append(votes_wine or 0)
+            self._snapshot = (ids, headphones, wine)
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._snapshot[0])
+
+    def pick(self, exclude=()):
+        """Return a random review id, preferring ids not in ``exclude``."""
+        self.refresh()
+        ids = self._snapshot[0]
+        if not ids:
+            return None
+
+        if not isinstance(exclude, (set, frozenset)):
+            exclude = set(exclude)
+
+        if len(exclude) < len(ids):
+            for _ in range(self.MAX_ATTEMPTS):
+                candidate = ids[random.randrange(len(ids))]
+                if candidate not in exclude:
+                    return candidate
+            # Most ids are excluded, so probing is unlikely to succeed
+            remaining = [review_id for review_id in ids if review_id not in exclude]
+            if remaining:
+                return random.choice(remaining)
+
+        # Everything has been voted on, any review will do
+        return ids[random.randrange(len(ids))]
+
+    def sample(self, count, exclude=()):
+        """Return up to ``count`` distinct random review ids not in ``exclude``.
+        
+        If every id is excluded, up to ``count`` of any ids are returned.
+        """
+        self.refresh()
+        ids = self._snapshot[0]
+        if not ids or count <= 0:
+            return []
+
+        if not isinstance(exclude, (set, frozenset)):
+            exclude = set(exclude)
+
+        picked = {}
+        if len(exclude) < len(ids):
+            for _ in range(self.MAX_ATTEMPTS * count):
+                candidate = ids[random.randrange(len(ids))]
+                if candidate not in exclude:
+                    picked[candidate] = None
+                    if len(picked) == count:
+                        return list(picked)
+            # Most ids are excluded or already picked, sample what's left
+            remaining = [
+                review_id for review_id in ids
+                if review_id not in exclude and review_id not in picked
+            ]
+            picked.update(dict.fromkeys(random.sample(remaining, min(count - len(picked), len(remaining)))))
+            if picked:
+                return list(picked)
+
+        # Everything has been voted on, any reviews will do
+        return random.sample(list(ids), min(count, len(ids)))
+
+    @staticmethod
+    def _position(ids, review_id):
+        position = bisect.bisect_left(ids, review_id)
+        if position < len(ids) and ids[position] == review_id:
+            return position
+        return None
+
+    def counts(self, review_id):
+        """Return the last known (headphones, wine) counts for a review."""
+        ids, headphones, wine = self._snapshot
+        position = self._position(ids, review_id)
+        if position is None:
+            return None
+        return headphones[position], wine[position]
+
+    def update_counts(self, review_id, votes_headphones, votes_wine):
+        """Record fresher vote counts for a review already in the pool."""
+        ids, headphones, wine = self._snapshot
+        position = self._position(ids, review_id)
+        if position is not None:
+            headphones[position] = votes_headphones
+            wine[position] = votes_wine
+
+    def add_counts(self, review_id, votes_headphones, votes_wine):
+        """Add votes written elsewhere in this process to a review's counts."""
+        ids, headphones, wine = self._snapshot
+        position = self._position(ids, review_id)
+        if position is not None:
+            headphones[position] += votes_headphones
+            wine[position] += votes_wine
+
+def get_review_pool():
+    """Get the review pool for the current application."""
+    return current_app.extensions['review_pool']
+
+@event.listens_for(Review, 'after_insert')
+@event.listens_for(Review, 'after_delete')
+def _invalidate_review_pools(mapper, connection, target):
+    ReviewPool.invalidate()
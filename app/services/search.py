@@ -0,0 +1,188 @@
+from flask import current_app
+from sqlalchemy import event, exc, func, literal_column, text
+from app.models.review import Review, PendingReview
+from app.extensions import db
+import re
+
+# Text search language for PostgreSQL's to_tsvector
+SEARCH_LANGUAGE = 'english'
+
+# SQLite searches with more matches than this return the newest first, since
+# bm25 has to read every match of a common term and barely separates them
+MAX_RANKED_MATCHES = 500
+
+SEARCHABLE_MODELS = {
+    'reviews': Review,
+    'pending': PendingReview,
+}
+
+def _fts_table(table_name):
+    return f'{table_name}_fts'
+
+def _sqlite_search_ddl(table_name):
+    """Statements for an FTS5 index kept in sync with ``table_name`` by triggers."""
+    fts = _fts_table(table_name)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"text, content='{table_name}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, text) VALUES ('delete', old.id, old.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF text ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, text) VALUES ('delete', old.id, old.text); "
+        f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    ]
+
+def create_search_index(connection, table_name, rebuild=False):
+    """Create the full-text index for a table if the database supports one.
+
+    SQLite gets an FTS5 external-content table maintained by triggers and
+    PostgreSQL a GIN index on to_tsvector(text). Other databases, or SQLite
+    builds without FTS5, are searched with LIKE instead.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        fts = _fts_table(table_name)
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': fts}
+        ).first()
+        try:
+            for statement in _sqlite_search_ddl(table_name):
+                connection.execute(text(statement))
+        except exc.OperationalError as e:
+            current_app.logger.warning(f"Full-text search unavailable for {table_name}: {e}")
+            return
+        if rebuild or not exists:
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_text_search ON {table_name} "
+            f"USING gin (to_tsvector('{SEARCH_LANGUAGE}', text))"
+        ))
+
+def create_missing_search_indexes():
+    """Create full-text indexes for tables that existed before search was added."""
+    with db.engine.begin() as connection:
+        for model in SEARCHABLE_MODELS.values():
+            create_search_index(connection, model.__tablename__)
+
+def _sqlite_fts_available(table_name):
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': _fts_table(table_name)}
+    ).first() is not None
+
+def _fts5_query(query):
+    """Quote each word so user input can't use FTS5 query syntax.
+
+    Words are ANDed together. Prefix queries aren't used, they are an order
+    of magnitude slower without a prefix index.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join('"' + word + '"' for word in words)
+
+class SearchService:
+    @staticmethod
+    def _fts_matches(table_name, fts_query, ranked=False):
+        """Select the rowid, and optionally the bm25 rank, of FTS5 rows matching fts_query."""
+        fts = _fts_table(table_name)
+        columns = [literal_column('rowid').label('id')]
+        if ranked:
+            # Computing the rank reads every row matching each term
+            columns.append(literal_column('rank').label('rank'))
+        return (
+            db.select(*columns)
+            .select_from(text(fts))
+            .where(text(f'{fts} MATCH :fts_query').bindparams(fts_query=fts_query))
+        )
+
+    @staticmethod
+    def match(model, query):
+        """Return a filter clause matching ``query`` against model.text."""
+        table_name = model.__tablename__
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect == 'sqlite' and _sqlite_fts_available(table_name):
+            fts_query = _fts5_query(query)
+            if fts_query is None:
+                return db.false()
+            matches = SearchService._fts_matches(table_name, fts_query).subquery()
+            return model.id.in_(db.select(matches.c.id))
+
+        if dialect == 'postgresql':
+            return func.to_tsvector(SEARCH_LANGUAGE, model.text).op('@@')(
+                func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+            )
+
+        return model.text.contains(query, autoescape=True)
+
+    @staticmethod
+    def search(query, model=Review, page=1, per_page=20):
+        """Search model.text, best matches first.
+
+        Returns (results, has_more) where results is a list of
+        (instance, rank) for the requested 1-based page. Lower ranks are
+        better. The rank is None, and results are newest first, when the
+        database has no full-text index and LIKE is used instead, or on
+        SQLite when there are more than MAX_RANKED_MATCHES matches. Pending
+        reviews are limited to ones that are still pending.
+        """
+        table_name = model.__tablename__
+        dialect = db.session.get_bind().dialect.name
+        offset = (page - 1) * per_page
+        filters = [PendingReview.status == 'pending'] if model is PendingReview else []
+
+        if dialect == 'sqlite' and _sqlite_fts_available(table_name):
+            fts_query = _fts5_query(query)
+            if fts_query is None:
+                return [], False
+            probe = SearchService._fts_matches(table_name, fts_query).limit(MAX_RANKED_MATCHES + 1)
+            match_count = db.session.execute(
+                db.select(func.count()).select_from(probe.subquery())
+            ).scalar()
+            if match_count > MAX_RANKED_MATCHES:
+                rank = None
+                matches = SearchService._fts_matches(table_name, fts_query).order_by(text('rowid DESC'))
+                if not filters:
+                    # FTS5 can stop after the page instead of visiting every match
+                    matches = matches.limit(per_page + 1).offset(offset)
+                    offset = 0
+                matches = matches.subquery()
+                statement = db.select(model, db.null())
+            else:
+                matches = SearchService._fts_matches(table_name, fts_query, ranked=True).subquery()
+                rank = matches.c.rank
+                statement = db.select(model, rank)
+            statement = statement.join(matches, model.id == matches.c.id)
+        elif dialect == 'postgresql':
+            document = func.to_tsvector(SEARCH_LANGUAGE, model.text)
+            tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+            rank = -func.ts_rank(document, tsquery)
+            statement = db.select(model, rank).where(document.op('@@')(tsquery))
+        else:
+            rank = None
+            statement = db.select(model, db.null()).where(SearchService.match(model, query))
+
+        statement = statement.where(*filters)
+        if rank is not None:
+            statement = statement.order_by(rank, model.id.desc())
+        else:
+            statement = statement.order_by(model.id.desc())
+
+        rows = db.session.execute(statement.limit(per_page + 1).offset(offset)).all()
+        return [tuple(row) for row in rows[:per_page]], len(rows) > per_page
+
+def _create_search_index(table, connection, **kw):
+    create_search_index(connection, table.name, rebuild=True)
+
+def _drop_search_index(table, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f'DROP TABLE IF EXISTS {_fts_table(table.name)}'))
+
+for _model in SEARCHABLE_MODELS.values():
+    event.listen(_model.__table__, 'after_create', _create_search_index)
+    event.listen(_model.__table__, 'before_drop', _drop_search_index)
@@ -1,6 +1,10 @@
 from app.models.user import User
 from app.extensions import db
+from datetime import datetime, UTC
+from flask import current_app
+from itertools import groupby
 from werkzeug.security import check_password_hash, generate_password_hash
+import time
 
 class UserService:
     @staticmethod
@@ -63,54 +67,88 @@ class UserService:
         return admin
 
     @staticmethod
-    def import_initial_data(data):
-        """Import initial data from JSON"""
+    def _insert_in_batches(model, rows, batch_size):
+        """Insert rows with one executemany per batch of rows sharing the same keys."""
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            for _, group in groupby(batch, key=lambda row: row.keys()):
+                db.session.execute(db.insert(model), list(group))
+
+    @staticmethod
+    def import_initial_data(data, batch_size=None):
+        """Import initial data from JSON
+        
+        Accepts the reviews export format (a list of reviews) or the legacy
+        format (a dict with 'users' and 'reviews'). Everything is inserted in
+        one transaction using batched executemany INSERTs. Returns the number
+        of reviews and users imported.
+        """
+        from app.models.review import Review
+        from app.services.review_pool import ReviewPool
+        
+        batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+        start = time.perf_counter()
+        review_rows = []
+        users = []
+        skipped_users = 0
+        
         try:
-            # Handle reviews import
-            from app.models.review import Review
-            from datetime import datetime
-            
-            print(f"Importing data: {data}")  # Debug print
-            
             # If data is a list, it's the reviews export format
             if isinstance(data, list):
+                now = datetime.now(UTC)
                 for review_data in data:
-                    review = Review(
-                        id=review_data.get('id'),
-                        text=review_data['text'],
-                        votes_headphones=review_data.get('votes_headphones', 0),
-                        votes_wine=review_data.get('votes_wine', 0),
-                        created_at=datetime.fromisoformat(
+                    row = {
+                        'text': review_data['text'],
+                        'votes_headphones': review_data.get('votes_headphones', 0),
+                        'votes_wine': review_data.get('votes_wine', 0),
+                        'created_at': datetime.fromisoformat(
                             review_data['created_at']
-                        ) if review_data.get('created_at') else datetime.utcnow()
-                    )
-                    db.session.add(review)
-                    print(f"Added review: {review.text}")  # Debug print
+                        ) if review_data.get('created_at') else now
+                    }
+                    if review_data.get('id') is not None:
+                        row['id'] = review_data['id']
+                    review_rows.append(row)
             
             # If data is a dict, it's the legacy format with users and reviews
             elif isinstance(data, dict):
                 if 'users' in data:
+                    usernames = {user_data['username'] for user_data in data['users']}
+                    existing = set(db.session.scalars(
+                        db.select(User.username).where(User.username.in_(usernames))
+                    ))
                     for user_data in data['users']:
-                        if not User.query.filter_by(username=user_data['username']).first():
-                            user = User(
-                                username=user_data['username'],
-                                is_admin=user_data.get('is_admin', False)
-                            )
-                            user.set_password(user_data['password'])
-                            db.session.add(user)
+                        if user_data['username'] in existing:
+                            skipped_users += 1
+                            continue
+                        existing.add(user_data['username'])
+                        user = User(
+                            username=user_data['username'],
+                            is_admin=user_data.get('is_admin', False)
+                        )
+                        user.set_password(user_data['password'])
+                        users.append(user)
+                    db.session.add_all(users)
                 
                 if 'reviews' in data:
-                    for review_data in data['reviews']:
-                        review = Review(
-                            text=review_data.get('content', ''),  # Handle legacy 'content' field
-                            votes_headphones=review_data.get('votes_headphones', 0),
-                            votes_wine=review_data.get('votes_wine', 0)
-                        )
-                        db.session.add(review)
+                    review_rows = [
+                        {
+                            'text': review_data.get('content', ''),  # Handle legacy 'content' field
+                            'votes_headphones': review_data.get('votes_headphones', 0),
+                            'votes_wine': review_data.get('votes_wine', 0)
+                        }
+                        for review_data in data['reviews']
+                    ]
             
+            UserService._insert_in_batches(Review, review_rows, batch_size)
             db.session.commit()
-            print("Commit successful")  # Debug print
-        except Exception as e:
-            print(f"Error during import: {str(e)}")  # Debug print
+        except Exception:
             db.session.rollback()
-            raise e 
\ No newline at end of file
+            raise
+        
+        # Core inserts don't fire the mapper events that keep the pool current
+        ReviewPool.invalidate()
+        current_app.logger.info(
+            f"Imported initial data: reviews={len(review_rows)} users={len(users)} "
+            f"skipped_users={skipped_users} seconds={time.perf_counter() - start:.2f}"
+        )
+        return len(review_rows), len(users)
@@ -0,0 +1,99 @@
+from flask import current_app
+from app.extensions import db
+from app.services.review_pool import get_review_pool
+from app.utils.background import PeriodicTask
+import atexit
+import threading
+
+class VoteBuffer:
+    """Per-process write-behind buffer for votes.
+
+    Votes are accumulated in memory and written as one
+    ``votes = votes + n`` UPDATE per review, either every
+    ``flush_interval`` seconds, once ``max_pending`` votes are waiting, or
+    when the process exits.
+    """
+
+    def __init__(self, app, flush_interval=0.5, max_pending=100):
+        self.app = app
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}   # review_id -> [headphones, wine]
+        self._flushing = {}  # deltas being written, still counted by pending()
+        self._pending_votes = 0
+        self._atexit_registered = False
+        self._task = PeriodicTask(app, 'vote-buffer-flush', flush_interval, self.flush)
+
+    def _ensure_started(self):
+        self._task.start()
+        if not self._atexit_registered:
+            self._atexit_registered = True
+            atexit.register(self.close)
+
+    def add(self, review_id, vote_type):
+        """Buffer a vote and return the review's pending (headphones, wine) deltas."""
+        self._ensure_started()
+        with self._lock:
+            deltas = self._pending.setdefault(review_id, [0, 0])
+            deltas[0 if vote_type == 'headphones' else 1] += 1
+            self._pending_votes += 1
+            should_flush = self._pending_votes >= self.max_pending
+
+        if should_flush:
+            self.flush()
+        return self.pending(review_id)
+
+    def pending(self, review_id):
+        """Return the (headphones, wine) votes not yet visible in the review pool."""
+        with self._lock:
+            pending = self._pending.get(review_id, (0, 0))
+            flushing = self._flushing.get(review_id, (0, 0))
+            return pending[0] + flushing[0], pending[1] + flushing[1]
+
+    def __len__(self):
+        return self._pending_votes
+
+    def flush(self):
+        """Write buffered votes to the database. Returns the number of votes written."""
+        from app.services.review import ReviewService
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending, self._pending_votes = self._pending, {}, 0
+                self._flushing = batch
+
+            # Use a separate app context so the flush never shares the caller's session
+            with self.app.app_context():
+                try:
+                    ReviewService.add_vote_counts(batch)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    # Put the votes back so the next flush retries them
+                    with self._lock:
+                        for review_id, (headphones, wine) in batch.items():
+                            deltas = self._pending.setdefault(review_id, [0, 0])
+                            deltas[0] += headphones
+                            deltas[1] += wine
+                            self._pending_votes += headphones + wine
+                        self._flushing = {}
+                    raise
+
+                pool = get_review_pool()
+                with self._lock:
+                    for review_id, (headphones, wine) in batch.items():
+                        pool.add_counts(review_id, headphones, wine)
+                    self._flushing = {}
+
+            return sum(headphones + wine for headphones, wine in batch.values())
+
+    def close(self):
+        """Stop the flush thread and write any remaining votes."""
+        self._task.stop(timeout=5)
+        self.flush()
+
+def get_vote_buffer():
+    """Get the vote buffer for the current application."""
+    return current_app.extensions['vote_buffer']
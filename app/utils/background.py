@@ -0,0 +1,55 @@
+from flask import current_app
+import os
+import threading
+
+class PeriodicTask:
+    """Run a function every ``interval`` seconds on a daemon thread.
+
+    The function runs inside an application context, first ``delay``
+    seconds after the thread starts (``interval`` by default). The thread is
+    started lazily so that each worker process started by a forking server
+    gets its own copy.
+    """
+
+    def __init__(self, app, name, interval, func, delay=None):
+        self.app = app
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.delay = interval if delay is None else delay
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        """Start the thread if it isn't already running in this process."""
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the thread and wait for the current run to finish."""
+        self._stopped.set()
+        if self.running and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay = self.delay
+        while not self._stopped.wait(delay):
+            delay = self.interval
+            with self.app.app_context():
+                try:
+                    self.func()
+                except Exception:
+                    current_app.logger.exception(f"Background task {self.name} failed")
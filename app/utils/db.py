@@ -0,0 +1,211 @@
+from app.extensions import db
+from sqlalchemy import event, func, inspect, make_url, text, Integer, MetaData
+from sqlalchemy.schema import CreateIndex, CreateTable
+import re
+
+SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SQLITE_SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+def engine_options(config):
+    """Return SQLALCHEMY_ENGINE_OPTIONS for the DB_POOL_* settings.
+    
+    Only server databases get pool options. Flask-SQLAlchemy already picks
+    a pool suited to SQLite files or in-memory databases.
+    """
+    if make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+def sqlite_pragmas(config):
+    """Return the PRAGMA statements for the SQLITE_* settings.
+    
+    Settings left empty are skipped. Raises ValueError for unknown modes.
+    """
+    pragmas = []
+    journal_mode = (config['SQLITE_JOURNAL_MODE'] or '').upper()
+    if journal_mode:
+        if journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(f"Unknown SQLITE_JOURNAL_MODE: {config['SQLITE_JOURNAL_MODE']}")
+        pragmas.append(f'PRAGMA journal_mode = {journal_mode}')
+    synchronous = (config['SQLITE_SYNCHRONOUS'] or '').upper()
+    if synchronous:
+        if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown SQLITE_SYNCHRONOUS: {config['SQLITE_SYNCHRONOUS']}")
+        pragmas.append(f'PRAGMA synchronous = {synchronous}')
+    if config['SQLITE_BUSY_TIMEOUT'] is not None:
+        pragmas.append(f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT'])}")
+    if config['SQLITE_CACHE_SIZE'] is not None:
+        pragmas.append(f"PRAGMA cache_size = {int(config['SQLITE_CACHE_SIZE'])}")
+    return pragmas
+
+def configure_sqlite_engine(engine, config):
+    """Run the SQLITE_* PRAGMAs on every new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def dialect_insert(model):
+    """Return an INSERT for the current dialect that supports ON CONFLICT."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+def random_integer(low, high):
+    """Return a SQL expression for a random integer in [low, high], evaluated per row."""
+    span = high - low + 1
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # random() returns a 64-bit signed integer
+        return low + func.abs(func.random() % span)
+    # random() returns a float in [0, 1) on PostgreSQL and most other databases
+    return low + func.floor(func.random() * span).cast(Integer)
+
+def _index_names(inspector):
+    """Names of the indexes in the database, including expression indexes."""
+    # Reflection skips expression indexes on SQLite, so read the catalogs directly
+    dialect = inspector.dialect.name
+    if dialect == 'sqlite':
+        query = "SELECT name FROM sqlite_master WHERE type = 'index'"
+    elif dialect == 'postgresql':
+        # A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind, which
+        # has to be rebuilt rather than counted as present
+        query = (
+            "SELECT c.relname FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND i.indisvalid"
+        )
+    else:
+        return {
+            index['name']
+            for table_name in inspector.get_table_names()
+            for index in inspector.get_indexes(table_name)
+        }
+    with db.engine.connect() as connection:
+        return set(connection.exec_driver_sql(query).scalars())
+
+def missing_indexes():
+    """Indexes declared on the models of existing tables that the database lacks."""
+    inspector = inspect(db.engine)
+    existing = _index_names(inspector)
+    return [
+        index
+        for table in db.metadata.sorted_tables if inspector.has_table(table.name)
+        for index in table.indexes if index.name not in existing
+    ]
+
+def create_missing_indexes():
+    """Create indexes declared on the models that the database doesn't have yet.
+    
+    db.create_all() skips tables that already exist, so indexes added to
+    existing models would otherwise never be created. On PostgreSQL they are
+    built CONCURRENTLY so a large table stays writable meanwhile, replacing
+    any invalid index left by an earlier failed build. Returns
+    the names of the indexes created.
+    """
+    created = []
+    for index in missing_indexes():
+        if db.engine.dialect.name == 'postgresql':
+            # CREATE INDEX CONCURRENTLY can't run inside a transaction
+            statement = str(CreateIndex(index).compile(dialect=db.engine.dialect))
+            statement = re.sub(r'^CREATE (UNIQUE )?INDEX', r'CREATE \1INDEX CONCURRENTLY', statement)
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS {index.name}')
+                connection.exec_driver_sql(statement)
+        else:
+            index.create(db.engine)
+        created.append(index.name)
+    return created
+
+def missing_columns():
+    """Columns declared on the models that their existing tables lack."""
+    inspector = inspect(db.engine)
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+    return missing
+
+def add_missing_columns():
+    """Add nullable columns declared on the models to existing tables.
+    
+    db.create_all() only creates missing tables, so columns added to a model
+    later need an ALTER TABLE. Returns the added columns as "table.column".
+    """
+    added = []
+    columns = [column for column in missing_columns() if column.nullable]
+    with db.engine.begin() as connection:
+        for column in columns:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f'{column.table.name}.{column.name}')
+    return added
+
+def missing_autoincrement(connection):
+    """SQLite tables declared with sqlite_autoincrement but created without it."""
+    if connection.dialect.name != 'sqlite':
+        return []
+    tables = []
+    for table in db.metadata.sorted_tables:
+        if not table.dialect_options['sqlite']['autoincrement']:
+            continue
+        sql = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': table.name}
+        ).scalar()
+        if sql is not None and 'AUTOINCREMENT' not in sql.upper():
+            tables.append(table)
+    return tables
+
+def add_missing_autoincrement():
+    """Rebuild SQLite tables that should not reuse ids but were created without AUTOINCREMENT.
+    
+    SQLite can't add AUTOINCREMENT to an existing table, so the rows are
+    copied into a new table that replaces the old one. That drops the
+    table's indexes and triggers, which create_missing_indexes() and
+    create_missing_search_indexes() recreate. Returns the rebuilt tables.
+    """
+    rebuilt = []
+    with db.engine.connect() as connection:
+        tables = missing_autoincrement(connection)
+        if not tables:
+            return rebuilt
+        # Dropping a table with foreign keys enforced would delete the rows referencing it
+        foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+        connection.exec_driver_sql('PRAGMA foreign_keys = OFF')
+        try:
+            for table in tables:
+                existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+                columns = ', '.join(column.name for column in table.columns if column.name in existing)
+                copy = table.to_metadata(MetaData(), name=f'{table.name}_rebuild')
+                connection.exec_driver_sql(f'DROP TABLE IF EXISTS {copy.name}')
+                connection.execute(CreateTable(copy))
+                connection.exec_driver_sql(
+                    f'INSERT INTO {copy.name} ({columns}) SELECT {columns} FROM {table.name}'
+                )
+                connection.exec_driver_sql(f'DROP TABLE {table.name}')
+                connection.exec_driver_sql(f'ALTER TABLE {copy.name} RENAME TO {table.name}')
+                connection.commit()
+                rebuilt.append(table.name)
+        finally:
+            connection.exec_driver_sql(f'PRAGMA foreign_keys = {int(foreign_keys)}')
+    return rebuilt
@@ -1,5 +1,6 @@
 from functools import wraps
 from flask import session, flash, redirect, url_for
+from app.utils.http_cache import conditional_response
 
 def login_required(f):
     """Decorator to check if user is logged in."""
@@ -9,4 +10,11 @@ def login_required(f):
             flash('Please log in first.', 'warning')
             return redirect(url_for('auth.login'))
         return f(*args, **kwargs)
-    return decorated_function 
\ No newline at end of file
+    return decorated_function 
+
+def etag_cached(f):
+    """Decorator answering If-None-Match with 304 when the page hasn't changed."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        return conditional_response(f(*args, **kwargs))
+    return decorated_function
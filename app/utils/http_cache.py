@@ -0,0 +1,147 @@
+"""HTTP caching: fingerprinted static URLs, precompressed assets and ETags."""
+from flask import current_app, make_response, request, send_from_directory
+from werkzeug.security import safe_join
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # optional, only .gz variants are written without it
+    brotli = None
+
+# Text-like assets worth compressing, images are compressed already
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.map', '.svg', '.txt', '.ico', '.ttf', '.otf'}
+# Content-Encoding and file suffix of precompressed variants, most preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+class StaticAssets:
+    """Content-hashed URLs and precompressed variants for the static folder.
+
+    url_for('static', ...) gets a ``v`` parameter holding a hash of the
+    file's contents. Requests carrying the current hash are cached as
+    immutable for ``max_age`` seconds, others fall back to Flask's
+    revalidated responses. Hashes are kept per process and recomputed when
+    a file's size or modification time changes.
+    """
+    HASH_LENGTH = 12
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._hashes = {}
+
+    def init_app(self, app):
+        if not app.has_static_folder:
+            return
+        app.url_defaults(self.add_version)
+        app.view_functions['static'] = self.send
+
+    def file_hash(self, filename):
+        """Short content hash of a static file, or None if it doesn't exist."""
+        path = safe_join(current_app.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._hashes.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+            with open(path, 'rb') as f:
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()[:self.HASH_LENGTH]
+        except OSError:
+            return None
+        self._hashes[path] = (key, digest)
+        return digest
+
+    def add_version(self, endpoint, values):
+        if endpoint == 'static' and 'v' not in values:
+            digest = self.file_hash(values.get('filename', ''))
+            if digest:
+                values['v'] = digest
+
+    def send(self, filename):
+        """Serve a static file, using a precompressed variant the client accepts."""
+        folder = current_app.static_folder
+        served, encoding = filename, None
+        compressible = os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS
+        if compressible:
+            for name, suffix in ENCODINGS:
+                if request.accept_encodings[name] and has_fresh_variant(folder, filename, suffix):
+                    served, encoding = filename + suffix, name
+                    break
+
+        immutable = request.args.get('v') is not None and request.args['v'] == self.file_hash(filename)
+        response = send_from_directory(
+            folder, served,
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+            max_age=self.max_age if immutable else current_app.get_send_file_max_age(filename)
+        )
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        if encoding:
+            response.content_encoding = encoding
+        if compressible:
+            response.vary.add('Accept-Encoding')
+        return response
+
+def has_fresh_variant(folder, filename, suffix):
+    """Whether a compressed variant exists and is newer than the file itself."""
+    path = safe_join(folder, filename)
+    if path is None:
+        return False
+    try:
+        return os.stat(path + suffix).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+def compress_static(folder):
+    """Write .gz and .br variants next to each compressible file in ``folder``.
+
+    .br variants need the optional brotli package. Up to date variants are
+    left alone and ones that aren't smaller than the file are not kept.
+    Returns the paths written.
+    """
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for suffix, compress in compressors:
+                if has_fresh_variant(root, name, suffix):
+                    continue
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+                    continue
+                # Replace atomically, the server may be reading the old variant
+                with open(path + suffix + '.tmp', 'wb') as f:
+                    f.write(compressed)
+                os.replace(path + suffix + '.tmp', path + suffix)
+                written.append(path + suffix)
+    return written
+
+def conditional_response(rv):
+    """Add an ETag to a successful response and answer a matching If-None-Match with 304.
+
+    Pages can differ per session (flashed messages, the admin nav), so
+    they are marked private and revalidated on every request instead of
+    being cached for a fixed time.
+    """
+    response = make_response(rv)
+    if response.status_code == 200 and not response.is_streamed:
+        response.add_etag()
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+    return response
@@ -0,0 +1,19 @@
+import base64
+import binascii
+import json
+
+def encode_cursor(*values):
+    """Encode keyset values as an opaque, URL-safe pagination cursor."""
+    data = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor made by encode_cursor, raising ValueError if it is invalid."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor') from None
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
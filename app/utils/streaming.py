@@ -0,0 +1,91 @@
+import codecs
+import json
+import zlib
+
+def gzip_chunks(chunks, level=6):
+    """Gzip-compress an iterable of str or bytes chunks as they are produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 selects the gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def iter_json_records(stream, chunk_size=64 * 1024, max_record_size=1024 * 1024):
+    """Yield the values of a JSON array, or of an NDJSON file, from a binary stream.
+
+    The stream is read ``chunk_size`` bytes at a time, so memory use is bounded
+    by the largest single record rather than the size of the file. Raises
+    ValueError on malformed input or on a record larger than ``max_record_size``
+    characters.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + text_decoder.decode(chunk, final=eof)
+        position = 0
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    def decode_value():
+        nonlocal position
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                # A number or literal at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    position = end
+                    return value
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f'Invalid JSON: {e}') from None
+                if len(buffer) - position > max_record_size:
+                    raise ValueError('Record too large') from None
+            fill()
+
+    skip_whitespace()
+    if position == len(buffer):
+        return
+
+    if buffer[position] != '[':
+        # Newline-delimited JSON, one value per line
+        while position < len(buffer):
+            yield decode_value()
+            skip_whitespace()
+        return
+
+    position += 1
+    skip_whitespace()
+    if buffer[position:position + 1] == ']':
+        position += 1
+    else:
+        while True:
+            yield decode_value()
+            skip_whitespace()
+            separator = buffer[position:position + 1]
+            position += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise ValueError('Invalid JSON: expected "," or "]"')
+            skip_whitespace()
+
+    skip_whitespace()
+    if position < len(buffer):
+        raise ValueError('Invalid JSON: unexpected data after array')
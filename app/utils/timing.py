@@ -0,0 +1,117 @@
+"""Per-request timing of database queries, template rendering and captchas.
+
+When SERVER_TIMING_ENABLED is set, each response gets a Server-Timing
+header and a log line breaking the request down into phases. When it
+isn't, no hooks or listeners are registered and timed() is a context
+lookup.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+import logging
+import time
+
+class RequestTimings:
+    """Durations (seconds) and counts of the phases of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.template_starts = []
+
+    def add(self, phase, seconds):
+        self.durations[phase] += seconds
+        self.counts[phase] += 1
+
+    def server_timing(self, total):
+        """Server-Timing header value, durations in milliseconds."""
+        metrics = [f'db;dur={self.durations["db"] * 1000:.2f};desc="{self.counts["db"]} queries"']
+        metrics += [
+            f'{phase};dur={seconds * 1000:.2f}'
+            for phase, seconds in self.durations.items() if phase != 'db'
+        ]
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def log_line(self, total):
+        """logfmt summary of the request for the application log."""
+        fields = [
+            f'method={request.method}',
+            f'path={request.path}',
+            f'total_ms={total * 1000:.2f}',
+            f'db_queries={self.counts["db"]}',
+            f'db_ms={self.durations["db"] * 1000:.2f}',
+        ]
+        fields += [
+            f'{phase}_ms={seconds * 1000:.2f}'
+            for phase, seconds in self.durations.items() if phase != 'db'
+        ]
+        return 'request_timing ' + ' '.join(fields)
+
+def current_timings():
+    """The RequestTimings of the current request, or None when not timing."""
+    if not has_request_context():
+        return None
+    return g.get('request_timings')
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request."""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+def init_request_timing(app, engines):
+    """Time requests to ``app`` if SERVER_TIMING_ENABLED is set."""
+    if not app.config['SERVER_TIMING_ENABLED']:
+        return
+    if app.logger.level == logging.NOTSET:
+        app.logger.setLevel(logging.INFO)
+
+    # Registered before the other hooks so the total covers them
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _query_started)
+        event.listen(engine, 'after_cursor_execute', _query_finished)
+
+def _start_request():
+    g.request_timings = RequestTimings()
+
+def _finish_request(response):
+    timings = g.pop('request_timings', None)
+    if timings is not None:
+        total = time.perf_counter() - timings.start
+        response.headers['Server-Timing'] = timings.server_timing(total)
+        if current_app.logger.isEnabledFor(logging.INFO):
+            current_app.logger.info(f'{timings.log_line(total)} status={response.status_code}')
+    return response
+
+def _template_started(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        timings.template_starts.append(time.perf_counter())
+
+def _template_finished(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings.template_starts:
+        timings.add('template', time.perf_counter() - timings.template_starts.pop())
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('query_start', None)
+    timings = current_timings()
+    if start is not None and timings is not None:
+        timings.add('db', time.perf_counter() - start)
@@ -0,0 +1 @@
+# Leave this empty
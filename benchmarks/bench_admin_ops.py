@@ -0,0 +1,61 @@
+"""Duration of the reset-all-votes and seed-reviews admin operations.
+
+Compares loading every review into the session and updating it in Python
+with the set-based UPDATEs in ReviewService.
+"""
+from benchmarks.common import add_database_arguments, bench_database_url, make_app, seed_reviews
+from app.extensions import db
+from app.models.review import Review
+from app.services.review import ReviewService
+import argparse
+import os
+import random
+import tempfile
+import time
+
+def legacy_reset_all_votes():
+    """The previous implementation, kept for comparison."""
+    for review in db.session.execute(db.select(Review)).scalars().all():
+        review.votes_headphones = 0
+        review.votes_wine = 0
+    db.session.commit()
+
+def legacy_seed_votes():
+    """The previous implementation, kept for comparison."""
+    variance = ReviewService.VARIANCE
+    for review in Review.query.all():
+        review.votes_headphones = max(1, ReviewService.BASE_VOTES + random.randint(-variance, variance))
+        review.votes_wine = max(1, ReviewService.BASE_VOTES + random.randint(-variance, variance))
+    db.session.commit()
+
+def timed(func):
+    db.session.expunge_all()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    add_database_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = bench_database_url(args, tmp)
+        app = make_app(url, reset=args.reset)
+        with app.app_context():
+            app.logger.disabled = True
+            seed_reviews(args.rows)
+
+            print(f'{args.rows} reviews')
+            print('        operation | legacy s | set-based s')
+            cases = (
+                ('reset-all-votes', legacy_reset_all_votes, ReviewService.reset_all_votes),
+                ('seed-reviews', legacy_seed_votes, ReviewService.seed_votes),
+            )
+            for name, legacy, set_based in cases:
+                print(f'{name:>17} | {timed(legacy):8.2f} | {timed(set_based):11.2f}')
+            db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
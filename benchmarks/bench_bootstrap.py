@@ -0,0 +1,76 @@
+"""Cold-start time of seeding an empty database from reviews_export.json.
+
+Times what init_admin_user does on first boot, loading the seed file and
+passing it to UserService.import_initial_data, against the previous
+one-ORM-object-per-review import (with its per-row prints sent to /dev/null).
+"""
+from benchmarks.common import make_app
+from app.extensions import db
+from app.models.review import Review
+from app.services.user import UserService
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import tempfile
+import time
+
+def legacy_import_initial_data(data):
+    """The previous implementation, kept for comparison."""
+    print(f"Importing data: {data}")
+    for review_data in data:
+        review = Review(
+            id=review_data.get('id'),
+            text=review_data['text'],
+            votes_headphones=review_data.get('votes_headphones', 0),
+            votes_wine=review_data.get('votes_wine', 0),
+            created_at=datetime.fromisoformat(
+                review_data['created_at']
+            ) if review_data.get('created_at') else datetime.utcnow()
+        )
+        db.session.add(review)
+        print(f"Added review: {review.text}")
+    db.session.commit()
+
+def write_seed_file(path, rows):
+    created_at = datetime(2025, 1, 1)
+    with open(path, 'w') as f:
+        json.dump([
+            {
+                'text': f'Seed review {i}: notes of cherry, wide soundstage',
+                'votes_headphones': i % 50,
+                'votes_wine': i % 30,
+                'created_at': (created_at + timedelta(seconds=i)).isoformat(),
+            }
+            for i in range(rows)
+        ], f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    cases = (
+        ('legacy', legacy_import_initial_data),
+        ('batched', UserService.import_initial_data),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_file = os.path.join(tmp, 'reviews_export.json')
+        write_seed_file(seed_file, args.rows)
+
+        print(f'{args.rows} reviews')
+        print('   mode | seconds |  rows/sec')
+        for name, import_initial_data in cases:
+            app = make_app(f"sqlite:///{os.path.join(tmp, f'{name}.db')}")
+            with app.app_context(), open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                with open(seed_file) as f:
+                    import_initial_data(json.load(f))
+                elapsed = time.perf_counter() - start
+                assert Review.query.count() == args.rows
+                db.engine.dispose()
+            print(f'{name:>7} | {elapsed:7.2f} | {args.rows / elapsed:9.0f}')
+
+if __name__ == '__main__':
+    main()
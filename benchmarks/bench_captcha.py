@@ -0,0 +1,79 @@
+"""Per-call latency and allocations of CAPTCHA generation.
+
+Compares building a fresh ImageCaptcha (and its fonts) on every call with
+the shared per-process generator, and with a hit on the CAPTCHA pool.
+"""
+from benchmarks.common import make_app, time_per_call
+from app.services.captcha import CaptchaService, CaptchaPool
+from captcha.image import ImageCaptcha
+from io import BytesIO
+import argparse
+import base64
+import random
+import tracemalloc
+
+def fresh_generator_captcha(length):
+    """The previous implementation, kept for comparison."""
+    image = ImageCaptcha(
+        width=320,
+        height=100,
+        fonts=[CaptchaService.FONT_PATH],
+        font_sizes=(64, 72, 80)
+    )
+    captcha_text = ''.join(random.choices(CaptchaService.ALLOWED_CHARS, k=length))
+    buffered = BytesIO()
+    image.write(captcha_text, buffered)
+    return base64.b64encode(buffered.getvalue()).decode(), captcha_text
+
+def peak_allocation_kb(func, repeat):
+    """Mean peak traced memory of one call, in KiB."""
+    total = 0
+    tracemalloc.start()
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / repeat / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        length = app.config['CAPTCHA_LENGTH']
+        service = CaptchaService()
+        service.generate_captcha()  # build the shared generator outside the timings
+
+        pool = CaptchaPool(app, size=args.repeat, length=length, refill_interval=3600)
+        app.extensions['captcha_pool'] = pool
+
+        def pool_hit():
+            if not len(pool):
+                pool.fill()
+            return service.generate_captcha()
+
+        cases = (
+            ('fresh ImageCaptcha', lambda: fresh_generator_captcha(length), False),
+            ('shared ImageCaptcha', service.generate_captcha, False),
+            ('pool hit', pool_hit, True),
+        )
+        print('                case |  ms/call | peak KiB/call')
+        for name, func, pooled in cases:
+            if not pooled:
+                app.extensions.pop('captcha_pool', None)
+            else:
+                app.extensions['captcha_pool'] = pool
+                pool.fill()
+            ms = time_per_call(func, args.repeat)
+            if pooled:
+                pool.fill()
+            kb = peak_allocation_kb(func, min(args.repeat, 50))
+            print(f'{name:>20} | {ms:8.3f} | {kb:13.1f}')
+        pool.stop()
+
+if __name__ == '__main__':
+    main()
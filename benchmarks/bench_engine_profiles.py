@@ -0,0 +1,114 @@
+"""Concurrent votes and reads under each engine profile.
+
+Writer threads vote through ReviewService.add_vote while reader threads
+load review pages, for a fixed duration. On SQLite the profiles compare
+the engine defaults (rollback journal, synchronous=FULL) with the WAL
+settings in Config. With --database-url pointing at PostgreSQL they
+compare SQLAlchemy's default pool with the production pool settings.
+"""
+from benchmarks.common import add_database_arguments, bench_database_url, make_app, seed_reviews
+from app.config import Config, ProductionConfig
+from app.extensions import db
+from app.services.review import ReviewService
+from sqlalchemy import make_url
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+SQLITE_PROFILES = (
+    ('defaults', {
+        'SQLITE_JOURNAL_MODE': '',
+        'SQLITE_SYNCHRONOUS': '',
+        'SQLITE_BUSY_TIMEOUT': None,
+        'SQLITE_CACHE_SIZE': None,
+    }),
+    ('wal', {
+        'SQLITE_JOURNAL_MODE': Config.SQLITE_JOURNAL_MODE,
+        'SQLITE_SYNCHRONOUS': Config.SQLITE_SYNCHRONOUS,
+        'SQLITE_BUSY_TIMEOUT': Config.SQLITE_BUSY_TIMEOUT,
+        'SQLITE_CACHE_SIZE': Config.SQLITE_CACHE_SIZE,
+    }),
+)
+
+SERVER_PROFILES = (
+    ('defaults', {
+        'DB_POOL_SIZE': 5,
+        'DB_MAX_OVERFLOW': 10,
+        'DB_POOL_RECYCLE': -1,
+        'DB_POOL_PRE_PING': False,
+    }),
+    ('production', {
+        'DB_POOL_SIZE': ProductionConfig.DB_POOL_SIZE,
+        'DB_MAX_OVERFLOW': ProductionConfig.DB_MAX_OVERFLOW,
+        'DB_POOL_RECYCLE': ProductionConfig.DB_POOL_RECYCLE,
+        'DB_POOL_PRE_PING': ProductionConfig.DB_POOL_PRE_PING,
+    }),
+)
+
+def run(name, database_url, reset, settings, writers, readers, duration, rows):
+    app = make_app(database_url, reset, **settings)
+    with app.app_context():
+        seed_reviews(rows)
+    counts = {'votes': 0, 'reads': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def vote():
+        with app.test_request_context():
+            while time.perf_counter() < deadline:
+                try:
+                    ReviewService.add_vote(random.randint(1, rows), 'headphones')
+                    count('votes')
+                except Exception:
+                    db.session.rollback()
+                    count('errors')
+
+    def read():
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                try:
+                    ReviewService.get_reviews_page(per_page=50)
+                    db.session.rollback()
+                    count('reads')
+                except Exception:
+                    db.session.rollback()
+                    count('errors')
+
+    workers = [threading.Thread(target=vote) for _ in range(writers)]
+    workers += [threading.Thread(target=read) for _ in range(readers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+    print(f"{name:>10} | {counts['votes'] / duration:9.0f} | {counts['reads'] / duration:9.0f} | {counts['errors']:6}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_database_arguments(parser)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5, help='seconds per profile')
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    is_sqlite = args.database_url is None or make_url(args.database_url).get_backend_name() == 'sqlite'
+    profiles = SQLITE_PROFILES if is_sqlite else SERVER_PROFILES
+    print(f'{args.writers} writers, {args.readers} readers, {args.duration:g} s per profile')
+    print('   profile | votes/sec | reads/sec | errors')
+    for name, settings in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = bench_database_url(args, tmp)
+            run(name, url, args.reset, settings, args.writers, args.readers, args.duration, args.rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Peak RSS and duration of exporting every review.
+
+Compares the previous Review.query.all() + jsonify export with the streamed
+export, both consumed the way /admin/export-reviews sends its body. Each
+format runs in its own process so its peak RSS (ru_maxrss) isn't inflated
+by the formats before it, and includes the driver's row buffers and other
+allocations outside the Python heap. The RSS of the process before the
+export starts (interpreter, app and database connection) is reported too.
+"""
+from benchmarks.common import add_database_arguments, bench_database_url, bench_config, make_app, seed_reviews
+from app import create_app
+from app.extensions import db
+from app.models.review import Review
+from app.services.review import ReviewService
+from app.utils.streaming import gzip_chunks
+from flask import jsonify
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+def legacy_export():
+    """The previous implementation, kept for comparison."""
+    reviews = Review.query.all()
+    data = [{
+        'text': review.text,
+        'votes_headphones': review.votes_headphones,
+        'votes_wine': review.votes_wine,
+        'created_at': review.created_at.isoformat() if review.created_at else None
+    } for review in reviews]
+    yield jsonify(data).get_data()
+
+EXPORTS = {
+    'legacy': legacy_export,
+    'json': lambda: ReviewService.export_reviews('json'),
+    'ndjson': lambda: ReviewService.export_reviews('ndjson'),
+    'ndjson.gz': lambda: gzip_chunks(ReviewService.export_reviews('ndjson')),
+}
+
+def peak_rss_mib():
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def measure(database_url, name):
+    """Run one export in this process and return its measurements."""
+    app = create_app(bench_config(database_url))
+    with app.test_request_context():
+        db.session.execute(db.select(Review.id).limit(1)).all()
+        before = peak_rss_mib()
+        start = time.perf_counter()
+        size = 0
+        for chunk in EXPORTS[name]():
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+        return {'seconds': elapsed, 'bytes': size, 'before_mib': before, 'peak_mib': peak_rss_mib()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    add_database_arguments(parser)
+    parser.add_argument('--measure', choices=EXPORTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.database_url, args.measure)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = bench_database_url(args, tmp)
+        app = make_app(url, reset=args.reset)
+        with app.app_context():
+            seed_reviews(args.rows)
+            db.engine.dispose()
+
+        print(f'{args.rows} reviews')
+        print('     format | seconds |    MiB out | RSS before | peak RSS MiB')
+        for name in EXPORTS:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_export', '--measure', name, '--database-url', url],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{name:>11} | {result['seconds']:7.2f} | {result['bytes'] / 1024 / 1024:10.1f} | "
+                  f"{result['before_mib']:10.1f} | {result['peak_mib']:12.1f}")
+
+if __name__ == '__main__':
+    main()
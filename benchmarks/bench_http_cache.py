@@ -0,0 +1,102 @@
+"""Bytes transferred per visit, with and without the HTTP caching headers.
+
+A small browser model keeps responses, reuses them while their max-age
+lasts and revalidates them with If-None-Match / If-Modified-Since after
+that. Each visit loads the pages and the /static files they link to.
+The baseline turns off content-hashed URLs, precompressed files and page
+ETags, leaving Flask's defaults. Third-party CDN assets aren't counted.
+"""
+from benchmarks.common import make_app
+from app.utils.http_cache import compress_static
+from flask import Flask
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+STATIC_URL = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+class Browser:
+    def __init__(self, client):
+        self.client = client
+        self.cache = {}
+
+    def get(self, url):
+        """Fetch ``url`` through the cache, returning (body, bytes transferred)."""
+        cached = self.cache.get(url)
+        if cached and cached['expires'] > time.time():
+            return cached['body'], 0
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = self.client.get(url, headers=headers)
+        transferred = len(response.data) + sum(len(k) + len(v) + 4 for k, v in response.headers.items()) + 17
+        if response.status_code == 304:
+            cached['expires'] = self.expires(response)
+            return cached['body'], transferred
+        self.cache[url] = {
+            'body': response.data,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'expires': self.expires(response),
+        }
+        return response.data, transferred
+
+    @staticmethod
+    def expires(response):
+        cache_control = response.cache_control
+        if cache_control.no_cache or not cache_control.max_age:
+            return 0
+        return time.time() + cache_control.max_age
+
+    def visit(self, pages):
+        total = 0
+        for page in pages:
+            body, transferred = self.get(page)
+            total += transferred
+            for asset in STATIC_URL.findall(body.decode()):
+                total += self.get(asset)[1]
+        return total
+
+def disable_caching(app):
+    """Put back Flask's static view and drop the page ETags."""
+    assets = app.extensions['static_assets']
+    app.url_default_functions[None].remove(assets.add_version)
+    app.view_functions['static'] = lambda filename: Flask.send_static_file(app, filename)
+
+    @app.after_request
+    def drop_etag(response):
+        if response.mimetype == 'text/html':
+            del response.headers['ETag']
+            response.cache_control.no_cache = None
+            response.cache_control.private = None
+        return response
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--visits', type=int, default=10, help='visits per visitor, the first one is cold')
+    parser.add_argument('--pages', nargs='+', default=['/', '/thank-you'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        static_folder = os.path.join(tmp, 'static')
+        shutil.copytree(make_app().static_folder, static_folder)
+        written = compress_static(static_folder)
+        print(f'{len(written)} precompressed static files, pages: {" ".join(args.pages)}')
+        print('     mode | first visit | returning visit')
+        for name in ('baseline', 'cached'):
+            app = make_app()
+            app.static_folder = static_folder
+            if name == 'baseline':
+                disable_caching(app)
+            browser = Browser(app.test_client())
+            first = browser.visit(args.pages)
+            returning = sum(browser.visit(args.pages) for _ in range(args.visits - 1)) / (args.visits - 1)
+            print(f'{name:>9} | {first:11,} | {returning:15,.0f}')
+
+if __name__ == '__main__':
+    main()
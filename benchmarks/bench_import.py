@@ -0,0 +1,91 @@
+"""Throughput and peak memory of importing a reviews file.
+
+Compares the previous json.load + one ORM object per review import with the
+streamed, batched import for JSON and NDJSON files.
+"""
+from benchmarks.common import make_app
+from app.extensions import db
+from app.models.review import Review
+from app.services.review import ReviewService
+from app.utils.streaming import iter_json_records
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+def legacy_import(path, batch_size):
+    """The previous implementation, kept for comparison."""
+    with open(path, 'rb') as f:
+        reviews_data = json.load(f)
+    for review_data in reviews_data:
+        db.session.add(Review(
+            text=review_data.get('text', ''),
+            votes_headphones=review_data.get('votes_headphones', 0),
+            votes_wine=review_data.get('votes_wine', 0)
+        ))
+    db.session.commit()
+
+def streamed_import(path, batch_size):
+    with open(path, 'rb') as f:
+        ReviewService.import_reviews(iter_json_records(f), batch_size=batch_size)
+
+def write_file(path, rows, ndjson):
+    with open(path, 'w') as f:
+        if not ndjson:
+            f.write('[')
+        for i in range(rows):
+            record = json.dumps({
+                'text': f'Imported review {i}: notes of cherry, wide soundstage',
+                'votes_headphones': i % 50,
+                'votes_wine': i % 30,
+            })
+            if ndjson:
+                f.write(record + '\n')
+            else:
+                f.write((',' if i else '') + record)
+        if not ndjson:
+            f.write(']')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--skip-legacy', action='store_true')
+    parser.add_argument('--memory', action='store_true',
+                        help='trace peak memory (slows every mode down considerably)')
+    args = parser.parse_args()
+
+    cases = [] if args.skip_legacy else [('legacy', 'json', legacy_import, None)]
+    for batch_size in args.batch_sizes:
+        cases.append(('json', 'json', streamed_import, batch_size))
+        cases.append(('ndjson', 'ndjson', streamed_import, batch_size))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for fmt in ('json', 'ndjson'):
+            files[fmt] = os.path.join(tmp, f'reviews.{fmt}')
+            write_file(files[fmt], args.rows, fmt == 'ndjson')
+
+        print(f'{args.rows} reviews')
+        print('  mode |  batch |  rows/sec | peak MiB')
+        for name, fmt, run, batch_size in cases:
+            app = make_app(f"sqlite:///{os.path.join(tmp, f'{name}-{batch_size}.db')}")
+            with app.app_context():
+                app.logger.disabled = True
+                if args.memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                run(files[fmt], batch_size)
+                elapsed = time.perf_counter() - start
+                peak = '-'
+                if args.memory:
+                    peak = f'{tracemalloc.get_traced_memory()[1] / 1024 / 1024:.1f}'
+                    tracemalloc.stop()
+                assert Review.query.count() == args.rows
+                db.engine.dispose()
+            print(f'{name:>6} | {batch_size or "-":>6} | {args.rows / elapsed:9.0f} | {peak:>8}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Clearing the pending review queue: one approval per call vs one batch.
+
+Uses a SQLite file so every commit pays for a real transaction.
+"""
+from benchmarks.common import make_app
+from app.extensions import db
+from app.models.review import PendingReview
+from app.services.review import ReviewService
+import argparse
+import os
+import tempfile
+import time
+
+def seed_pending(count):
+    db.session.execute(db.insert(PendingReview), [
+        {'text': f'Pending review {i}: bright, fizzy, short finish'} for i in range(count)
+    ])
+    db.session.commit()
+    return list(db.session.scalars(
+        db.select(PendingReview.id).where(PendingReview.status == 'pending')
+    ))
+
+def approve_one_by_one(review_ids):
+    for review_id in review_ids:
+        ReviewService.approve_pending_review(review_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pending', type=int, default=500)
+    args = parser.parse_args()
+
+    cases = (
+        ('per id', approve_one_by_one),
+        ('batch', ReviewService.approve_pending_reviews),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with app.app_context():
+            print(f'{args.pending} pending reviews')
+            print('   mode |      ms')
+            for name, approve in cases:
+                review_ids = seed_pending(args.pending)
+                start = time.perf_counter()
+                approve(review_ids)
+                print(f'{name:>7} | {(time.perf_counter() - start) * 1000:7.1f}')
+            db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
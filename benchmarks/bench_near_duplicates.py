@@ -0,0 +1,81 @@
+"""Near-duplicate lookups: MinHash/LSH index vs comparing against every review.
+
+Queries are lightly edited copies of stored reviews (one word replaced and
+punctuation added), plus unrelated texts that should find nothing. Recall
+is the share of edited copies whose source review was flagged.
+"""
+from benchmarks.bench_search import make_vocabulary, seed_vocabulary_reviews
+from benchmarks.common import make_app, time_per_call
+from app.extensions import db
+from app.models.review import Review
+from app.services.near_duplicates import NearDuplicateIndex, get_near_duplicate_index
+import argparse
+import random
+import time
+import tracemalloc
+
+def edit(text, vocabulary, rng):
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return ' '.join(words).capitalize() + '!'
+
+def brute_force_similar(shingles, review_shingles, threshold):
+    """Score the text against every review, the quadratic approach."""
+    return [
+        review_id for review_id, other in review_shingles.items()
+        if NearDuplicateIndex.similarity(shingles, other) >= threshold
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary()
+    rng = random.Random(3)
+    app = make_app()
+    with app.app_context():
+        seed_vocabulary_reviews(args.rows, vocabulary)
+        sources = db.session.execute(
+            db.select(Review.id, Review.text).order_by(db.func.random()).limit(args.queries)
+        ).all()
+        edited = {review_id: edit(text, vocabulary, rng) for review_id, text in sources}
+        unrelated = {-i: ' '.join(rng.choices(vocabulary, k=12)) for i in range(1, args.queries + 1)}
+
+        index = get_near_duplicate_index()
+        start = time.perf_counter()
+        index.refresh()
+        build_s = time.perf_counter() - start
+        # Measured on a second index, tracing slows the build down
+        tracemalloc.start()
+        traced = NearDuplicateIndex()
+        traced.refresh()
+        index_mib = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+        del traced
+        print(f'{args.rows} reviews, index built in {build_s:.1f} s, {index_mib:.0f} MiB')
+
+        found = index.find_similar(edited)
+        recall = sum(
+            any(review.id == source_id for review, _ in found.get(source_id, ()))
+            for source_id in edited
+        ) / len(edited)
+        false_positives = len(index.find_similar(unrelated))
+        db.session.expunge_all()
+
+        lsh_ms = time_per_call(lambda: index.find_similar({0: edited[sources[0][0]]}), args.queries)
+        review_shingles = {
+            review_id: NearDuplicateIndex.shingles(text)
+            for review_id, text in db.session.execute(db.select(Review.id, Review.text))
+        }
+        shingles = NearDuplicateIndex.shingles(edited[sources[0][0]])
+        brute_ms = time_per_call(lambda: brute_force_similar(shingles, review_shingles, index.threshold), 3)
+
+        print(f'recall on edited copies: {recall:.1%}, unrelated texts flagged: {false_positives}/{len(unrelated)}')
+        print('       method | ms/lookup')
+        print(f'          lsh | {lsh_ms:9.2f}')
+        print(f'  brute force | {brute_ms:9.1f}')
+
+if __name__ == '__main__':
+    main()
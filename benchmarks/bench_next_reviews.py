@@ -0,0 +1,43 @@
+"""Server time and bytes per game round: rendering /play vs /api/next-reviews batches.
+
+Both go through the Flask test client with the review pool enabled, so
+the numbers include routing, session handling and serialisation.
+"""
+from benchmarks.common import make_app, seed_reviews
+import argparse
+import time
+
+def per_review(client, path, reviews_per_request, requests):
+    size = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path)
+        assert response.status_code == 200
+        size += len(response.data)
+    elapsed = time.perf_counter() - start
+    reviews = requests * reviews_per_request
+    return elapsed * 1000 / reviews, size / reviews
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 5, 20])
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed_reviews(args.rows)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['seen_landing'] = True
+
+        print(f'{args.rows} reviews')
+        print('                  endpoint | ms/review | bytes/review')
+        cases = [('/play', 1)] + [(f'/api/next-reviews?count={n}', n) for n in args.batch_sizes]
+        for path, batch in cases:
+            ms, size = per_review(client, path, batch, args.requests)
+            print(f'{path:>26} | {ms:9.3f} | {size:12.0f}')
+
+if __name__ == '__main__':
+    main()
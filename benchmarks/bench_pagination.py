@@ -0,0 +1,41 @@
+"""Latency of the admin review list: loading every review vs keyset pages.
+
+Deep pages are reached by following next cursors, so their cost shows
+whether the query seeks the index or skips over the earlier rows.
+"""
+from benchmarks.common import make_app, seed_reviews, time_per_call
+from app.extensions import db
+from app.services.review import ReviewService
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed_reviews(args.rows)
+        db.session.execute(db.text('ANALYZE'))
+
+        all_ms = time_per_call(lambda: (ReviewService.get_all_reviews(), db.session.expunge_all()), 3)
+        print(f'{args.rows} reviews, get_all_reviews: {all_ms:.1f} ms')
+        print('        sort |   page | ms/page')
+        for sort in ReviewService.REVIEW_SORTS:
+            # Walk to the middle of the table, then time the page found there
+            cursor, page = None, 1
+            while page < args.rows // args.per_page // 2:
+                _, cursor = ReviewService.get_reviews_page(cursor=cursor, per_page=args.per_page, sort=sort)
+                page += 1
+            for number, page_cursor in ((1, None), (page, cursor)):
+                ms = time_per_call(
+                    lambda: ReviewService.get_reviews_page(cursor=page_cursor, per_page=args.per_page, sort=sort),
+                    args.repeat
+                )
+                print(f'{sort:>12} | {number:>6} | {ms:7.2f}')
+            db.session.expunge_all()
+
+if __name__ == '__main__':
+    main()
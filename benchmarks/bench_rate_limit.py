@@ -0,0 +1,75 @@
+"""Rate limit check latency with a large rate_limits table.
+
+Compares the old check (inline cleanup DELETE, SELECT, INSERT and two
+commits) with and without the last_request index, the single-statement
+upsert, and the in-memory limiter.
+"""
+from benchmarks.common import make_app, time_per_call
+from app.extensions import db
+from app.models.rate_limit import RateLimit
+from app.services.rate_limit import RateLimitService, MemoryRateLimiter
+from datetime import datetime, timedelta, UTC
+import argparse
+import itertools
+import os
+import tempfile
+
+def legacy_check(ip_address, limit=5, window=3600):
+    """The previous implementation, kept for comparison."""
+    window_start = datetime.now(UTC) - timedelta(seconds=window)
+    db.session.execute(db.delete(RateLimit).where(RateLimit.last_request < window_start))
+    db.session.commit()
+
+    rate_limit = db.session.execute(
+        db.select(RateLimit).filter_by(ip_address=ip_address)
+    ).scalar()
+    if rate_limit:
+        rate_limit.count += 1
+        rate_limit.last_request = datetime.now(UTC)
+        if rate_limit.count >= limit:
+            rate_limit.is_blocked = True
+            db.session.commit()
+            return False
+    else:
+        RateLimitService.create_rate_limit(ip_address)
+    db.session.commit()
+    return True
+
+def seed_rate_limits(count, batch_size=50000):
+    now = datetime.now(UTC)
+    for start in range(0, count, batch_size):
+        db.session.execute(db.insert(RateLimit), [
+            {'ip_address': f'seed-{i}', 'count': 1, 'last_request': now, 'created_at': now}
+            for i in range(start, min(start + batch_size, count))
+        ])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with app.app_context():
+            seed_rate_limits(args.rows)
+            index = next(i for i in RateLimit.__table__.indexes if 'last_request' in i.columns)
+            ips = (f'10.0.{i // 256}.{i % 256}' for i in itertools.count())
+
+            index.drop(db.engine)
+            no_index = time_per_call(lambda: legacy_check(next(ips)), args.repeat)
+            index.create(db.engine)
+            with_index = time_per_call(lambda: legacy_check(next(ips)), args.repeat)
+            upsert = time_per_call(lambda: RateLimitService.check_rate_limit(next(ips)), args.repeat)
+            app.extensions['rate_limiter'] = MemoryRateLimiter()
+            memory = time_per_call(lambda: RateLimitService.check_rate_limit(next(ips)), args.repeat * 100)
+
+    print(f'rate_limits rows: {args.rows}')
+    print(f'inline cleanup, no index:   {no_index:8.3f} ms/check')
+    print(f'inline cleanup, with index: {with_index:8.3f} ms/check')
+    print(f'single upsert:              {upsert:8.3f} ms/check')
+    print(f'memory limiter:             {memory:8.4f} ms/check')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Random review selection: ORDER BY random() versus the in-memory pool."""
+from benchmarks.common import make_app, seed_reviews, time_per_call
+from app.extensions import db
+from app.models.review import Review
+from app.services.review_pool import get_review_pool
+from sqlalchemy import func
+import argparse
+import random
+
+def run(size, repeat, voted_count):
+    app = make_app()
+    with app.app_context():
+        seed_reviews(size)
+        voted = random.sample(range(1, size + 1), min(voted_count, size))
+
+        def order_by_random():
+            return Review.query.filter(
+                ~Review.id.in_(voted)
+            ).order_by(func.random()).first()
+
+        pool = get_review_pool()
+        pool.refresh(force=True)
+
+        def pool_pick():
+            return db.session.get(Review, pool.pick(exclude=voted))
+
+        query_ms = time_per_call(order_by_random, repeat)
+        pick_ms = time_per_call(lambda: pool.pick(exclude=voted), repeat * 10)
+        pick_load_ms = time_per_call(pool_pick, repeat * 10)
+        refresh_ms = time_per_call(lambda: pool.refresh(force=True), 1)
+
+    print(f'{size:>9} | {query_ms:>12.3f} | {pick_ms:>10.4f} | {pick_load_ms:>12.3f} | {refresh_ms:>11.1f}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--voted', type=int, default=50, help='reviews already voted on by the session')
+    args = parser.parse_args()
+
+    print('  reviews | random() ms  | pick ms    | pick+get ms  | refresh ms')
+    for size in args.sizes:
+        run(size, args.repeat, args.voted)
+
+if __name__ == '__main__':
+    main()
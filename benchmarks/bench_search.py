@@ -0,0 +1,80 @@
+"""Admin search latency: full-text index vs a LIKE '%term%' scan.
+
+Reviews are built from a random vocabulary so terms range from rare to
+common. Each query fetches the first page of 20 results.
+"""
+from benchmarks.common import make_app, time_per_call
+from app.extensions import db
+from app.models.review import Review
+from app.services.search import SearchService
+from itertools import accumulate
+import argparse
+import os
+import random
+import string
+import tempfile
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_REVIEW = 12
+
+def make_vocabulary():
+    rng = random.Random(42)
+    return [
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+def seed_vocabulary_reviews(count, vocabulary, batch_size=10000):
+    # Zipf-like weights, so a few words are very common and most are rare
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    rng = random.Random(7)
+    for start in range(0, count, batch_size):
+        rows = [
+            {'text': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=WORDS_PER_REVIEW))}
+            for _ in range(min(batch_size, count - start))
+        ]
+        db.session.execute(db.insert(Review), rows)
+        db.session.commit()
+
+def like_search(term):
+    return db.session.execute(
+        db.select(Review)
+        .where(Review.text.contains(term, autoescape=True))
+        .order_by(Review.id.desc())
+        .limit(21)
+    ).all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary()
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with app.app_context():
+            seed_vocabulary_reviews(args.rows, vocabulary)
+
+            queries = (
+                ('common', vocabulary[0]),
+                ('mid', vocabulary[500]),
+                ('rare', vocabulary[-1]),
+                ('two words', f'{vocabulary[3]} {vocabulary[40]}'),
+                ('no match', 'zzzzzzzzzz'),
+            )
+            print(f'{args.rows} reviews, first page of 20 results')
+            print('     query | matches |  fts ms | like ms')
+            for name, query in queries:
+                matches = db.session.execute(
+                    db.select(db.func.count()).where(SearchService.match(Review, query))
+                ).scalar()
+                fts_ms = time_per_call(lambda: SearchService.search(query), args.repeat)
+                # LIKE only supports a single substring, use the first word
+                like_ms = time_per_call(lambda: like_search(query.split()[0]), max(1, args.repeat // 10))
+                db.session.expunge_all()
+                print(f'{name:>10} | {matches:>7} | {fts_ms:7.2f} | {like_ms:7.1f}')
+            db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""Overhead of per-request timing: the game page with SERVER_TIMING_ENABLED off and on.
+
+Logging is silenced so only the collection and the header are measured.
+"""
+from benchmarks.common import make_app, seed_reviews, time_per_call
+import argparse
+import logging
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print('  timing | ms/request')
+    for enabled in (False, True):
+        app = make_app(SERVER_TIMING_ENABLED=enabled)
+        app.logger.setLevel(logging.WARNING)
+        with app.app_context():
+            seed_reviews(args.rows)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['seen_landing'] = True
+        client.get('/play')
+        ms = time_per_call(lambda: client.get('/play'), args.requests)
+        print(f"{'on' if enabled else 'off':>8} | {ms:10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Server time per game round: a vote plus /api/next-reviews vs one combined vote.
+
+Uses a SQLite file so every commit pays for a real transaction, and the
+Flask test client so the numbers include routing and session handling.
+"""
+from benchmarks.common import make_app, seed_reviews
+import argparse
+import os
+import random
+import tempfile
+import time
+
+def separate(client, review_id):
+    client.post('/vote', data={'review_id': review_id, 'vote_type': 'wine'})
+    return client.get('/api/next-reviews?count=1').json['reviews'][0]['id']
+
+def combined(client, review_id):
+    response = client.post('/vote', data={'review_id': review_id, 'vote_type': 'wine', 'include_next': 'true'})
+    return response.json['next_reviews'][0]['id']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    cases = (('vote + next', separate, 2), ('combined', combined, 1))
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with app.app_context():
+            seed_reviews(args.rows)
+        print(f'{args.rows} reviews, {args.rounds} rounds')
+        print('        mode | ms/round | requests/round')
+        for name, play_round, requests in cases:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['seen_landing'] = True
+            review_id = random.randint(1, args.rows)
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                review_id = play_round(client, review_id)
+            ms = (time.perf_counter() - start) * 1000 / args.rounds
+            print(f'{name:>12} | {ms:8.2f} | {requests:14}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Vote throughput on a single hot review against the number of counter shards.
+
+Row-lock contention is a PostgreSQL effect, so point --database-url at a
+Postgres database to see the difference; SQLite locks the whole file and
+won't improve with more shards.
+"""
+from benchmarks.common import add_database_arguments, bench_database_url, make_app
+from app.extensions import db
+from app.models.review import Review
+from app.services.review import ReviewService
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+def run(database_url, reset, shards, threads, votes_per_thread):
+    app = make_app(database_url, reset, VOTE_SHARDS=shards, VOTE_SHARD_COMPACT_INTERVAL=3600)
+    with app.app_context():
+        review = Review(text='Trending review', votes_headphones=0, votes_wine=0)
+        db.session.add(review)
+        db.session.commit()
+        review_id = review.id
+
+    def cast_votes():
+        with app.app_context():
+            for _ in range(votes_per_thread):
+                ReviewService.add_vote(review_id, 'headphones')
+
+    workers = [threading.Thread(target=cast_votes) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        app.extensions['vote_shard_compactor'].stop()
+        ReviewService.compact_vote_shards()
+        counted = db.session.get(Review, review_id).votes_headphones
+        db.drop_all()
+        db.engine.dispose()
+
+    print(f'{shards:>6} | {threads * votes_per_thread / elapsed:>9.0f} | {counted:>7}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_database_arguments(parser)
+    parser.add_argument('--shards', type=int, nargs='+', default=[0, 1, 4, 16, 64])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--votes', type=int, default=200, help='votes per thread')
+    args = parser.parse_args()
+
+    print('shards | votes/sec | counted')
+    for shards in args.shards:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = bench_database_url(args, tmp)
+            run(url, args.reset, shards, args.threads, args.votes)
+
+if __name__ == '__main__':
+    main()
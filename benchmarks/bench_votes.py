@@ -0,0 +1,81 @@
+"""Concurrent vote throughput: read-modify-write, UPDATE ... RETURNING and the vote buffer."""
+from benchmarks.common import add_database_arguments, bench_database_url, make_app
+from app.extensions import db
+from app.models.review import Review
+from app.services.review import ReviewService
+from app.services.vote_buffer import get_vote_buffer
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+def legacy_add_vote(review_id, vote_type):
+    """The previous ORM implementation, kept for comparison."""
+    review = db.session.get(Review, review_id)
+    if review:
+        if vote_type == 'headphones':
+            review.votes_headphones += 1
+        elif vote_type == 'wine':
+            review.votes_wine += 1
+        db.session.commit()
+    return review
+
+def run(name, add_vote, database_url, reset, threads, votes_per_thread, **settings):
+    app = make_app(database_url, reset, **settings)
+    with app.app_context():
+        review = Review(text='Benchmark review', votes_headphones=0, votes_wine=0)
+        db.session.add(review)
+        db.session.commit()
+        review_id = review.id
+
+    errors = []
+
+    def cast_votes():
+        with app.app_context():
+            for _ in range(votes_per_thread):
+                try:
+                    review = add_vote(review_id, 'headphones')
+                    ReviewService.calculate_vote_percentages(review)
+                except Exception:
+                    db.session.rollback()
+                    errors.append(1)
+
+    workers = [threading.Thread(target=cast_votes) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        get_vote_buffer().close()
+        counted = db.session.get(Review, review_id).votes_headphones
+        db.drop_all()
+        db.engine.dispose()
+
+    attempted = threads * votes_per_thread
+    lost = attempted - len(errors) - counted
+    print(f'{name:>8} | {attempted / elapsed:>9.0f} | {counted:>7} | {len(errors):>6} | {lost:>4}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_database_arguments(parser)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--votes', type=int, default=200, help='votes per thread')
+    args = parser.parse_args()
+
+    print('    mode | votes/sec | counted | errors | lost')
+    modes = (
+        ('legacy', legacy_add_vote, {}),
+        ('atomic', ReviewService.add_vote, {}),
+        ('buffered', ReviewService.add_vote, {'VOTE_BUFFER_ENABLED': True}),
+    )
+    for name, add_vote, settings in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = bench_database_url(args, tmp)
+            run(name, add_vote, url, args.reset, args.threads, args.votes, **settings)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks are plain scripts, run from the repository root, e.g.::
+
+    python -m benchmarks.bench_review_pool --sizes 10000 100000
+"""
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models.review import Review
+from sqlalchemy import inspect, make_url
+import os
+import random
+import time
+
+def bench_config(database_url='sqlite:///:memory:', **settings):
+    """Config class for a benchmark app bound to ``database_url``."""
+    return type('BenchmarkConfig', (TestingConfig,), dict(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        **settings
+    ))
+
+def make_app(database_url='sqlite:///:memory:', reset=False, **settings):
+    """Create an app bound to ``database_url`` with the tables created.
+
+    The database must not have any of the app's tables yet, unless reset
+    is set, in which case they are dropped and recreated.
+    """
+    app = create_app(bench_config(database_url, **settings))
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        else:
+            existing = set(inspect(db.engine).get_table_names()) & set(db.metadata.tables)
+            if existing:
+                raise SystemExit(
+                    f"{make_url(database_url).render_as_string()} already has tables "
+                    f"({', '.join(sorted(existing))}), pass --reset to drop and recreate them"
+                )
+        db.create_all()
+    return app
+
+def add_database_arguments(parser):
+    """Add --database-url and --reset to a benchmark's argument parser."""
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--reset', action='store_true',
+                        help='drop and recreate the tables of --database-url, destroying its data')
+
+def bench_database_url(args, tmp, name='bench.db'):
+    """The --database-url to benchmark, or a SQLite file in the directory ``tmp``."""
+    return args.database_url or f"sqlite:///{os.path.join(tmp, name)}"
+
+def seed_reviews(count, batch_size=10000):
+    """Insert ``count`` synthetic reviews using batched executemany."""
+    for start in range(0, count, batch_size):
+        rows = [
+            {
+                'text': f'Synthetic review {i}: notes of cherry, wide soundstage',
+                'votes_headphones': random.randint(40, 60),
+                'votes_wine': random.randint(40, 60),
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        db.session.execute(db.insert(Review), rows)
+    db.session.commit()
+
+def time_per_call(func, repeat):
+    """Return the mean wall time of ``func()`` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def throughput(func, count):
+    """Return calls per second of ``func()`` over ``count`` calls."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
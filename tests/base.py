@@ -1,3 +1,7 @@
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 from datetime import datetime, UTC
 from app import create_app
@@ -75,4 +79,38 @@ class BaseTestCase(unittest.TestCase):
         })
         with self.client.session_transaction() as sess:
             sess['logged_in'] = True
-            sess['user_id'] = self.admin.id 
\ No newline at end of file
+            sess['user_id'] = self.admin.id
+
+class FileDatabaseTestCase(unittest.TestCase):
+    """Test case backed by a temporary SQLite file, for tests that use threads"""
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        config_class = type('FileDatabaseConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        })
+        self.app = create_app(config_class)
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    def run_threads(self, target, count):
+        """Run target in count threads, each in its own app context, and return any errors"""
+        errors = []
+
+        def worker():
+            with self.app.app_context():
+                try:
+                    target()
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
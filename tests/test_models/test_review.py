@@ -1,5 +1,5 @@
 from tests.base import BaseTestCase
-from app.models.review import Review, PendingReview
+from app.models.review import Review, PendingReview, hash_review_text
 from datetime import datetime, timezone
 
 class TestReviewModel(BaseTestCase):
@@ -56,4 +56,29 @@ class TestReviewModel(BaseTestCase):
         approved = pending.approve()
         self.assertIsInstance(approved, Review)
         self.assertEqual(approved.text, "Pending review")
-        self.assertTrue(approved.is_active) 
\ No newline at end of file
+        self.assertTrue(approved.is_active)
+
+    def test_hash_review_text_normalises(self):
+        """Test that case, Unicode form and whitespace don't change the hash"""
+        self.assertEqual(hash_review_text('  Crisp\tHIGHS \n'), hash_review_text('crisp highs'))
+        self.assertEqual(hash_review_text('Ｃａｆé'), hash_review_text('cafe\u0301'))
+        self.assertNotEqual(hash_review_text('crisp highs'), hash_review_text('crisp high'))
+
+    def test_content_hash_tracks_text(self):
+        """Test that the hash is set for ORM and Core inserts and follows edits"""
+        review = Review(text='Original text')
+        pending = PendingReview(text='Original text')
+        self.db.session.add_all([review, pending])
+        self.db.session.commit()
+        self.assertEqual(review.content_hash, hash_review_text('Original text'))
+        self.assertEqual(pending.content_hash, review.content_hash)
+
+        review.text = 'Edited text'
+        self.db.session.commit()
+        self.assertEqual(review.content_hash, hash_review_text('edited TEXT'))
+
+        self.db.session.execute(self.db.insert(Review), [{'text': 'Core insert'}])
+        stored = self.db.session.scalar(
+            self.db.select(Review.content_hash).where(Review.text == 'Core insert')
+        )
+        self.assertEqual(stored, hash_review_text('Core insert'))
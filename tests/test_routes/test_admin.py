@@ -1,6 +1,12 @@
 from tests.base import BaseTestCase
 from app.models.review import Review
+from app.services.review import ReviewService
+from app.utils.pagination import encode_cursor
 from sqlalchemy import text
+from unittest import mock
+import gzip
+import io
+import json
 
 class TestAdminRoutes(BaseTestCase):
     def setUp(self):
@@ -11,11 +17,129 @@ class TestAdminRoutes(BaseTestCase):
         response = self.client.get('/admin/manage-reviews')
         self.assertEqual(response.status_code, 200)
 
+    def test_manage_reviews_pagination(self):
+        """Test that the list links to the next page of reviews"""
+        self.app.config['REVIEWS_PER_PAGE'] = 2
+        for i in range(3):
+            self.create_test_review(f'Paged review {i}')
+        
+        response = self.client.get('/admin/manage-reviews')
+        self.assertIn(b'Paged review 2', response.data)
+        self.assertNotIn(b'Paged review 0', response.data)
+        self.assertIn(b'Next page', response.data)
+        
+        _, cursor = ReviewService.get_reviews_page()
+        response = self.client.get(f'/admin/manage-reviews?cursor={cursor}')
+        self.assertIn(b'Paged review 0', response.data)
+        self.assertNotIn(b'Next page', response.data)
+
+    def test_manage_reviews_invalid_cursor(self):
+        response = self.client.get('/admin/manage-reviews?cursor=garbage')
+        self.assertEqual(response.status_code, 400)
+        cursor = encode_cursor('most_votes', 'ten', 1)
+        response = self.client.get(f'/admin/manage-reviews?sort=most_votes&cursor={cursor}')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/admin/api/reviews?sort=most_votes&cursor={cursor}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_reviews_page_json(self):
+        """Test loading every review through the JSON endpoint"""
+        for i in range(5):
+            self.create_test_review(f'Review {i}')
+        
+        texts, cursor = [], None
+        while True:
+            url = '/admin/api/reviews?per_page=2&sort=oldest'
+            response = self.client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            self.assertEqual(response.status_code, 200)
+            texts.extend(review['text'] for review in response.json['reviews'])
+            cursor = response.json['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(texts, [f'Review {i}' for i in range(5)])
+
+    def test_reviews_page_json_invalid_sort(self):
+        response = self.client.get('/admin/api/reviews?sort=random')
+        self.assertEqual(response.status_code, 400)
+
+    def test_text_display(self):
+        self.create_test_review('Displayed review')
+        response = self.client.get('/admin/test-text-display')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Displayed review', response.data)
+
+    def test_search_reviews(self):
+        self.create_test_review('Plush leather earcups')
+        self.create_test_review('Plummy and rich')
+        
+        response = self.client.get('/admin/search?q=earcup')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['text'] for result in response.json['results']], ['Plush leather earcups'])
+        self.assertFalse(response.json['has_more'])
+
+    def test_search_pending_reviews(self):
+        self.create_pending_review('Pending plush review')
+        response = self.client.get('/admin/search?q=plush&scope=pending')
+        self.assertEqual([result['text'] for result in response.json['results']], ['Pending plush review'])
+
+    def test_search_invalid_arguments(self):
+        self.assertEqual(self.client.get('/admin/search').status_code, 400)
+        self.assertEqual(self.client.get('/admin/search?q=x&scope=users').status_code, 400)
+
     def test_pending_reviews(self):
         pending = self.create_pending_review('Test pending review')
         response = self.client.get('/admin/pending-reviews')
         self.assertEqual(response.status_code, 200)
 
+    def test_batch_approve_form(self):
+        first = self.create_pending_review('First batch review')
+        second = self.create_pending_review('Second batch review')
+        response = self.client.post('/admin/approve-pending', data={
+            'review_ids': [str(first.id), str(second.id)]
+        }, follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'2 review(s) approved', response.data)
+        self.assertEqual(Review.query.count(), 2)
+
+    def test_batch_reject_json(self):
+        pending = self.create_pending_review('Rejected in a batch')
+        response = self.client.post('/admin/reject-pending', json={'ids': [pending.id, 404]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'success': True,
+            'processed': 1,
+            'results': {str(pending.id): 'rejected', '404': 'not_found'}
+        })
+        
+        response = self.client.post('/admin/reject-pending', json={'all': True})
+        self.assertEqual(response.json['processed'], 0)
+
+    def test_batch_moderation_invalid_requests(self):
+        for body in ({}, {'ids': []}, {'ids': 'abc'}, {'ids': ['x']}, {'ids': list(range(1001))}):
+            response = self.client.post('/admin/approve-pending', json=body)
+            self.assertEqual(response.status_code, 400, body)
+        response = self.client.post('/admin/approve-pending', data={}, follow_redirects=True)
+        self.assertIn(b'No reviews selected', response.data)
+
+    def test_pending_reviews_flags_near_duplicates(self):
+        original = self.create_test_review('Crisp highs and a punchy low end, like a cold lager on a hot day')
+        self.create_pending_review('Crisp highs and a punchy low end, like a cold lager on a warm day!')
+        self.create_pending_review('Something else entirely')
+        response = self.client.get('/admin/pending-reviews')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'Possible near-duplicate'), 1)
+        self.assertIn(f'review #{original.id}'.encode(), response.data)
+        self.assertNotIn(b'Still checking for near-duplicates', response.data)
+
+    def test_pending_reviews_while_near_duplicate_index_builds(self):
+        self.create_test_review('Crisp highs and a punchy low end, like a cold lager on a hot day')
+        self.create_pending_review('Crisp highs and a punchy low end, like a cold lager on a warm day!')
+        with mock.patch.object(ReviewService, 'find_near_duplicates', return_value=None):
+            response = self.client.get('/admin/pending-reviews')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Still checking for near-duplicates', response.data)
+        self.assertNotIn(b'Possible near-duplicate', response.data)
+
     def test_review_actions(self):
         # Test approve action
         pending = self.create_pending_review('Test pending review')
@@ -223,6 +347,127 @@ class TestAdminRoutes(BaseTestCase):
         updated_review = self.db.session.get(Review, review.id)
         self.assertNotEqual(updated_review.votes_headphones, initial_votes) 
 
+    def test_export_reviews(self):
+        """Test that the streamed JSON export contains every review"""
+        self.create_test_review('First review')
+        self.create_test_review('Second review')
+        
+        response = self.client.get('/admin/export-reviews')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertIn('reviews_export.json', response.headers['Content-Disposition'])
+        
+        reviews = json.loads(response.data)
+        self.assertEqual([review['text'] for review in reviews], ['First review', 'Second review'])
+        self.assertEqual(reviews[0]['votes_headphones'], 10)
+        self.assertIsNotNone(reviews[0]['created_at'])
+
+    def test_export_reviews_empty(self):
+        response = self.client.get('/admin/export-reviews')
+        self.assertEqual(json.loads(response.data), [])
+
+    def test_export_reviews_ndjson_gzip(self):
+        """Test the gzipped NDJSON export across several batches"""
+        for i in range(5):
+            self.create_test_review(f'Review {i}')
+        
+        response = self.client.get('/admin/export-reviews?format=ndjson&gzip=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/gzip')
+        self.assertIn('reviews_export.ndjson.gz', response.headers['Content-Disposition'])
+        
+        lines = gzip.decompress(response.data).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['text'] for line in lines], [f'Review {i}' for i in range(5)])
+
+    def test_export_reviews_batches(self):
+        """Test that small batches still produce one valid JSON document"""
+        for i in range(5):
+            self.create_test_review(f'Review {i}')
+        
+        chunks = list(ReviewService.export_reviews(batch_size=2))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(len(json.loads(''.join(chunks))), 5)
+
+    def test_export_reviews_invalid_format(self):
+        response = self.client.get('/admin/export-reviews?format=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def upload(self, data, filename='reviews.json', **form):
+        return self.client.post(
+            '/admin/import-reviews',
+            data={'file': (io.BytesIO(data), filename), **form},
+            content_type='multipart/form-data'
+        )
+
+    def test_import_reviews(self):
+        """Test importing a JSON array of reviews"""
+        reviews = [{'text': f'Imported {i}', 'votes_headphones': i, 'votes_wine': 1} for i in range(3)]
+        response = self.upload(json.dumps(reviews).encode())
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json['success'])
+        self.assertEqual(response.json['imported'], 3)
+        self.assertEqual(
+            [(review.text, review.votes_headphones) for review in Review.query.order_by(Review.id)],
+            [('Imported 0', 0), ('Imported 1', 1), ('Imported 2', 2)]
+        )
+
+    def test_import_reviews_ndjson_gzip(self):
+        lines = ''.join(json.dumps({'text': f'Imported {i}'}) + '\n' for i in range(3))
+        response = self.upload(gzip.compress(lines.encode()), 'reviews.ndjson.gz')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Review.query.count(), 3)
+
+    def test_import_reviews_round_trip(self):
+        """Test that an export can be imported again"""
+        self.create_test_review('Exported review')
+        export = self.client.get('/admin/export-reviews?format=ndjson&gzip=true').data
+        
+        response = self.upload(export, 'reviews_export.ndjson.gz', clear_existing='on')
+        self.assertTrue(response.json['success'])
+        review = Review.query.one()
+        self.assertEqual((review.text, review.votes_headphones, review.votes_wine), ('Exported review', 10, 5))
+
+    def test_import_reviews_reports_invalid_records(self):
+        """Test that invalid records are skipped and reported"""
+        data = json.dumps([{'text': 'Good'}, {'text': 'Bad', 'votes_wine': 'many'}, 'not a review'])
+        response = self.upload(data.encode())
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json['success'])
+        self.assertEqual(response.json['imported'], 1)
+        self.assertEqual(response.json['failed'], 2)
+        self.assertEqual(len(response.json['errors']), 2)
+        self.assertIn('Record 2', response.json['errors'][0])
+
+    def test_import_reviews_malformed_file(self):
+        """Test that batches before a parse error are kept"""
+        self.app.config['IMPORT_BATCH_SIZE'] = 2
+        response = self.upload(b'[{"text": "a"}, {"text": "b"}, {"text": "c"}, oops]')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json['imported'], 3)
+        self.assertIn('Stopped after record 3', response.json['errors'][0])
+        self.assertTrue(response.json['message'].startswith('Import stopped early, 3 reviews imported'))
+
+    def test_import_reviews_malformed_file_keeps_existing(self):
+        """Test that clear_existing doesn't delete anything when the file can't be read"""
+        self.create_test_review('Existing review')
+        self.app.config['IMPORT_BATCH_SIZE'] = 2
+        for data in (b'this is not json', b'[{"text": "a"}, {"text": "b"}, {"text": "c"}, oops]'):
+            response = self.upload(data, clear_existing='true')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json['imported'], 0)
+            self.assertTrue(response.json['message'].startswith(
+                'Import failed, no reviews were imported, existing reviews were kept'
+            ))
+            self.assertEqual([review.text for review in Review.query], ['Existing review'])
+
+    def test_import_reviews_invalid_file_type(self):
+        response = self.upload(b'text', 'reviews.csv')
+        self.assertEqual(response.status_code, 400)
+
     def test_reset_all_votes_error(self):
         """Test error handling in reset all votes"""
         # Force an error by deleting the reviews table
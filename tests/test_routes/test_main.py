@@ -1,6 +1,6 @@
 from tests.base import BaseTestCase
 import json
-from app.models.review import Review
+from app.models.review import Review, PendingReview
 from flask import url_for
 
 class TestMainRoutes(BaseTestCase):
@@ -51,6 +51,44 @@ class TestMainRoutes(BaseTestCase):
         self.assertIn(b'Thank You for Your Submission', response.data)
         self.assertIn(b'Your review has been submitted and will be reviewed by an admin', response.data)
 
+    def test_submit_review_with_captcha_image(self):
+        """Test the page, binary captcha image and submission flow"""
+        response = self.client.get('/submit-review')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'data:image/png;base64', response.data)
+        with self.client.session_transaction() as sess:
+            token = sess['captcha_token']
+            self.assertNotIn('captcha_answer', sess)
+        self.assertIn(f'/captcha.png?token={token}'.encode(), response.data)
+
+        response = self.client.get(f'/captcha.png?token={token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        self.assertTrue(response.data.startswith(b'\x89PNG'))
+        with self.client.session_transaction() as sess:
+            answer = sess['captcha_answer']
+
+        response = self.client.post('/submit-review', data={
+            'review_text': 'Image captcha review',
+            'captcha_answer': answer
+        }, follow_redirects=True)
+        self.assertIn(b'Thank You for Your Submission', response.data)
+
+    def test_captcha_image_requires_session_token(self):
+        self.client.get('/submit-review')
+        response = self.client.get('/captcha.png?token=not-the-token')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/captcha.png')
+        self.assertEqual(response.status_code, 404)
+
+    def test_refresh_captcha(self):
+        response = self.client.post('/refresh-captcha')
+        self.assertEqual(response.status_code, 200)
+        with self.client.session_transaction() as sess:
+            token = sess['captcha_token']
+        self.assertEqual(response.json['captcha_url'], f'/captcha.png?token={token}')
+
     def test_start_game(self):
         # Create a test review first
         self.create_test_review()
@@ -71,6 +109,29 @@ class TestMainRoutes(BaseTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'Review added successfully', response.data)
 
+    def test_submit_duplicate_review(self):
+        """Test that resubmitting existing text is rejected"""
+        self.create_test_review('Already a review')
+        ajax = {'X-Requested-With': 'XMLHttpRequest'}
+        
+        # Without a valid captcha nothing reveals whether the text is stored
+        response = self.client.post('/submit-review', data={
+            'review_text': 'already  a review',
+            'captcha_answer': 'wrong'
+        }, headers=ajax)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['error'], 'Invalid captcha. Please try again.')
+        
+        with self.client.session_transaction() as sess:
+            sess['captcha_answer'] = 'ABCD'
+        response = self.client.post('/submit-review', data={
+            'review_text': 'already  a review',
+            'captcha_answer': 'abcd'
+        }, headers=ajax)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json['success'])
+        self.assertEqual(self.db.session.query(PendingReview).count(), 0)
+
     def test_submit_review_rate_limited(self):
         # Create rate limit
         self.create_rate_limit('127.0.0.1', 6)  # Over limit
@@ -81,6 +142,70 @@ class TestMainRoutes(BaseTestCase):
         }, follow_redirects=True)
         self.assertEqual(response.status_code, 429) 
 
+    def test_next_reviews(self):
+        """Test that batches skip voted and excluded reviews"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(4)]
+        with self.client.session_transaction() as sess:
+            sess['voted_reviews'] = [reviews[0].id]
+        
+        response = self.client.get(f'/api/next-reviews?count=5&exclude={reviews[1].id}')
+        self.assertEqual(response.status_code, 200)
+        batch = response.json['reviews']
+        self.assertEqual(sorted(review['id'] for review in batch), [reviews[2].id, reviews[3].id])
+        self.assertEqual(batch[0]['headphones_percentage'] + batch[0]['wine_percentage'], 100)
+        self.assertIn(batch[0]['text'], ('Review 2', 'Review 3'))
+
+    def test_next_reviews_without_pool(self):
+        self.app.config['REVIEW_POOL_ENABLED'] = False
+        reviews = [self.create_test_review(f'Review {i}') for i in range(3)]
+        response = self.client.get(f'/api/next-reviews?exclude={reviews[0].id},{reviews[1].id}')
+        self.assertEqual([review['id'] for review in response.json['reviews']], [reviews[2].id])
+        
+        # Once everything is excluded any review is returned
+        response = self.client.get(f'/api/next-reviews?count=1&exclude={reviews[0].id},{reviews[1].id},{reviews[2].id}')
+        self.assertEqual(len(response.json['reviews']), 1)
+
+    def test_next_reviews_invalid_arguments(self):
+        for query in ('count=0', 'count=21', 'count=x', 'exclude=1,x', 'exclude=' + ','.join(['1'] * 101)):
+            self.assertEqual(self.client.get(f'/api/next-reviews?{query}').status_code, 400, query)
+        self.assertEqual(self.client.get('/api/next-reviews').json, {'reviews': []})
+
+    def test_vote_include_next(self):
+        """Test that a vote can return the next unvoted reviews"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(4)]
+        with self.client.session_transaction() as sess:
+            sess['voted_reviews'] = [reviews[1].id]
+        
+        response = self.client.post('/vote', data={
+            'review_id': reviews[0].id,
+            'vote_type': 'wine',
+            'include_next': 'true',
+            'next_count': 5,
+            'exclude': reviews[2].id
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['wine_percentage'], 37)  # 6 of 16
+        self.assertEqual([review['id'] for review in response.json['next_reviews']], [reviews[3].id])
+        self.assertEqual(self.db.session.get(Review, reviews[0].id).votes_wine, 6)
+        with self.client.session_transaction() as sess:
+            self.assertEqual(sess['voted_reviews'], [reviews[1].id, reviews[0].id])
+        
+        # Plain votes don't pick anything
+        response = self.client.post('/vote', data={'review_id': reviews[3].id, 'vote_type': 'wine'})
+        self.assertNotIn('next_reviews', response.json)
+
+    def test_vote_include_next_invalid_arguments(self):
+        review = self.create_test_review()
+        for data in ({'next_count': 0}, {'next_count': 'x'}, {'exclude': '1,x'}):
+            response = self.client.post('/vote', data={
+                'review_id': review.id, 'vote_type': 'wine', 'include_next': '1', **data
+            })
+            self.assertEqual(response.status_code, 400, data)
+        self.assertEqual(self.db.session.get(Review, review.id).votes_wine, 5)
+        
+        response = self.client.post('/vote', data={'review_id': 999, 'vote_type': 'wine', 'include_next': '1'})
+        self.assertEqual(response.status_code, 404)
+
     def test_vote_with_invalid_data(self):
         """Test voting with invalid data"""
         # Test invalid review_id
@@ -0,0 +1,57 @@
+from tests.base import BaseTestCase
+from app.services.captcha import CaptchaService, CaptchaPool
+import base64
+
+class TestCaptchaService(BaseTestCase):
+    def test_generate_captcha(self):
+        image, answer = CaptchaService().generate_captcha()
+        self.assertEqual(len(answer), self.app.config['CAPTCHA_LENGTH'])
+        self.assertTrue(base64.b64decode(image).startswith(b'\x89PNG'))
+
+    def test_image_captcha_is_shared(self):
+        """Test that the generator and its fonts are built once per process"""
+        first = CaptchaService().get_image_captcha()
+        CaptchaService().generate_captcha()
+        self.assertIs(CaptchaService().get_image_captcha(), first)
+        self.assertEqual(len(first.truefonts), 3)
+
+    def test_verify_captcha(self):
+        self.assertTrue(CaptchaService.verify_captcha('abcd', 'ABCD'))
+        self.assertFalse(CaptchaService.verify_captcha('', 'ABCD'))
+        self.assertFalse(CaptchaService.verify_captcha('ABCE', 'ABCD'))
+
+class TestCaptchaPool(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pool = CaptchaPool(self.app, size=3, length=4, refill_interval=3600)
+        self.app.extensions['captcha_pool'] = self.pool
+
+    def tearDown(self):
+        self.pool.stop()
+        super().tearDown()
+
+    def test_fill_is_bounded(self):
+        self.assertEqual(self.pool.fill(), 3)
+        self.assertEqual(self.pool.fill(), 0)
+        self.assertEqual(len(self.pool), 3)
+
+    def test_generate_captcha_uses_pool(self):
+        """Test that captchas come from the pool and fall back when it is empty"""
+        self.pool.fill()
+        for _ in range(4):
+            image, answer = CaptchaService().generate_captcha()
+            self.assertEqual(len(answer), 4)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.75)
+        self.assertEqual(stats['available'], 0)
+
+    def test_pool_stats_route(self):
+        self.login_admin()
+        self.pool.fill()
+        response = self.client.get('/admin/captcha-pool')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json['enabled'])
+        self.assertEqual(response.json['fill_level'], 1.0)
@@ -0,0 +1,118 @@
+from tests.base import BaseTestCase
+from app.services.near_duplicates import NearDuplicateIndex, get_near_duplicate_index
+from app.services.review import ReviewService
+from app.models.review import Review
+from unittest import mock
+import time
+
+LAGER = 'Crisp highs and a punchy low end, like a cold lager on a hot day'
+MERLOT = 'Deep tannins with a long finish, best enjoyed slowly by the fire'
+
+class TestNearDuplicateIndex(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = get_near_duplicate_index()
+
+    def test_shingles_ignore_case_and_whitespace(self):
+        self.assertTrue((NearDuplicateIndex.shingles('Cold  LAGER') == NearDuplicateIndex.shingles('cold lager')).all())
+        self.assertEqual(len(NearDuplicateIndex.shingles('abc')), 1)
+        self.assertEqual(NearDuplicateIndex.similarity(
+            NearDuplicateIndex.shingles(LAGER), NearDuplicateIndex.shingles(LAGER)
+        ), 1.0)
+
+    def test_finds_edited_copies_only(self):
+        lager = self.create_test_review(LAGER)
+        self.create_test_review(MERLOT)
+
+        results = self.index.find_similar({
+            'edited': 'Crisp highs and a punchy low end, like a cold lager on a warm day!',
+            'unrelated': 'Nothing in common with anything stored here',
+        })
+        self.assertEqual(list(results), ['edited'])
+        [(review, similarity)] = results['edited']
+        self.assertEqual(review.id, lager.id)
+        self.assertTrue(self.index.threshold <= similarity < 1)
+
+    def test_indexes_reviews_added_after_first_lookup(self):
+        self.assertEqual(self.index.find_similar({1: LAGER}), {})
+
+        review = self.create_test_review(LAGER)
+        self.assertEqual(self.index.find_similar({1: LAGER})[1][0][0].id, review.id)
+
+    def test_deleted_and_edited_reviews(self):
+        lager = self.create_test_review(LAGER)
+        merlot = self.create_test_review(MERLOT)
+        self.index.refresh()
+
+        ReviewService.delete_review(lager.id)
+        self.assertEqual(self.index.find_similar({1: LAGER}), {})
+
+        ReviewService.update_review(merlot.id, LAGER)
+        self.assertEqual(self.index.find_similar({1: LAGER})[1][0][0].id, merlot.id)
+        self.assertEqual(self.index.find_similar({1: MERLOT}), {})
+
+    def test_deleted_id_is_not_reused(self):
+        """Test that a review added after the newest one is deleted is indexed"""
+        self.create_test_review(MERLOT)
+        newest = self.create_test_review('Warm mids and a slightly veiled treble')
+        self.index.refresh()
+        
+        ReviewService.delete_review(newest.id)
+        lager = self.create_test_review(LAGER)
+        self.assertGreater(lager.id, newest.id)
+        self.assertEqual(self.index.find_similar({1: LAGER})[1][0][0].id, lager.id)
+        
+        # Deleted by another process, which doesn't invalidate this index
+        self.db.session.execute(self.db.delete(Review).where(Review.id == lager.id))
+        self.db.session.commit()
+        self.index.refresh()
+        stout = self.create_test_review(LAGER.replace('lager', 'stout'))
+        self.assertGreater(stout.id, lager.id)
+        self.assertEqual(self.index.find_similar({1: LAGER})[1][0][0].id, stout.id)
+
+    def test_invalidate_reloads(self):
+        self.create_test_review(LAGER)
+        self.index.refresh()
+
+        ReviewService.import_reviews([{'text': MERLOT}], clear_existing=True)
+        self.assertEqual(self.index.find_similar({1: LAGER}), {})
+        self.assertIn(1, self.index.find_similar({1: MERLOT}))
+
+    def test_background_build(self):
+        """Test that lookups don't build the index while a background task does"""
+        self.create_test_review(LAGER)
+        index = NearDuplicateIndex()
+        task = index.refresh_in_background(self.app, 3600)
+        with mock.patch.object(task, 'start'):
+            self.assertIsNone(index.find_similar({1: LAGER}))
+        self.assertFalse(index.ready)
+        
+        task.start()
+        try:
+            for _ in range(100):
+                if index.ready:
+                    break
+                time.sleep(0.05)
+            self.assertIn(1, index.find_similar({1: LAGER}))
+            
+            # Invalidated indexes wait for the next background refresh too
+            NearDuplicateIndex.invalidate()
+            self.assertIsNone(index.find_similar({1: LAGER}))
+        finally:
+            task.stop(timeout=5)
+
+    def test_edit_during_rebuild(self):
+        """Test that an edit made while the index is rebuilt isn't lost"""
+        lager = self.create_test_review(LAGER)
+        load = self.index._load
+        def load_then_edit(buckets, after_id):
+            max_id = load(buckets, after_id)
+            self.db.session.get(Review, lager.id).text = MERLOT
+            self.db.session.commit()
+            self.index.add(lager.id, MERLOT)
+            return max_id
+        
+        with mock.patch.object(self.index, '_load', side_effect=load_then_edit):
+            self.index.rebuild()
+        self.assertEqual(self.index.find_similar({1: MERLOT})[1][0][0].id, lager.id)
+
@@ -0,0 +1,80 @@
+from tests.base import BaseTestCase
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import event
+from app.models.review import Review
+from app.services.rate_limit import MemoryRateLimiter, RateLimitService
+from app.services.review import ReviewService
+from app.services.search import SearchService
+import re
+
+# A table read without an index, or rows sorted after they were read
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+class TestQueryPlans(BaseTestCase):
+    """Fail if a hot service query can't use an index.
+
+    Runs each service call, records the SQL it executes and checks the
+    EXPLAIN QUERY PLAN of every statement.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.create_test_review(f'Review number {i}')
+            self.create_pending_review(f'Pending number {i}')
+        RateLimitService.create_rate_limit('192.0.2.1')
+
+    def assert_uses_indexes(self, call, allow_sort=False):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+        engine = self.db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            call()
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        self.assertTrue(statements)
+        connection = self.db.session.connection()
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            # Subqueries and the schema table also show up as SCAN, only model tables count
+            scans = [
+                row[-1] for row in plan
+                if (match := FULL_SCAN.search(row[-1])) and match.group(1) in self.db.metadata.tables
+                or row[-1] == SORT and not allow_sort
+            ]
+            self.assertEqual(scans, [], f'{statement}\n{plan}')
+        self.db.session.rollback()
+
+    def test_review_queries(self):
+        review_id = Review.query.first().id
+        self.assert_uses_indexes(ReviewService.get_all_reviews)
+        self.assert_uses_indexes(lambda: ReviewService.get_review(review_id))
+        self.assert_uses_indexes(lambda: ReviewService.is_duplicate('Review number 1'))
+        with self.app.test_request_context():
+            self.assert_uses_indexes(lambda: ReviewService.add_vote(review_id, 'wine'))
+        # Ranked results are sorted, but there are at most MAX_RANKED_MATCHES of them
+        self.assert_uses_indexes(lambda: SearchService.search('number'), allow_sort=True)
+
+        for sort in ReviewService.REVIEW_SORTS:
+            _, cursor = ReviewService.get_reviews_page(per_page=1, sort=sort)
+            self.assert_uses_indexes(lambda: ReviewService.get_reviews_page(cursor=cursor, per_page=1, sort=sort))
+
+    def test_pending_review_queries(self):
+        pending = ReviewService.get_pending_reviews()
+        self.assert_uses_indexes(ReviewService.get_pending_reviews)
+        self.assert_uses_indexes(lambda: ReviewService.approve_pending_reviews([pending[0].id, 999]))
+        self.assert_uses_indexes(lambda: ReviewService.reject_pending_reviews([pending[1].id]))
+
+    def test_rate_limit_queries(self):
+        cutoff = datetime.now(UTC) - timedelta(hours=1)
+        self.assert_uses_indexes(lambda: RateLimitService.check_rate_limit('192.0.2.1'))
+        self.assert_uses_indexes(lambda: RateLimitService.cleanup_old_entries(cutoff))
+        self.assert_uses_indexes(lambda: RateLimitService.cleanup_old_entries(cutoff, batch_size=10))
+        self.assert_uses_indexes(lambda: RateLimitService.block_ip('192.0.2.1'))
+        self.assert_uses_indexes(lambda: MemoryRateLimiter()._blocked_ips())
@@ -1,5 +1,5 @@
-from tests.base import BaseTestCase
-from app.services.rate_limit import RateLimitService
+from tests.base import BaseTestCase, FileDatabaseTestCase
+from app.services.rate_limit import RateLimitService, MemoryRateLimiter
 from datetime import datetime, timedelta, UTC
 from sqlalchemy import select
 from app.models.rate_limit import RateLimit
@@ -50,6 +50,40 @@ class TestRateLimitService(BaseTestCase):
         ).scalar()
         self.assertIsNotNone(recent_record)
 
+    def test_cleanup_in_batches(self):
+        """Test that batched cleanup removes every expired entry"""
+        for i in range(7):
+            rate_limit = self.create_rate_limit(f'10.0.1.{i}', 1)
+            rate_limit.last_request = datetime.now(UTC) - timedelta(hours=2)
+        self.create_rate_limit('10.0.2.1', 1)
+        self.db.session.commit()
+
+        deleted = RateLimitService.cleanup_old_entries(batch_size=3)
+        self.assertEqual(deleted, 7)
+        self.assertEqual(self.db.session.query(RateLimit).count(), 1)
+
+    def test_cleanup_keeps_blocked_ips(self):
+        """Test that admin blocks survive cleanup however old they are"""
+        RateLimitService.block_ip('10.0.4.1')
+        for rate_limit in self.db.session.query(RateLimit):
+            rate_limit.last_request = datetime.now(UTC) - timedelta(days=30)
+        self.db.session.commit()
+
+        for batch_size in (None, 10):
+            self.assertEqual(RateLimitService.cleanup_old_entries(batch_size=batch_size), 0)
+        rate_limit = self.db.session.execute(
+            select(RateLimit).filter_by(ip_address='10.0.4.1')
+        ).scalar_one()
+        self.assertTrue(rate_limit.is_blocked)
+
+    def test_cleanup_command(self):
+        rate_limit = self.create_rate_limit('10.0.3.1', 1)
+        rate_limit.last_request = datetime.now(UTC) - timedelta(hours=2)
+        self.db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['cleanup-rate-limits', '--batch-size', '10'])
+        self.assertIn('Deleted 1 rate limit entries', result.output)
+
     def test_block_unblock_ip(self):
         # Test blocking IP
         RateLimitService.block_ip('10.0.0.3')
@@ -63,4 +97,104 @@ class TestRateLimitService(BaseTestCase):
         rate_limit = self.db.session.execute(
             select(RateLimit).filter_by(ip_address='10.0.0.3')
         ).scalar_one()
-        self.assertFalse(rate_limit.is_blocked) 
\ No newline at end of file
+        self.assertFalse(rate_limit.is_blocked)
+
+    def test_blocked_ip_is_rejected(self):
+        """Test that an admin block applies below the request limit"""
+        RateLimitService.block_ip('10.0.0.4')
+        self.assertFalse(RateLimitService.check_rate_limit('10.0.0.4'))
+
+    def test_stale_entry_starts_new_window(self):
+        """Test that a blocked entry resets once it has been quiet for a window"""
+        rate_limit = self.create_rate_limit('10.0.0.5', 10)
+        rate_limit.is_blocked = True
+        rate_limit.last_request = datetime.now(UTC) - timedelta(hours=2)
+        self.db.session.commit()
+
+        self.assertTrue(RateLimitService.check_rate_limit('10.0.0.5'))
+        self.db.session.refresh(rate_limit)
+        self.assertEqual(rate_limit.count, 1)
+        self.assertFalse(rate_limit.is_blocked)
+
+class TestMemoryRateLimiter(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 7200.0
+        self.limiter = MemoryRateLimiter(max_entries=3, clock=lambda: self.now)
+        self.app.extensions['rate_limiter'] = self.limiter
+
+    def test_rate_limiting(self):
+        """Test that the same number of requests is allowed as the database backend"""
+        results = [RateLimitService.check_rate_limit('127.0.0.1') for _ in range(5)]
+        self.assertEqual(results, [True, True, True, True, False])
+        self.assertTrue(RateLimitService.check_rate_limit('127.0.0.2'))
+        self.assertEqual(self.db.session.query(RateLimit).count(), 0)
+
+    def test_sliding_window(self):
+        """Test that requests from the previous window age out gradually"""
+        for _ in range(4):
+            RateLimitService.check_rate_limit('127.0.0.1')
+
+        # Halfway into the next window half of the old requests still count
+        self.now += 3600 * 1.5
+        self.assertTrue(RateLimitService.check_rate_limit('127.0.0.1'))
+        self.assertTrue(RateLimitService.check_rate_limit('127.0.0.1'))
+        self.assertFalse(RateLimitService.check_rate_limit('127.0.0.1'))
+
+        # Two windows later everything has expired
+        self.now += 3600 * 2
+        self.assertTrue(RateLimitService.check_rate_limit('127.0.0.1'))
+
+    def test_evicts_least_recently_seen(self):
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            RateLimitService.check_rate_limit(ip)
+        RateLimitService.check_rate_limit('10.0.0.1')
+        RateLimitService.check_rate_limit('10.0.0.4')
+
+        self.assertEqual(len(self.limiter), 3)
+        self.assertNotIn('10.0.0.2', self.limiter._entries)
+        self.assertIn('10.0.0.1', self.limiter._entries)
+
+    def test_admin_blocks_are_persisted_and_enforced(self):
+        RateLimitService.block_ip('10.0.0.5')
+        rate_limit = self.db.session.execute(
+            select(RateLimit).filter_by(ip_address='10.0.0.5')
+        ).scalar_one()
+        self.assertTrue(rate_limit.is_blocked)
+        self.assertFalse(RateLimitService.check_rate_limit('10.0.0.5'))
+
+        # A fresh limiter picks the block up from the table
+        self.app.extensions['rate_limiter'] = MemoryRateLimiter()
+        self.assertFalse(RateLimitService.check_rate_limit('10.0.0.5'))
+
+        RateLimitService.unblock_ip('10.0.0.5')
+        self.assertTrue(RateLimitService.check_rate_limit('10.0.0.5'))
+
+    def test_unblock_resets_count(self):
+        for _ in range(5):
+            RateLimitService.check_rate_limit('10.0.0.6')
+        self.assertFalse(RateLimitService.check_rate_limit('10.0.0.6'))
+
+        RateLimitService.unblock_ip('10.0.0.6')
+        self.assertTrue(RateLimitService.check_rate_limit('10.0.0.6'))
+
+
+class TestConcurrentRateLimit(FileDatabaseTestCase):
+    THREADS = 16
+    CHECKS_PER_THREAD = 10
+
+    def test_concurrent_first_requests(self):
+        """Test that simultaneous requests from a new IP are all counted"""
+        def check():
+            for _ in range(self.CHECKS_PER_THREAD):
+                RateLimitService.check_rate_limit('10.1.1.1', limit=1000)
+
+        errors = self.run_threads(check, self.THREADS)
+
+        self.assertEqual(errors, [])
+        with self.app.app_context():
+            rate_limit = db.session.execute(
+                select(RateLimit).filter_by(ip_address='10.1.1.1')
+            ).scalar_one()
+            self.assertEqual(rate_limit.count, self.THREADS * self.CHECKS_PER_THREAD)
+            self.assertFalse(rate_limit.is_blocked)
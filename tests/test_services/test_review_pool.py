@@ -0,0 +1,145 @@
+from tests.base import BaseTestCase
+from sqlalchemy import event
+from app.services.review import ReviewService
+from app.services.review_pool import ReviewPool, get_review_pool
+
+class TestReviewPool(BaseTestCase):
+    def test_pick_skips_voted_reviews(self):
+        """Test that picks prefer reviews the user hasn't voted on"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(5)]
+        voted = [review.id for review in reviews[:4]]
+
+        pool = get_review_pool()
+        for _ in range(20):
+            self.assertEqual(pool.pick(exclude=voted), reviews[4].id)
+
+    def test_pick_when_everything_voted(self):
+        """Test that a review is still returned once all have been voted on"""
+        review = self.create_test_review()
+        self.assertEqual(get_review_pool().pick(exclude=[review.id]), review.id)
+
+    def test_pick_empty_pool(self):
+        self.assertIsNone(get_review_pool().pick())
+
+    def test_new_reviews_invalidate_pool(self):
+        """Test that reviews created in this process are picked up immediately"""
+        pool = get_review_pool()
+        self.assertIsNone(pool.pick())
+
+        review = ReviewService.create_review('Fresh review')
+        self.assertEqual(pool.pick(), review.id)
+        self.assertEqual(pool.counts(review.id), (review.votes_headphones, review.votes_wine))
+
+    def test_pool_respects_ttl(self):
+        """Test that a fresh pool is not reloaded before its TTL expires"""
+        pool = ReviewPool(ttl=3600)
+        self.create_test_review()
+        pool.refresh()
+        self.assertFalse(pool.is_stale())
+        self.assertEqual(len(pool), 1)
+
+    def test_counts_unknown_review(self):
+        self.create_test_review()
+        self.assertIsNone(get_review_pool().counts(999))
+
+    def test_get_random_review_uses_pool(self):
+        """Test that get_random_review returns unvoted reviews from the pool"""
+        first = self.create_test_review('First')
+        second = self.create_test_review('Second')
+
+        review = ReviewService.get_random_review(voted_reviews=[first.id])
+        self.assertEqual(review.id, second.id)
+
+    def test_sample_distinct_unvoted(self):
+        """Test that samples are distinct and skip excluded reviews"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(10)]
+        voted = {review.id for review in reviews[:7]}
+
+        pool = get_review_pool()
+        sample = pool.sample(5, exclude=voted)
+        self.assertEqual(sorted(sample), sorted(review.id for review in reviews[7:]))
+        self.assertEqual(len(pool.sample(4)), 4)
+        self.assertEqual(len(set(pool.sample(10))), 10)
+
+    def test_sample_when_everything_voted(self):
+        reviews = [self.create_test_review(f'Review {i}') for i in range(3)]
+        sample = get_review_pool().sample(2, exclude=[review.id for review in reviews])
+        self.assertEqual(len(set(sample)), 2)
+        self.assertEqual(get_review_pool().sample(0), [])
+
+    def test_get_next_reviews_one_query(self):
+        """Test that a batch is loaded with a single query once the pool is warm"""
+        excluded = self.create_test_review('Excluded').id
+        for i in range(5):
+            self.create_test_review(f'Review {i}')
+        get_review_pool().refresh()
+        
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        try:
+            with self.app.test_request_context():
+                batch = ReviewService.get_next_reviews(3, exclude=[excluded])
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(len({review.id for review in batch}), 3)
+        self.assertNotIn(excluded, [review.id for review in batch])
+
+    def record_vote_and_get_next(self, review_id):
+        """Run add_vote_and_get_next, returning its result and the SQL and COMMITs it issued"""
+        events = []
+        record = lambda *args: events.append(args[2].split()[0])
+        record_commit = lambda conn: events.append('COMMIT')
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        event.listen(self.db.engine, 'commit', record_commit)
+        try:
+            with self.app.test_request_context():
+                result = ReviewService.add_vote_and_get_next(review_id, 'wine', count=2)
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+            event.remove(self.db.engine, 'commit', record_commit)
+        return result, events
+
+    def test_add_vote_and_get_next_one_transaction(self):
+        """Test that the vote and the next reviews share one short write transaction"""
+        voted_id = self.create_test_review('Voted').id
+        others = {self.create_test_review(f'Review {i}').id for i in range(3)}
+        get_review_pool().refresh()
+        self.db.session.commit()
+        
+        (counts, next_reviews), events = self.record_vote_and_get_next(voted_id)
+        # The warm pool picks the ids, then only the UPDATE and a primary key lookup run
+        self.assertEqual(events, ['UPDATE', 'SELECT', 'COMMIT'])
+        self.assertEqual(counts.votes_wine, 6)
+        self.assertEqual(len(next_reviews), 2)
+        self.assertLessEqual({review.id for review in next_reviews}, others)
+        # Rows stay readable after the commit
+        self.assertTrue(all(review.text.startswith('Review') for review in next_reviews))
+        self.assertEqual(get_review_pool().counts(voted_id), (10, 6))
+
+    def test_add_vote_and_get_next_reloads_pool_before_voting(self):
+        """Test that an expired pool is reloaded before the write lock is taken"""
+        voted_id = self.create_test_review('Voted').id
+        for i in range(3):
+            self.create_test_review(f'Review {i}')
+        ReviewPool.invalidate()
+        
+        (counts, next_reviews), events = self.record_vote_and_get_next(voted_id)
+        self.assertEqual(events[events.index('UPDATE'):], ['UPDATE', 'SELECT', 'COMMIT'])
+        self.assertEqual(events[0], 'SELECT')
+        self.assertEqual(len(next_reviews), 2)
+
+    def test_add_vote_and_get_next_without_pool(self):
+        self.app.config['REVIEW_POOL_ENABLED'] = False
+        voted_id = self.create_test_review('Voted').id
+        others = {self.create_test_review(f'Review {i}').id for i in range(3)}
+        
+        (counts, next_reviews), events = self.record_vote_and_get_next(voted_id)
+        self.assertEqual(events[events.index('UPDATE'):], ['UPDATE', 'SELECT', 'COMMIT'])
+        self.assertLessEqual({review.id for review in next_reviews}, others)
+
+    def test_add_vote_and_get_next_missing_review(self):
+        self.create_test_review()
+        with self.app.test_request_context():
+            self.assertEqual(ReviewService.add_vote_and_get_next(999, 'wine'), (None, []))
@@ -1,6 +1,12 @@
-from tests.base import BaseTestCase
+from tests.base import BaseTestCase, FileDatabaseTestCase
+from app.extensions import db
+from app.models.review import Review, PendingReview
+from app.utils.db import add_missing_columns
+from app.utils.pagination import encode_cursor
+from sqlalchemy import event, text
 from app.services.review import ReviewService
 from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 class TestReviewService(BaseTestCase):
     def test_create_review(self):
@@ -58,6 +64,16 @@ class TestReviewService(BaseTestCase):
         self.assertEqual(review.votes_headphones, initial_headphones)
         self.assertEqual(review.votes_wine, initial_wine)
 
+    def test_add_vote_returns_updated_counts(self):
+        """Test that add_vote returns the counts written by the update"""
+        review = self.create_test_review()
+        
+        counts = ReviewService.add_vote(review.id, 'wine')
+        self.assertEqual(counts.id, review.id)
+        self.assertEqual(counts.votes_headphones, 10)
+        self.assertEqual(counts.votes_wine, 6)
+        self.assertEqual(ReviewService.calculate_vote_percentages(counts), (63, 37))
+
     def test_add_vote_nonexistent_review(self):
         """Test adding vote to non-existent review"""
         result = ReviewService.add_vote(999, 'headphones')
@@ -119,6 +135,46 @@ class TestReviewService(BaseTestCase):
         # Verify timestamps are in descending order
         self.assertTrue(pending_reviews[0].created_at > pending_reviews[1].created_at)
 
+    def test_approve_pending_reviews_batch(self):
+        first = self.create_pending_review('First batch review')
+        second = self.create_pending_review('Second batch review')
+        rejected = self.create_pending_review('Rejected earlier')
+        ReviewService.reject_pending_review(rejected.id)
+        
+        result = ReviewService.approve_pending_reviews([second.id, first.id, rejected.id, 999])
+        self.assertEqual(result.processed, 2)
+        self.assertEqual(result.results, {
+            second.id: 'approved',
+            first.id: 'approved',
+            rejected.id: 'already_rejected',
+            999: 'not_found',
+        })
+        self.assertEqual(
+            sorted(review.text for review in Review.query.all()),
+            ['First batch review', 'Second batch review']
+        )
+        for review in Review.query.all():
+            self.assertTrue(review.votes_headphones >= 1 and review.votes_wine >= 1)
+            self.assertIsNotNone(review.content_hash)
+        
+        # Approving again creates nothing
+        result = ReviewService.approve_pending_reviews([first.id])
+        self.assertEqual(result.results, {first.id: 'already_approved'})
+        self.assertEqual(Review.query.count(), 2)
+
+    def test_reject_pending_reviews_by_search(self):
+        spam = self.create_pending_review('Buy cheap watches now')
+        keep = self.create_pending_review('Smooth and mellow')
+        
+        result = ReviewService.reject_pending_reviews(search='watches')
+        self.assertEqual(result, (1, {spam.id: 'rejected'}))
+        self.db.session.expire_all()
+        self.assertEqual(self.db.session.get(PendingReview, spam.id).status, 'rejected')
+        self.assertEqual(self.db.session.get(PendingReview, keep.id).status, 'pending')
+        
+        result = ReviewService.approve_pending_reviews()
+        self.assertEqual(result.results, {keep.id: 'approved'})
+
     def test_reset_votes(self):
         """Test resetting votes on a review"""
         review = self.create_test_review()
@@ -179,4 +235,178 @@ class TestReviewService(BaseTestCase):
             votes_wine=50
         )
         
-        self.assertIsNone(result) 
\ No newline at end of file
+        self.assertIsNone(result) 
+
+    def test_reset_all_votes(self):
+        reviews = [self.create_test_review(f'Review {i}') for i in range(3)]
+        
+        self.assertEqual(ReviewService.reset_all_votes(), 3)
+        self.db.session.expire_all()
+        self.assertTrue(all(review.total_votes == 0 for review in reviews))
+
+    def test_seed_votes(self):
+        """Test that seeding covers every review across batches"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(25)]
+        ReviewService.reset_all_votes()
+        
+        self.assertEqual(ReviewService.seed_votes(batch_size=10), 25)
+        self.db.session.expire_all()
+        low = ReviewService.BASE_VOTES - ReviewService.VARIANCE
+        high = ReviewService.BASE_VOTES + ReviewService.VARIANCE
+        for review in reviews:
+            self.assertTrue(low <= review.votes_headphones <= high)
+            self.assertTrue(low <= review.votes_wine <= high)
+        self.assertGreater(len({review.votes_headphones for review in reviews}), 1)
+
+    def test_seed_votes_sparse_ids(self):
+        """Test that gaps in the review ids don't add batches"""
+        for review_id in (1, 2, 3, 500000, 1000000):
+            self.db.session.add(Review(id=review_id, text=f'Review {review_id}'))
+        self.db.session.commit()
+        
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split(None, 1)[0].upper())
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        try:
+            self.assertEqual(ReviewService.seed_votes(batch_size=2), 5)
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+        self.assertEqual(statements.count('UPDATE'), 3)
+        self.db.session.expire_all()
+        self.assertTrue(all(review.votes_wine > 0 for review in Review.query.all()))
+
+    def test_seed_votes_empty(self):
+        self.assertEqual(ReviewService.seed_votes(), 0)
+
+    def collect_pages(self, **kwargs):
+        """Follow next cursors and return every review id in order"""
+        ids, cursor = [], None
+        while True:
+            reviews, cursor = ReviewService.get_reviews_page(cursor=cursor, per_page=3, **kwargs)
+            ids.extend(review.id for review in reviews)
+            if cursor is None:
+                return ids
+
+    def test_reviews_page_newest_first(self):
+        """Test that paging through reviews sharing a timestamp is complete"""
+        reviews = [self.create_test_review(f'Review {i}') for i in range(8)]
+        reviews[0].created_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        self.db.session.commit()
+        
+        ids = self.collect_pages()
+        self.assertEqual(ids, [reviews[0].id] + [review.id for review in reversed(reviews[1:])])
+        self.assertEqual(self.collect_pages(sort='oldest'), list(reversed(ids)))
+
+    def test_reviews_page_by_votes(self):
+        reviews = [self.create_test_review(f'Review {i}') for i in range(7)]
+        for votes, review in zip([5, 1, 9, 1, 0, 3, 9], reviews):
+            review.votes_headphones, review.votes_wine = votes, 0
+        self.db.session.commit()
+        
+        ids = self.collect_pages(sort='most_votes')
+        totals = [self.db.session.get(Review, review_id).total_votes for review_id in ids]
+        self.assertEqual(totals, [9, 9, 5, 3, 1, 1, 0])
+        self.assertEqual(len(set(ids)), 7)
+        self.assertEqual(self.collect_pages(sort='fewest_votes'), list(reversed(ids)))
+
+    def test_reviews_page_search(self):
+        self.create_test_review('Smooth tannins')
+        match = self.create_test_review('Wide 100% soundstage')
+        reviews, cursor = ReviewService.get_reviews_page(search='100%')
+        self.assertEqual([review.id for review in reviews], [match.id])
+        self.assertIsNone(cursor)
+
+    def test_reviews_page_invalid_arguments(self):
+        self.create_test_review()
+        with self.assertRaises(ValueError):
+            ReviewService.get_reviews_page(sort='random')
+        with self.assertRaises(ValueError):
+            ReviewService.get_reviews_page(cursor='not a cursor')
+        _, cursor = ReviewService.get_reviews_page(per_page=1, sort='most_votes')
+        self.assertIsNone(cursor)
+        self.create_test_review()
+        _, cursor = ReviewService.get_reviews_page(per_page=1, sort='most_votes')
+        with self.assertRaises(ValueError):
+            ReviewService.get_reviews_page(cursor=cursor, sort='newest')
+        for values in (('most_votes', 'ten', 1), ('most_votes', True, 1), ('most_votes', 10, '1'),
+                       ('newest', 10, 1), ('newest', None, 1), ('oldest', [], 1)):
+            with self.assertRaises(ValueError):
+                ReviewService.get_reviews_page(cursor=encode_cursor(*values), sort=values[0])
+
+    def test_is_duplicate(self):
+        self.create_test_review('Bright and airy')
+        self.create_pending_review('Awaiting moderation')
+        
+        self.assertTrue(ReviewService.is_duplicate('  bright AND airy'))
+        self.assertTrue(ReviewService.is_duplicate('Awaiting moderation'))
+        self.assertFalse(ReviewService.is_duplicate('Something new'))
+
+    def test_import_skips_duplicates(self):
+        """Test that duplicates of stored reviews and of earlier records are skipped"""
+        self.create_test_review('Already stored')
+        records = [{'text': text} for text in ('already STORED', 'New one', 'Another', 'new one', 'Last')]
+        
+        result = ReviewService.import_reviews(records, batch_size=2)
+        self.assertEqual((result.imported, result.duplicates, result.failed), (3, 2, 0))
+        self.assertEqual(Review.query.count(), 4)
+
+    def test_import_clear_existing(self):
+        """Test that clearing is undone unless the import succeeds"""
+        self.create_test_review('Already stored')
+
+        result = ReviewService.import_reviews(['not a review'], clear_existing=True)
+        self.assertEqual((result.imported, result.failed), (0, 1))
+        self.assertEqual([review.text for review in Review.query], ['Already stored'])
+
+        # A failing batch only rolls back its own savepoint
+        records = [{'text': 'First'}, {'text': 'Second'}, {'text': 'Third'}]
+        with mock.patch.object(ReviewService, '_import_row', side_effect=[
+            ReviewService._import_row(records[0]), {'text': None, 'content_hash': 'x'},
+            ReviewService._import_row(records[2])
+        ]):
+            result = ReviewService.import_reviews(records, batch_size=1, clear_existing=True)
+        self.assertEqual((result.imported, result.failed), (2, 1))
+        self.assertEqual([review.text for review in Review.query.order_by(Review.id)], ['First', 'Third'])
+
+    def test_missing_content_hash_column_is_added_and_backfilled(self):
+        """Test upgrading a database created before content hashes"""
+        review = self.create_test_review('Stored before hashing')
+        pending = self.create_pending_review('Pending before hashing')
+        for table in ('reviews', 'pending_reviews'):
+            self.db.session.execute(text(f'DROP INDEX ix_{table}_content_hash'))
+            self.db.session.execute(text(f'ALTER TABLE {table} DROP COLUMN content_hash'))
+        self.db.session.commit()
+        
+        self.assertEqual(add_missing_columns(), ['pending_reviews.content_hash', 'reviews.content_hash'])
+        self.assertEqual(ReviewService.backfill_content_hashes(batch_size=1), 2)
+        self.db.session.expire_all()
+        self.assertIsNotNone(self.db.session.get(Review, review.id).content_hash)
+        self.assertTrue(ReviewService.is_duplicate('Pending before hashing'))
+
+class TestConcurrentVotes(FileDatabaseTestCase):
+    """Votes cast from several threads against a file-backed database"""
+    THREADS = 8
+    VOTES_PER_THREAD = 25
+
+    def setUp(self):
+        super().setUp()
+        with self.app.app_context():
+            review = Review(text='Contended review', votes_headphones=0, votes_wine=0)
+            db.session.add(review)
+            db.session.commit()
+            self.review_id = review.id
+
+    def test_no_lost_updates(self):
+        """Test that every concurrent vote is counted"""
+        def cast_votes():
+            for _ in range(self.VOTES_PER_THREAD):
+                ReviewService.add_vote(self.review_id, 'headphones')
+
+        errors = self.run_threads(cast_votes, self.THREADS)
+
+        self.assertEqual(errors, [])
+        with self.app.app_context():
+            review = db.session.get(Review, self.review_id)
+            self.assertEqual(review.votes_headphones, self.THREADS * self.VOTES_PER_THREAD)
+            self.assertEqual(review.votes_wine, 0)
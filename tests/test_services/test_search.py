@@ -0,0 +1,97 @@
+from tests.base import BaseTestCase
+from app.models.review import Review, PendingReview
+from app.services.search import SearchService, create_missing_search_indexes
+from sqlalchemy import text
+from unittest.mock import patch
+
+class TestSearchService(BaseTestCase):
+    def drop_search_index(self):
+        self.db.session.execute(text('DROP TABLE reviews_fts'))
+        for trigger in ('insert', 'delete', 'update'):
+            self.db.session.execute(text(f'DROP TRIGGER reviews_fts_{trigger}'))
+        self.db.session.commit()
+
+    def search_texts(self, query, model=Review, **kwargs):
+        results, _ = SearchService.search(query, model, **kwargs)
+        return [review.text for review, _ in results]
+
+    def test_search_ranks_results(self):
+        """Test that better matches come first and stemming applies"""
+        self.create_test_review('A smooth finish')
+        self.create_test_review('Bass, bass and more bass with a smooth finish')
+        self.create_test_review('Crisp highs')
+
+        self.assertEqual(
+            self.search_texts('bass'),
+            ['Bass, bass and more bass with a smooth finish']
+        )
+        self.assertEqual(
+            self.search_texts('finishing'),
+            ['A smooth finish', 'Bass, bass and more bass with a smooth finish']
+        )
+
+    def test_search_prefix_and_syntax(self):
+        """Test that words are stemmed and query syntax is ignored"""
+        self.create_test_review('Soundstage is wide')
+        self.assertEqual(self.search_texts('soundstages'), ['Soundstage is wide'])
+        self.assertEqual(self.search_texts('wide" NEAR(*'), [])
+        self.assertEqual(self.search_texts('(wide*'), ['Soundstage is wide'])
+        self.assertEqual(self.search_texts('!!!'), [])
+
+    def test_search_tracks_updates_and_deletes(self):
+        review = self.create_test_review('Tannic and dry')
+        review.text = 'Bright and fruity'
+        self.db.session.commit()
+        self.assertEqual(self.search_texts('tannic'), [])
+        self.assertEqual(self.search_texts('fruity'), ['Bright and fruity'])
+
+        self.db.session.delete(review)
+        self.db.session.commit()
+        self.assertEqual(self.search_texts('fruity'), [])
+
+    def test_search_pagination(self):
+        for i in range(5):
+            self.create_test_review(f'Velvety review {i}')
+
+        first, has_more = SearchService.search('velvety', per_page=3)
+        second, has_more_after = SearchService.search('velvety', page=2, per_page=3)
+        self.assertTrue(has_more)
+        self.assertFalse(has_more_after)
+        ids = [review.id for review, _ in first + second]
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_common_terms_return_newest_first(self):
+        """Test that queries with too many matches to rank are paged by recency"""
+        reviews = [self.create_test_review(f'Silky review {i}') for i in range(5)]
+        with patch('app.services.search.MAX_RANKED_MATCHES', 3):
+            first, has_more = SearchService.search('silky', per_page=3)
+            second, _ = SearchService.search('silky', page=2, per_page=3)
+        self.assertTrue(has_more)
+        self.assertEqual(
+            [(review.id, rank) for review, rank in first + second],
+            [(review.id, None) for review in reversed(reviews)]
+        )
+
+    def test_search_pending_reviews(self):
+        """Test that only reviews still pending are searched"""
+        self.create_pending_review('Pending oaky review')
+        rejected = self.create_pending_review('Rejected oaky review')
+        rejected.status = 'rejected'
+        self.db.session.commit()
+        self.assertEqual(self.search_texts('oaky', PendingReview), ['Pending oaky review'])
+
+    def test_missing_index_is_built_from_existing_rows(self):
+        """Test creating the index for a database that predates search"""
+        self.create_test_review('Existing velvet review')
+        self.drop_search_index()
+        self.assertEqual(self.search_texts('velvet'), ['Existing velvet review'])  # LIKE fallback
+
+        create_missing_search_indexes()
+        results, _ = SearchService.search('velvet')
+        self.assertIsNotNone(results[0][1])
+
+    def test_like_fallback(self):
+        self.drop_search_index()
+        self.create_test_review('Costs 100% less')
+        results, _ = SearchService.search('100%')
+        self.assertEqual([(review.text, rank) for review, rank in results], [('Costs 100% less', None)])
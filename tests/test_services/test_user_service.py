@@ -1,6 +1,7 @@
 from tests.base import BaseTestCase
 from app.services.user import UserService
 from app.models.user import User
+from app.models.review import Review
 
 class TestUserService(BaseTestCase):
     def test_create_admin(self):
@@ -39,4 +40,41 @@ class TestUserService(BaseTestCase):
             'different_password'
         )
         self.assertFalse(success)
-        self.assertEqual(message, "Passwords do not match") 
\ No newline at end of file
+        self.assertEqual(message, "Passwords do not match")
+
+    def test_import_initial_data_reviews(self):
+        """Test importing the reviews export format in several batches"""
+        data = [
+            {'text': 'First', 'votes_headphones': 3, 'votes_wine': 1, 'created_at': '2025-01-25T23:01:18'},
+            {'id': 42, 'text': 'Second'},
+            {'text': 'Third', 'votes_wine': 7},
+        ]
+        self.assertEqual(UserService.import_initial_data(data, batch_size=2), (3, 0))
+
+        reviews = Review.query.order_by(Review.id).all()
+        self.assertEqual([review.text for review in reviews], ['First', 'Second', 'Third'])
+        self.assertEqual(reviews[0].votes_headphones, 3)
+        self.assertEqual(reviews[0].created_at.year, 2025)
+        self.assertEqual(reviews[1].id, 42)
+        self.assertEqual(reviews[2].votes_wine, 7)
+
+    def test_import_initial_data_legacy_format(self):
+        """Test that existing users are skipped in the legacy format"""
+        data = {
+            'users': [
+                {'username': 'admin_test', 'password': 'ignored'},
+                {'username': 'editor', 'password': 'secret'},
+            ],
+            'reviews': [{'content': 'Legacy review', 'votes_wine': 2}],
+        }
+        self.assertEqual(UserService.import_initial_data(data), (1, 1))
+
+        self.assertTrue(User.query.filter_by(username='editor').one().check_password('secret'))
+        self.assertTrue(self.admin.check_password('test_password'))
+        self.assertEqual(Review.query.one().text, 'Legacy review')
+
+    def test_import_initial_data_rolls_back(self):
+        """Test that a bad record leaves the database unchanged"""
+        with self.assertRaises(KeyError):
+            UserService.import_initial_data([{'text': 'Good'}, {'votes_wine': 1}])
+        self.assertEqual(Review.query.count(), 0)
@@ -0,0 +1,65 @@
+from tests.base import BaseTestCase
+from app.models.review import Review
+from app.services.review import ReviewService
+from app.services.vote_buffer import get_vote_buffer
+
+class TestVoteBuffer(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config['VOTE_BUFFER_ENABLED'] = True
+        self.buffer = get_vote_buffer()
+
+    def tearDown(self):
+        self.buffer.close()
+        super().tearDown()
+
+    def stored_votes(self, review_id):
+        self.db.session.expire_all()
+        review = self.db.session.get(Review, review_id)
+        return review.votes_headphones, review.votes_wine
+
+    def test_votes_are_buffered_until_flush(self):
+        """Test that buffered votes only reach the database on flush"""
+        review = self.create_test_review()
+
+        counts = ReviewService.add_vote(review.id, 'headphones')
+        ReviewService.add_vote(review.id, 'wine')
+        self.assertEqual((counts.votes_headphones, counts.votes_wine), (11, 5))
+        self.assertEqual(self.stored_votes(review.id), (10, 5))
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.stored_votes(review.id), (11, 6))
+        self.assertEqual(self.buffer.pending(review.id), (0, 0))
+
+    def test_counts_include_pending_votes(self):
+        """Test that responses keep counting up after a flush"""
+        review = self.create_test_review()
+
+        ReviewService.add_vote(review.id, 'wine')
+        self.buffer.flush()
+        counts = ReviewService.add_vote(review.id, 'wine')
+        self.assertEqual((counts.votes_headphones, counts.votes_wine), (10, 7))
+
+    def test_flush_when_buffer_is_full(self):
+        """Test that reaching max_pending triggers a flush"""
+        review = self.create_test_review()
+        self.buffer.max_pending = 3
+
+        for _ in range(3):
+            ReviewService.add_vote(review.id, 'headphones')
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(self.stored_votes(review.id), (13, 5))
+
+    def test_buffered_vote_nonexistent_review(self):
+        self.assertIsNone(ReviewService.add_vote(999, 'headphones'))
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_vote_route_with_buffer(self):
+        review = self.create_test_review()
+        response = self.client.post('/vote', data={
+            'review_id': review.id,
+            'vote_type': 'headphones'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['headphones_percentage'], 69)
+        self.assertEqual(self.buffer.pending(review.id), (1, 0))
@@ -0,0 +1,69 @@
+from tests.base import BaseTestCase
+from app.models.review import Review, ReviewVoteShard
+from app.services.review import ReviewService
+
+class TestVoteShards(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config['VOTE_SHARDS'] = 4
+
+    def tearDown(self):
+        self.app.extensions['vote_shard_compactor'].stop()
+        super().tearDown()
+
+    def shard_rows(self, review_id):
+        return self.db.session.execute(
+            self.db.select(ReviewVoteShard).filter_by(review_id=review_id)
+        ).scalars().all()
+
+    def test_votes_go_to_shards(self):
+        """Test that sharded votes leave the review row untouched"""
+        review = self.create_test_review()
+
+        for _ in range(10):
+            counts = ReviewService.add_vote(review.id, 'headphones')
+        counts = ReviewService.add_vote(review.id, 'wine')
+
+        self.assertEqual((counts.votes_headphones, counts.votes_wine), (20, 6))
+        shards = self.shard_rows(review.id)
+        self.assertLessEqual(len(shards), 4)
+        self.assertEqual(sum(shard.votes_headphones for shard in shards), 10)
+        self.assertEqual(sum(shard.votes_wine for shard in shards), 1)
+
+        self.db.session.expire_all()
+        review = self.db.session.get(Review, review.id)
+        self.assertEqual(review.total_votes, 15)
+
+    def test_compact_vote_shards(self):
+        """Test that compaction folds shards into the review's totals"""
+        review = self.create_test_review()
+        for _ in range(5):
+            ReviewService.add_vote(review.id, 'wine')
+
+        self.assertEqual(ReviewService.compact_vote_shards(), 1)
+        self.assertEqual(self.shard_rows(review.id), [])
+
+        review = self.db.session.get(Review, review.id)
+        self.assertEqual((review.votes_headphones, review.votes_wine), (10, 10))
+        self.assertEqual(review.headphones_percentage, 50)
+        self.assertEqual(ReviewService.calculate_vote_percentages(review), (50, 50))
+
+    def test_sharded_vote_nonexistent_review(self):
+        self.assertIsNone(ReviewService.add_vote(999, 'wine'))
+        self.assertEqual(self.shard_rows(999), [])
+
+    def test_reset_votes_clears_shards(self):
+        review = self.create_test_review()
+        ReviewService.add_vote(review.id, 'wine')
+
+        ReviewService.reset_votes(review.id)
+        ReviewService.compact_vote_shards()
+        review = self.db.session.get(Review, review.id)
+        self.assertEqual(review.total_votes, 0)
+
+    def test_reset_all_votes_clears_shards(self):
+        review = self.create_test_review()
+        ReviewService.add_vote(review.id, 'wine')
+
+        ReviewService.reset_all_votes()
+        self.assertEqual(self.shard_rows(review.id), [])
@@ -0,0 +1,113 @@
+from tests.base import BaseTestCase
+from flask import url_for
+from unittest import mock
+import gzip
+import os
+import tempfile
+from app.utils import http_cache
+
+CSS = b'body { color: #333; }\n' * 200
+
+class TestStaticAssets(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static_folder = self.app.static_folder
+        self.app.static_folder = self.tmp.name
+        self.addCleanup(setattr, self.app, 'static_folder', self.static_folder)
+        self.write('site.css', CSS)
+        self.write('logo.png', b'\x89PNG' + bytes(100))
+
+    def write(self, name, data):
+        with open(os.path.join(self.tmp.name, name), 'wb') as f:
+            f.write(data)
+
+    def static_url(self, filename):
+        with self.app.test_request_context():
+            return url_for('static', filename=filename)
+
+    def test_urls_carry_content_hash(self):
+        url = self.static_url('site.css')
+        self.assertRegex(url, r'^/static/site\.css\?v=[0-9a-f]{12}$')
+        self.assertEqual(self.static_url('missing.css'), '/static/missing.css')
+
+        # Changing the file changes its URL
+        self.write('site.css', CSS + b'a {}\n')
+        self.assertNotEqual(self.static_url('site.css'), url)
+
+    def test_hashed_urls_are_immutable(self):
+        response = self.client.get(self.static_url('site.css'))
+        self.assertEqual(response.data, CSS)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, self.app.config['STATIC_CACHE_MAX_AGE'])
+
+        # Outdated or missing hashes are revalidated instead
+        for url in ('/static/site.css?v=000000000000', '/static/site.css'):
+            response = self.client.get(url)
+            self.assertFalse(response.cache_control.immutable)
+            self.assertTrue(response.cache_control.no_cache)
+            etag = response.headers['ETag']
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get('/static/missing.css').status_code, 404)
+        self.assertEqual(self.client.get('/static/../config.py').status_code, 404)
+
+    def test_precompressed_variants(self):
+        written = http_cache.compress_static(self.tmp.name)
+        # The png isn't compressible
+        self.assertEqual(written, [os.path.join(self.tmp.name, 'site.css.gz')] + (
+            [os.path.join(self.tmp.name, 'site.css.br')] if http_cache.brotli else []
+        ))
+        self.assertEqual(http_cache.compress_static(self.tmp.name), [])
+
+        url = self.static_url('site.css')
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(gzip.decompress(response.data), CSS)
+
+        response = self.client.get(url, headers={'Accept-Encoding': 'identity'})
+        self.assertIsNone(response.content_encoding)
+        self.assertEqual(response.data, CSS)
+
+        # A variant older than its file is ignored until it is rebuilt
+        self.write('site.css', CSS + b'a {}\n')
+        os.utime(os.path.join(self.tmp.name, 'site.css.gz'), ns=(0, 0))
+        response = self.client.get('/static/site.css', headers={'Accept-Encoding': 'gzip'})
+        self.assertIsNone(response.content_encoding)
+        self.assertIn(os.path.join(self.tmp.name, 'site.css.gz'), http_cache.compress_static(self.tmp.name))
+
+    def test_prefers_brotli(self):
+        self.write('site.css.br', b'brotli bytes')
+        self.write('site.css.gz', gzip.compress(CSS))
+        response = self.client.get('/static/site.css', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.content_encoding, 'br')
+        self.assertEqual(response.data, b'brotli bytes')
+        response = self.client.get('/static/site.css', headers={'Accept-Encoding': 'gzip, br;q=0'})
+        self.assertEqual(response.content_encoding, 'gzip')
+
+    def test_compress_static_command(self):
+        with mock.patch.object(http_cache, 'brotli', None):
+            result = self.app.test_cli_runner().invoke(args=['compress-static'])
+        self.assertIn('writing .gz files only', result.output)
+        self.assertIn('Compressed 1 static files', result.output)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'site.css.gz')))
+
+class TestConditionalPages(BaseTestCase):
+    def test_landing_page_etag(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cache_control.private)
+        etag = response.headers['ETag']
+
+        response = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_thank_you_etag(self):
+        etag = self.client.get('/thank-you').headers['ETag']
+        self.assertEqual(self.client.get('/thank-you', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get('/thank-you', headers={'If-None-Match': '"other"'}).status_code, 200)
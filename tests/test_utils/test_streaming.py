@@ -0,0 +1,52 @@
+import gzip
+import io
+import json
+import unittest
+from app.utils.streaming import gzip_chunks, iter_json_records
+
+RECORDS = [
+    {'text': 'Commas, [brackets] and "quotes"', 'votes_headphones': 12345},
+    {'text': 'Café notes \U0001F3A7', 'votes_wine': 7},
+]
+
+class TestIterJsonRecords(unittest.TestCase):
+    def parse(self, data, chunk_size=3):
+        return list(iter_json_records(io.BytesIO(data), chunk_size=chunk_size))
+
+    def test_json_array(self):
+        """Test that records split across tiny chunks are decoded intact"""
+        data = json.dumps(RECORDS, ensure_ascii=False).encode('utf-8')
+        for chunk_size in (1, 3, 64 * 1024):
+            self.assertEqual(self.parse(data, chunk_size), RECORDS)
+
+    def test_ndjson(self):
+        data = ''.join(json.dumps(record) + '\n' for record in RECORDS).encode('utf-8')
+        self.assertEqual(self.parse(data), RECORDS)
+
+    def test_empty_input(self):
+        self.assertEqual(self.parse(b''), [])
+        self.assertEqual(self.parse(b' [ ] \n'), [])
+
+    def test_byte_order_mark(self):
+        self.assertEqual(self.parse(b'\xef\xbb\xbf[{"text": "a"}]'), [{'text': 'a'}])
+
+    def test_malformed_input(self):
+        for data in (b'[{"text": "a"}', b'[1 2]', b'[1,]', b'[1] trailing', b'{"text": '):
+            with self.assertRaises(ValueError):
+                self.parse(data)
+
+    def test_records_are_yielded_before_an_error(self):
+        records = iter_json_records(io.BytesIO(b'[{"text": "a"}, oops]'))
+        self.assertEqual(next(records), {'text': 'a'})
+        with self.assertRaises(ValueError):
+            next(records)
+
+    def test_record_size_limit(self):
+        data = b'[{"text": "' + b'x' * 1000
+        with self.assertRaises(ValueError):
+            list(iter_json_records(io.BytesIO(data), chunk_size=100, max_record_size=500))
+
+class TestGzipChunks(unittest.TestCase):
+    def test_round_trip(self):
+        chunks = ['[', '{"text": "a"}', ']']
+        self.assertEqual(gzip.decompress(b''.join(gzip_chunks(chunks))), b'[{"text": "a"}]')
@@ -0,0 +1,68 @@
+from tests.base import BaseTestCase
+from sqlalchemy import event
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.utils import timing
+import re
+
+SERVER_TIMING = re.compile(r'^db;dur=[\d.]+;desc="(\d+) queries"(, \w+;dur=[\d.]+)*, total;dur=[\d.]+$')
+
+class TestTimingDisabled(BaseTestCase):
+    def test_off_by_default(self):
+        self.create_test_review()
+        response = self.client.get('/play')
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertFalse(event.contains(self.db.engine, 'before_cursor_execute', timing._query_started))
+        self.assertNotIn(timing._start_request, self.app.before_request_funcs.get(None, []))
+
+    def test_timed_outside_requests(self):
+        with timing.timed('captcha'):
+            pass
+        with self.app.test_request_context():
+            self.assertIsNone(timing.current_timings())
+
+class TestTimingEnabled(BaseTestCase):
+    def setUp(self):
+        config_class = type('TimingConfig', (TestingConfig,), {'SERVER_TIMING_ENABLED': True})
+        self.app = create_app(config_class)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.db = db
+        db.create_all()
+
+    def server_timing(self, response):
+        header = response.headers['Server-Timing']
+        self.assertRegex(header, SERVER_TIMING)
+        return dict(
+            (metric.split(';')[0], metric) for metric in header.split(', ')
+        )
+
+    def test_queries_and_templates(self):
+        self.create_test_review()
+        with self.assertLogs(self.app.logger, 'INFO') as logs:
+            response = self.client.get('/play')
+        metrics = self.server_timing(response)
+        self.assertIn('template', metrics)
+        self.assertNotIn('captcha', metrics)
+        queries = int(SERVER_TIMING.match(response.headers['Server-Timing']).group(1))
+        self.assertGreater(queries, 0)
+
+        line = logs.records[-1].getMessage()
+        self.assertTrue(line.startswith('request_timing method=GET path=/play '), line)
+        self.assertIn(f'db_queries={queries} ', line)
+        self.assertIn('template_ms=', line)
+        self.assertTrue(line.endswith('status=200'), line)
+
+    def test_captcha(self):
+        response = self.client.get('/submit-review')
+        token = re.search(r'/captcha\.png\?token=([\w-]+)', response.text).group(1)
+        response = self.client.get(f'/captcha.png?token={token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('captcha', self.server_timing(response))
+
+    def test_error_responses(self):
+        response = self.client.get('/no-such-page')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('template', self.server_timing(response))